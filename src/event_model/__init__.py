@@ -1,18 +1,26 @@
+import asyncio
+import bisect
 import collections.abc
+import concurrent.futures
+import contextlib
 import copy
+import functools
 import importlib.resources as importlib_resources
 import inspect
 import itertools
 import json
+import operator
 import os
+import queue
+import sys
 import threading
 import time as ttime
 import uuid
 import warnings
 import weakref
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from collections.abc import Callable, Generator, Iterable, Iterator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import (
     Any,
@@ -24,6 +32,7 @@ from typing import (
 import jsonschema
 import numpy
 
+from ._schema_compiler import CompiledValidator
 from ._version import __version__
 from .documents.datum import Datum
 from .documents.datum_page import DatumPage
@@ -106,6 +115,86 @@ class DocumentNames(Enum):
     bulk_events = "bulk_events"  # deprecated
 
 
+def _route_page_by_rows(
+    page: collections.abc.Mapping,
+    method: Callable,
+    columns: tuple[str, ...],
+    sections: tuple[str, ...],
+    unpack: Callable[[Any], Iterable],
+    pack: Callable[..., Any],
+) -> Any:
+    """
+    Pass each row of a page through method and return the resulting page.
+
+    This is how DocumentRouter handles an EventPage (or DatumPage) when only
+    its event (or datum) method is implemented. In the page, the fields in
+    columns are lists of values, the fields in sections are dicts of such
+    lists, and any others are the same for every row.
+
+    Unlike packing the output rows, this returns the original page when method
+    returns every row itself (or None) with all of its values unchanged.
+    Otherwise the new page shares the lists of any unchanged columns with the
+    original, and only the changed ones are new. Returns NotImplemented if
+    method does.
+    """
+    input_rows = []
+    output_rows = []
+    for row in unpack(page):
+        output_row = method(row)
+        if output_row is NotImplemented:
+            return NotImplemented
+        input_rows.append(row)
+        output_rows.append(row if output_row is None else output_row)
+    if not input_rows:
+        return pack(*output_rows) if output_rows else page
+    # Rows that gained or lost fields, or changed a field that is the same
+    # for all rows, cannot be represented by changing columns: pack them.
+    fields = input_rows[0].keys()
+    if set(map(len, output_rows)) != {len(fields)}:
+        return pack(*output_rows)
+    output_page = dict(page)
+    changed = False
+    try:
+        for name in fields:
+            if name in sections:
+                continue
+            values = list(map(operator.itemgetter(name), output_rows))
+            if name not in columns:
+                if not all(map(operator.is_, values, itertools.repeat(page[name]))):
+                    return pack(*output_rows)
+            elif not _same_values(values, page[name]):
+                output_page[name] = values
+                changed = True
+        for section in sections:
+            section_rows = list(map(operator.itemgetter(section), output_rows))
+            columns_in = page.get(section, {})
+            if set(map(len, section_rows)) != {len(columns_in)}:
+                return pack(*output_rows)
+            section_out = dict(columns_in)
+            for key, column in columns_in.items():
+                values = list(map(operator.itemgetter(key), section_rows))
+                if not _same_values(values, column):
+                    section_out[key] = values
+                    changed = True
+            if section in page:
+                output_page[section] = section_out
+    except (KeyError, TypeError):
+        return pack(*output_rows)
+    if not changed and all(map(operator.is_, output_rows, input_rows)):
+        return page
+    return output_page
+
+
+def _same_values(values: list, column: Any) -> bool:
+    "Whether the list values is equal to a page's column."
+    try:
+        if isinstance(column, numpy.ndarray):
+            return bool(numpy.array_equal(values, column))
+        return values == column
+    except ValueError:  # e.g. comparing arrays of different shapes
+        return False
+
+
 class DocumentRouter:
     """
     Route each document by type to a corresponding method.
@@ -132,6 +221,31 @@ class DocumentRouter:
         Expected signature ``f(name, doc)``
     """
 
+    # The names of the methods, defined below, that return NotImplemented.
+    _STUBS = (
+        "start",
+        "stop",
+        "descriptor",
+        "resource",
+        "event",
+        "datum",
+        "event_page",
+        "datum_page",
+        "stream_datum",
+        "stream_resource",
+    )
+    # Which of those a class does not override. This is computed once per class
+    # so that _dispatch need not call the stubs to find out.
+    _unimplemented: frozenset[str] = frozenset(_STUBS)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._unimplemented = frozenset(
+            name
+            for name in DocumentRouter._STUBS
+            if getattr(cls, name) is getattr(DocumentRouter, name)
+        )
+
     def __init__(self, *, emit: Callable | None = None) -> None:
         # Put in some extra effort to validate `emit` carefully, because if
         # this is used incorrectly the resultant errors can be confusing.
@@ -193,12 +307,22 @@ class DocumentRouter:
 
         Optionally validate that the result is still a valid document.
         """
-        output_doc = getattr(self, name)(doc)
+        unimplemented = self._unimplemented
+        # A method assigned on the instance, e.g. router.event = func, counts as
+        # implemented even if the class does not implement it.
+        instance_attrs = self.__dict__
+        output_doc: Any
+        if name in unimplemented and name not in instance_attrs:
+            output_doc = NotImplemented
+        else:
+            output_doc = getattr(self, name)(doc)
 
         # If 'event' is not defined by the subclass but 'event_page' is, or
         # vice versa, use that. And the same for 'datum_page' / 'datum.
         if output_doc is NotImplemented:
-            if name == "event":
+            if name == "event" and (
+                "event_page" not in unimplemented or "event_page" in instance_attrs
+            ):
                 event_page = pack_event_page(cast(Event, doc))
                 # Subclass' implementation of event_page may return a valid
                 # EventPage or None or NotImplemented.
@@ -208,7 +332,9 @@ class DocumentRouter:
                 )
                 if output_event_page is not NotImplemented:
                     (output_doc,) = unpack_event_page(output_event_page)
-            elif name == "datum":
+            elif name == "datum" and (
+                "datum_page" not in unimplemented or "datum_page" in instance_attrs
+            ):
                 datum_page = pack_datum_page(cast(Datum, doc))
                 # Subclass' implementation of datum_page may return a valid
                 # DatumPage or None or NotImplemented.
@@ -218,30 +344,32 @@ class DocumentRouter:
                 )
                 if output_datum_page is not NotImplemented:
                     (output_doc,) = unpack_datum_page(output_datum_page)
-            elif name == "event_page":
-                output_events = []
-                for event in unpack_event_page(cast(EventPage, doc)):
-                    # Subclass' implementation of event may return a valid
-                    # Event or None or NotImplemented.
-                    output_event = self.event(event)
-                    output_event = output_event if output_event is not None else event
-                    if output_event is NotImplemented:
-                        break
-                    output_events.append(output_event)
-                else:
-                    output_doc = pack_event_page(*output_events)
-            elif name == "datum_page":
-                output_datums = []
-                for datum in unpack_datum_page(cast(DatumPage, doc)):
-                    # Subclass' implementation of datum may return a valid
-                    # Datum or None or NotImplemented.
-                    output_datum = self.datum(datum)
-                    output_datum = output_datum if output_datum is not None else datum
-                    if output_datum is NotImplemented:
-                        break
-                    output_datums.append(output_datum)
-                else:
-                    output_doc = pack_datum_page(*output_datums)
+            elif name == "event_page" and (
+                "event" not in unimplemented or "event" in instance_attrs
+            ):
+                # Subclass' implementation of event may return a valid
+                # Event or None or NotImplemented.
+                output_doc = _route_page_by_rows(
+                    doc,
+                    self.event,
+                    ("uid", "time", "seq_num"),
+                    ("data", "timestamps", "filled"),
+                    unpack_event_page,
+                    pack_event_page,
+                )
+            elif name == "datum_page" and (
+                "datum" not in unimplemented or "datum" in instance_attrs
+            ):
+                # Subclass' implementation of datum may return a valid
+                # Datum or None or NotImplemented.
+                output_doc = _route_page_by_rows(
+                    doc,
+                    self.datum,
+                    ("datum_id",),
+                    ("datum_kwargs",),
+                    unpack_datum_page,
+                    pack_datum_page,
+                )
         # If we still don't find an implemented method by here, then pass the
         # original document through.
         if output_doc is NotImplemented:
@@ -450,6 +578,583 @@ class HandlerRegistryView(collections.abc.Mapping):
         )
 
 
+def _approximate_sizeof(obj: Any) -> int:
+    "Estimate the memory held by obj, following dicts, lists and arrays."
+    # Note that sys.getsizeof includes the data buffer of a numpy array that
+    # owns its data.
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _approximate_sizeof(key) + _approximate_sizeof(value)
+    elif isinstance(obj, list | tuple):
+        for item in obj:
+            size += _approximate_sizeof(item)
+    return size
+
+
+class LRUCache(collections.abc.MutableMapping):
+    """
+    A mapping that evicts its least-recently-used items to stay within bounds.
+
+    This may be passed to :class:`Filler` as any of its ``*_cache`` arguments
+    to bound the memory held by a long-lived Filler.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        The maximum number of items to hold. Unbounded by default.
+    max_bytes : int, optional
+        The maximum total (approximate) size of the values, in bytes.
+        Unbounded by default.
+    sizeof : callable, optional
+        Expected signature ``sizeof(value) -> int``. Used to estimate the size
+        of each value when ``max_bytes`` is set. By default, the sizes of
+        dicts, lists and numpy arrays are followed recursively.
+    close_evicted : boolean, optional
+        If True, call ``close()`` on evicted values that have such a method,
+        and on those removed by ``clear()``. This is useful for caches of
+        handler instances, which may hold open file handles. False by default.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups that found the requested key.
+    misses : int
+        The number of lookups that did not find the requested key.
+    evictions : int
+        The number of items evicted to stay within bounds.
+
+    Examples
+    --------
+    Keep at most 100 open handlers and roughly 1 GB of Datum documents.
+
+    >>> filler = Filler(
+    ...     handler_registry,
+    ...     handler_cache=LRUCache(max_entries=100, close_evicted=True),
+    ...     datum_cache=LRUCache(max_bytes=2**30),
+    ...     inplace=False,
+    ... )
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        *,
+        sizeof: Callable[[Any], int] | None = None,
+        close_evicted: bool = False,
+    ) -> None:
+        if max_entries is not None and max_entries < 1:
+            raise EventModelValueError("max_entries must be a positive integer")
+        if max_bytes is not None and max_bytes < 1:
+            raise EventModelValueError("max_bytes must be a positive integer")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or _approximate_sizeof
+        self.close_evicted = close_evicted
+        self._data: OrderedDict = OrderedDict()
+        self._sizes: dict = {}
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Evicted values to close when the last deferred_close() context exits.
+        self._deferrals = 0
+        self._to_close: list = []
+        # Filler may access its caches from the worker threads of an executor.
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<LRUCache {len(self)} items, ~{self._nbytes} bytes, "
+            f"hits={self.hits}, misses={self.misses}, "
+            f"evictions={self.evictions}>"
+        )
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_deferrals"] = 0
+        state["_to_close"] = []
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @contextlib.contextmanager
+    def deferred_close(self) -> Iterator[None]:
+        """
+        Delay closing evicted values until the end of this context.
+
+        :class:`Filler` uses this while loading the data of a document, so that
+        a handler it is about to use is not closed because the handlers of
+        other Resources of the same document were cached after it.
+        """
+        with self._lock:
+            self._deferrals += 1
+        try:
+            yield
+        finally:
+            to_close: list = []
+            with self._lock:
+                self._deferrals -= 1
+                if not self._deferrals:
+                    to_close, self._to_close = self._to_close, []
+            for value in to_close:
+                value.close()
+
+    @property
+    def nbytes(self) -> int:
+        "The approximate total size of the values, if max_bytes is set."
+        return self._nbytes
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.hits += 1
+            self._data.move_to_end(key)
+            return value
+
+    def __contains__(self, key: Any) -> bool:
+        # Do not count this as a hit or miss or update recency.
+        with self._lock:
+            return key in self._data
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            if key in self._data:
+                self._nbytes -= self._sizes.pop(key)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.max_bytes is not None:
+                self._sizes[key] = size = self._sizeof(value)
+                self._nbytes += size
+            else:
+                self._sizes[key] = 0
+            self._evict()
+
+    def __delitem__(self, key: Any) -> None:
+        with self._lock:
+            del self._data[key]
+            self._nbytes -= self._sizes.pop(key)
+
+    def __iter__(self) -> Iterator:
+        with self._lock:
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        "Remove all items, closing them as if evicted if close_evicted is set."
+        with self._lock:
+            values = list(self._data.values())
+            self._data.clear()
+            self._sizes.clear()
+            self._nbytes = 0
+            for value in values:
+                self._close(value)
+
+    def _evict(self) -> None:
+        # Always keep the most recently inserted item, even if on its own it
+        # exceeds max_bytes.
+        while len(self._data) > 1 and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+        ):
+            key, value = self._data.popitem(last=False)
+            self._nbytes -= self._sizes.pop(key)
+            self.evictions += 1
+            self._close(value)
+
+    def _close(self, value: Any) -> None:
+        "Close a value that was removed, now or when deferred_close() exits."
+        if self.close_evicted and hasattr(value, "close"):
+            if self._deferrals:
+                self._to_close.append(value)
+            else:
+                value.close()
+
+
+class DatumPageCache(collections.abc.MutableMapping):
+    """
+    A mapping of datum_id to Datum that stores DatumPages as they are.
+
+    This is the default ``datum_cache`` of :class:`Filler`. Rather than
+    unpacking each DatumPage into one Datum document per row, the page is kept
+    in its columnar form and each datum_id is mapped to its position in it.
+    A Datum document is only built when it is looked up, which is when an
+    Event referencing it is filled.
+
+    Datum documents may also be set individually, as with a dict.
+    """
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        # The DatumPages, and the position of the first row of each, counting
+        # the rows of all pages added. Pages whose rows have all been deleted
+        # or overwritten are replaced by None.
+        self._pages: list[DatumPage | None] = []
+        self._starts: list[int] = []
+        # The number of rows of each page that are still in _index.
+        self._live: list[int] = []
+        self._num_rows = 0
+        # Map datum_id to the position of its row.
+        self._index: dict[str, int] = {}
+        # Datum documents that were set individually.
+        self._datum: dict[str, Datum] = {}
+
+    def __repr__(self) -> str:
+        return f"<DatumPageCache {len(self)} items>"
+
+    def add_page(self, datum_page: DatumPage) -> None:
+        "Add all the Datum in a DatumPage, without unpacking it."
+        datum_ids = datum_page["datum_id"]
+        start = self._num_rows
+        self._num_rows += len(datum_ids)
+        positions = range(start, self._num_rows)
+        if not (
+            self._index.keys().isdisjoint(datum_ids)
+            and self._datum.keys().isdisjoint(datum_ids)
+        ):
+            # Some of these Datum are being replaced.
+            for datum_id in datum_ids:
+                self._discard(datum_id)
+        self._pages.append(datum_page)
+        self._starts.append(start)
+        self._live.append(len(datum_ids))
+        self._index.update(zip(datum_ids, positions, strict=True))
+
+    def locate(self, datum_id: str) -> tuple[DatumPage, int]:
+        """
+        Return the DatumPage holding a Datum and the row of the Datum in it.
+
+        Raises KeyError if the Datum is unknown or was set individually.
+        """
+        position = self._index[datum_id]
+        page_number = bisect.bisect_right(self._starts, position) - 1
+        page = self._pages[page_number]
+        assert page is not None
+        return page, position - self._starts[page_number]
+
+    def __getitem__(self, datum_id: str) -> Datum:
+        try:
+            return self._datum[datum_id]
+        except KeyError:
+            pass
+        page, row = self.locate(datum_id)
+        return Datum(
+            datum_id=datum_id,
+            datum_kwargs={
+                key: values[row] for key, values in page["datum_kwargs"].items()
+            },
+            resource=page["resource"],
+        )
+
+    def get_many(self, datum_ids: Iterable[str]) -> list[Datum]:
+        "Look up many Datum at once. Raises KeyError if any is unknown."
+        return [self[datum_id] for datum_id in datum_ids]
+
+    def __setitem__(self, datum_id: str, datum: Datum) -> None:
+        self._discard(datum_id)
+        self._datum[datum_id] = datum
+
+    def __delitem__(self, datum_id: str) -> None:
+        if datum_id not in self:
+            raise KeyError(datum_id)
+        self._discard(datum_id)
+
+    def __contains__(self, datum_id: object) -> bool:
+        return datum_id in self._index or datum_id in self._datum
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._datum)
+        yield from list(self._index)
+
+    def __len__(self) -> int:
+        return len(self._datum) + len(self._index)
+
+    def clear(self) -> None:
+        self._reset()
+
+    def _discard(self, datum_id: str) -> None:
+        self._datum.pop(datum_id, None)
+        position = self._index.pop(datum_id, None)
+        if position is None:
+            return
+        page_number = bisect.bisect_right(self._starts, position) - 1
+        self._live[page_number] -= 1
+        if not self._live[page_number]:
+            # Release the page. Its entry stays to keep positions valid.
+            self._pages[page_number] = None
+
+
+class CounterDatumCache(DatumPageCache):
+    """
+    A compact mapping of datum_id to Datum for counter-based datum_ids.
+
+    The Datum composed by :func:`compose_resource` have the datum_ids
+    ``f"{resource_uid}/{counter}"``, where the counter counts up from 0. For
+    those, this stores no datum_id and no Datum dict at all, just one list per
+    key of ``datum_kwargs`` for each Resource, indexed by the counter. Datum
+    with any other kind of datum_id are stored as in :class:`DatumPageCache`.
+
+    It may be passed to :class:`Filler` as its ``datum_cache``. When filling an
+    EventPage, the Datum of consecutive rows are then looked up in bulk.
+    """
+
+    def _reset(self) -> None:
+        super()._reset()
+        # Map Resource UID to _CounterColumns.
+        self._counters: dict[str, _CounterColumns] = {}
+
+    def __repr__(self) -> str:
+        return f"<CounterDatumCache {len(self)} items>"
+
+    def add_page(self, datum_page: DatumPage) -> None:
+        datum_ids = datum_page["datum_id"]
+        if not len(datum_ids):
+            return
+        resource_uid = datum_page["resource"]
+        first = _parse_counter(datum_ids[0], resource_uid)
+        if first is not None and _is_counter_range(datum_ids, resource_uid, first):
+            counters: Iterable[int] = range(first, first + len(datum_ids))
+        else:
+            parsed = [_parse_counter(datum_id, resource_uid) for datum_id in datum_ids]
+            if None in parsed:
+                super().add_page(datum_page)
+                return
+            counters = cast(list[int], parsed)
+        columns = self._counters.get(resource_uid)
+        size = 0 if columns is None else len(columns.present)
+        last = counters[-1] if isinstance(counters, range) else max(counters)
+        if last > 2 * (size + len(datum_ids)) + 1024:
+            # The counters are too sparse to index a list with.
+            if columns is not None:
+                for counter in counters:
+                    columns.discard(counter)
+            super().add_page(datum_page)
+            return
+        if (self._datum or self._index) and not (
+            self._index.keys().isdisjoint(datum_ids)
+            and self._datum.keys().isdisjoint(datum_ids)
+        ):
+            # Some of these Datum replace ones stored by DatumPageCache.
+            for datum_id in datum_ids:
+                super()._discard(datum_id)
+        if columns is None:
+            columns = self._counters[resource_uid] = _CounterColumns()
+        columns.put(counters, datum_page["datum_kwargs"])
+
+    def get_many(self, datum_ids: Iterable[str]) -> list[Datum]:
+        datum_ids = list(datum_ids)
+        if datum_ids:
+            # Resolve a run of consecutive Datum in one step.
+            resource_uid, _, _ = datum_ids[0].rpartition("/")
+            columns = self._counters.get(resource_uid)
+            first = _parse_counter(datum_ids[0], resource_uid)
+            if (
+                columns is not None
+                and first is not None
+                and _is_counter_range(datum_ids, resource_uid, first)
+            ):
+                datum_kwarg_list = columns.get_range(first, first + len(datum_ids))
+                if datum_kwarg_list is not None:
+                    return [
+                        Datum(
+                            datum_id=datum_id,
+                            datum_kwargs=datum_kwargs,
+                            resource=resource_uid,
+                        )
+                        for datum_id, datum_kwargs in zip(
+                            datum_ids, datum_kwarg_list, strict=True
+                        )
+                    ]
+        return super().get_many(datum_ids)
+
+    def __getitem__(self, datum_id: str) -> Datum:
+        resource_uid, _, _ = datum_id.rpartition("/")
+        columns = self._counters.get(resource_uid)
+        if columns is not None:
+            counter = _parse_counter(datum_id, resource_uid)
+            if counter is not None and counter in columns:
+                return Datum(
+                    datum_id=datum_id,
+                    datum_kwargs=columns.get(counter),
+                    resource=resource_uid,
+                )
+        return super().__getitem__(datum_id)
+
+    def __setitem__(self, datum_id: str, datum: Datum) -> None:
+        if _parse_counter(datum_id, datum["resource"]) is None:
+            self._discard(datum_id)
+            super().__setitem__(datum_id, datum)
+        else:
+            self.add_page(pack_datum_page(datum))
+
+    def __contains__(self, datum_id: object) -> bool:
+        if isinstance(datum_id, str):
+            resource_uid, _, _ = datum_id.rpartition("/")
+            columns = self._counters.get(resource_uid)
+            if columns is not None:
+                counter = _parse_counter(datum_id, resource_uid)
+                if counter is not None and counter in columns:
+                    return True
+        return super().__contains__(datum_id)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from super().__iter__()
+        for resource_uid, columns in list(self._counters.items()):
+            for counter in columns.counters():
+                yield f"{resource_uid}/{counter}"
+
+    def __len__(self) -> int:
+        return super().__len__() + sum(map(len, self._counters.values()))
+
+    def _discard(self, datum_id: str) -> None:
+        resource_uid, _, _ = datum_id.rpartition("/")
+        columns = self._counters.get(resource_uid)
+        if columns is not None:
+            counter = _parse_counter(datum_id, resource_uid)
+            if counter is not None:
+                columns.discard(counter)
+        super()._discard(datum_id)
+
+
+def _parse_counter(datum_id: str, resource_uid: str) -> int | None:
+    "Return the counter of a datum_id like f'{resource_uid}/{counter}' or None."
+    prefix, _, suffix = datum_id.rpartition("/")
+    if (
+        prefix != resource_uid
+        or not suffix.isdecimal()
+        or not suffix.isascii()
+        or (suffix[0] == "0" and len(suffix) > 1)
+    ):
+        return None
+    return int(suffix)
+
+
+def _is_counter_range(
+    datum_ids: collections.abc.Sequence, resource_uid: str, first: int
+) -> bool:
+    "Whether datum_ids are the consecutive counter-based ids from first on."
+    if not isinstance(datum_ids, list):
+        datum_ids = list(datum_ids)
+    return datum_ids == [
+        f"{resource_uid}/{counter}" for counter in range(first, first + len(datum_ids))
+    ]
+
+
+class _Missing:
+    "Marks the rows of _CounterColumns without a value for some key."
+
+    def __reduce__(self) -> str:
+        return "_MISSING"  # Unpickle as the same object.
+
+
+_MISSING = _Missing()
+
+
+class _CounterColumns:
+    "The datum_kwargs of the Datum of one Resource, indexed by their counters."
+
+    def __init__(self) -> None:
+        # Whether each counter has a Datum.
+        self.present = bytearray()
+        self.columns: dict[str, list] = {}
+        self._len = 0
+        # Whether every Datum has a value for every key, as is usual.
+        self.uniform = True
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, counter: int) -> bool:
+        return counter < len(self.present) and bool(self.present[counter])
+
+    def counters(self) -> Iterator[int]:
+        return (counter for counter, flag in enumerate(self.present) if flag)
+
+    def _grow(self, size: int) -> None:
+        extra = size - len(self.present)
+        if extra > 0:
+            self.present.extend(bytes(extra))
+            for column in self.columns.values():
+                column.extend([_MISSING] * extra)
+
+    def put(self, counters: Iterable[int], datum_kwargs: dict) -> None:
+        counters = counters if isinstance(counters, range) else list(counters)
+        if not len(counters):
+            return
+        self._grow((counters[-1] if isinstance(counters, range) else max(counters)) + 1)
+        for key in datum_kwargs:
+            if key not in self.columns:
+                if self._len:
+                    self.uniform = False
+                self.columns[key] = [_MISSING] * len(self.present)
+        if len(datum_kwargs) != len(self.columns):
+            self.uniform = False
+        present = self.present
+        if isinstance(counters, range):
+            # A contiguous block: assign slices.
+            self._len += len(counters) - present.count(1, counters[0], counters[-1] + 1)
+            present[counters[0] : counters[-1] + 1] = b"\x01" * len(counters)
+            for key, column in self.columns.items():
+                if key in datum_kwargs:
+                    column[counters[0] : counters[-1] + 1] = datum_kwargs[key]
+                else:
+                    column[counters[0] : counters[-1] + 1] = [_MISSING] * len(counters)
+            return
+        for row, counter in enumerate(counters):
+            if not present[counter]:
+                present[counter] = 1
+                self._len += 1
+            for key, column in self.columns.items():
+                column[counter] = (
+                    datum_kwargs[key][row] if key in datum_kwargs else _MISSING
+                )
+
+    def get(self, counter: int) -> dict:
+        return {
+            key: column[counter]
+            for key, column in self.columns.items()
+            if column[counter] is not _MISSING
+        }
+
+    def get_range(self, start: int, stop: int) -> list[dict] | None:
+        "Return the datum_kwargs for a range of counters, or None if any is absent."
+        if stop > len(self.present) or self.present.count(0, start, stop):
+            return None
+        keys = list(self.columns)
+        if not keys:
+            return [{} for _ in range(start, stop)]
+        rows = zip(*(self.columns[key][start:stop] for key in keys), strict=True)
+        if self.uniform:
+            return [dict(zip(keys, row, strict=True)) for row in rows]
+        return [
+            {
+                key: value
+                for key, value in zip(keys, row, strict=True)
+                if value is not _MISSING
+            }
+            for row in rows
+        ]
+
+    def discard(self, counter: int) -> None:
+        if counter in self:
+            self.present[counter] = 0
+            self._len -= 1
+            for column in self.columns.values():
+                column[counter] = _MISSING
+
+
 # A "coercion funcion" is a hook that Filler can use to, for example, ensure
 # all the external data read in my handlers is an *actual* numpy array as
 # opposed to some other array-like such as h5py.Dataset or dask.array.Array,
@@ -464,7 +1169,9 @@ class HandlerRegistryView(collections.abc.Mapping):
 # The "state provided by the Filler", mentioned above is passed into the
 # coercion functions below as ``filler_state``. It is a namespace containing
 # information that may be useful for the coercion functions.  Currently, it has
-# ``filler_state.descriptor`` and ``filler_state.key``. More may be added in
+# ``filler_state.descriptor`` and ``filler_state.key``, and while a handler is
+# being called ``filler_state.resource`` and ``filler_state.datum`` (or
+# ``filler_state.datums`` for a batched ``get_many`` call). More may be added in
 # the future if the need arises. Ultimately, this is necessary because Resource
 # documents don't know the shape and dtype of the data that they reference.
 # That situation could be improved in the future; to some degree this is a
@@ -486,7 +1193,15 @@ def as_is(handler_class, filler_state) -> type:
 
 @no_type_check
 def force_numpy(handler_class: type, filler_state) -> Any:
-    "A coercion that makes handler_class.__call__ return actual numpy.ndarray."
+    """
+    A coercion that makes handler_class.__call__ return actual numpy.ndarray.
+
+    Handlers that set a true ``returns_numpy`` class attribute, such as those in
+    :mod:`event_model.stream_handlers`, already return arrays (possibly views
+    of memory-mapped files) and are returned unchanged.
+    """
+    if getattr(handler_class, "returns_numpy", False):
+        return handler_class
 
     class Subclass(handler_class):
         def __call__(self, *args, **kwargs):
@@ -494,6 +1209,14 @@ def force_numpy(handler_class: type, filler_state) -> Any:
             result_as_array = numpy.asarray(raw_result)
             return result_as_array
 
+    if hasattr(handler_class, "get_many"):
+
+        def get_many(self, datum_kwargs_list):
+            raw_result = handler_class.get_many(self, datum_kwargs_list)
+            return numpy.asarray(raw_result)
+
+        Subclass.get_many = get_many
+
     Subclass.__name__ = f"Subclassed{handler_class.__name__}"
     Subclass.__qualname__ = f"Subclassed{handler_class.__qualname__}"
     return Subclass
@@ -538,6 +1261,32 @@ def register_coercion(name: str, func: Callable, overwrite: bool = False) -> Non
 register_coersion = register_coercion  # back-compat for a spelling mistake
 
 
+def _payload_nbytes(payload: Any) -> int:
+    "Estimate the memory used by a loaded payload, for bounding prefetch."
+    nbytes = getattr(payload, "nbytes", None)
+    if nbytes is None:
+        nbytes = sys.getsizeof(payload)
+    return int(nbytes)
+
+
+@dataclass
+class _PrefetchedPage:
+    "The payloads of (some of) the Datums of one DatumPage, loading or loaded."
+
+    future: concurrent.futures.Future
+    nbytes: int | None = None  # known once the future is done
+
+    def loaded_nbytes(self) -> int:
+        if self.nbytes is None:
+            if not self.future.done():
+                return 0
+            try:
+                self.nbytes = sum(map(_payload_nbytes, self.future.result()))
+            except Exception:
+                self.nbytes = 0
+        return self.nbytes
+
+
 class Filler(DocumentRouter):
     """Pass documents through, loading any externally-referenced data.
 
@@ -573,6 +1322,14 @@ class Filler(DocumentRouter):
         typically implemented using a class that implements ``__init__`` and
         ``__call__``, with the respective signatures. But in general it may be
         any callable-that-returns-a-callable.
+
+        A handler instance may optionally implement::
+
+            handler_instance.get_many(list_of_datum_kwargs)
+
+        returning an array (or any sequence) with one item per entry in
+        ``list_of_datum_kwargs``. When filling an EventPage, all the rows
+        that reference the same Resource are then loaded with one call.
     include : Iterable
         The set of fields to fill. By default all unfilled fields are filled.
         This parameter is mutually incompatible with the ``exclude`` parameter.
@@ -588,11 +1345,15 @@ class Filler(DocumentRouter):
         Default is 'as_is'. Other options (e.g. 'delayed') may be registered by
         external packages at runtime.
     handler_cache : dict, optional
-        A cache of handler instances. If None, a dict is used.
+        A cache of handler instances. If None, a dict is used. Any mutable
+        mapping may be given, such as an :class:`LRUCache` to bound the number
+        of open handlers.
     resource_cache : dict, optional
         A cache of Resource documents. If None, a dict is used.
     datum_cache : dict, optional
-        A cache of Datum documents. If None, a dict is used.
+        A cache of Datum documents. If None, a :class:`DatumPageCache` is used,
+        which keeps DatumPages in their columnar form. Any mutable mapping may
+        be given, such as an :class:`LRUCache` to bound the memory used.
     descriptor_cache : dict, optional
         A cache of EventDescriptor documents. If None, a dict is used.
     stream_resource_cache : dict, optional
@@ -607,10 +1368,56 @@ class Filler(DocumentRouter):
         between subsequent attempts. Set to ``None`` to try only once before
         raising ``DataNotAccessible``. A subclass may catch this exception and
         implement a different retry mechanism --- for example using a different
-        implementation of sleep from an async framework.  But by default, a
+        implementation of sleep from an async framework, as
+        :class:`AsyncFiller` does for asyncio.  But by default, a
         sequence of several retries with increasing sleep intervals is used.
         The default sequence should not be considered stable; it may change at
         any time as the authors tune it.
+    executor : concurrent.futures.Executor, optional
+        If given, data referenced by different Resources (or different fields)
+        in the same EventPage or Event is loaded concurrently, by submitting
+        one task per ``(field, resource uid, spec)`` to this executor. This is
+        useful when loading is dominated by I/O latency. The filled page is
+        assembled in row order regardless. The executor is not shut down by
+        the Filler, and it is not preserved when the Filler is pickled.
+    stream_handler_registry : dict, optional
+        Maps each StreamResource 'mimetype' to a stream handler class, used to
+        fill the ``"STREAM:"`` external data keys of Events and EventPages.
+
+        A 'stream handler class' may be any callable with the signature::
+
+            stream_handler_class(uri, **parameters)
+
+        It is expected to return a 'stream handler instance', which is also
+        callable and has the following signature::
+
+            stream_handler_instance(indices)
+
+        where ``indices`` is a ``slice`` into the stream. It is expected to
+        return an array (or any sequence) with one item per index. The rows of
+        an EventPage that fall within the ``seq_nums`` of one StreamDatum are
+        loaded with one call. Keys whose StreamResource has a mimetype not in
+        this registry, or whose StreamDatum do not cover every row, are not
+        filled. Stream handler instances are cached in ``handler_cache``.
+    prefetch : bool, optional
+        False by default. If True, the data referenced by each DatumPage
+        starts loading in background threads as soon as the DatumPage arrives,
+        and Events referencing it use the loaded payloads, hiding the latency
+        of the file system. The background threads are those of ``executor``,
+        if given, or else of an executor owned by the Filler, which is shut
+        down when the Filler is closed. Because the Event is not known yet,
+        the state passed to coercion functions has no descriptor or key, so
+        only the 'as_is' and 'force_numpy' coercions may be used. Payloads
+        that are never used (e.g. of excluded fields) are dropped when a
+        RunStop document arrives.
+    prefetch_datums : int, optional
+        The maximum number of Datums that are prefetched but not yet used.
+        1000 by default. Datums beyond this window are loaded when their
+        Event arrives, as usual.
+    prefetch_bytes : int, optional
+        The maximum memory held by prefetched payloads that are not yet used,
+        estimated from their ``nbytes``. Prefetching pauses once it is
+        reached. Unbounded by default.
 
     Raises
     ------
@@ -637,6 +1444,8 @@ class Filler(DocumentRouter):
     >>> del filler  # Free up memory from potentially large caches.
     """
 
+    _supports_prefetch = True
+
     def __init__(
         self,
         handler_registry: dict,
@@ -645,14 +1454,19 @@ class Filler(DocumentRouter):
         exclude: Iterable | None = None,
         root_map: dict | None = None,
         coerce: str = "as_is",
-        handler_cache: dict | None = None,
-        resource_cache: dict | None = None,
-        datum_cache: dict | None = None,
-        descriptor_cache: dict | None = None,
-        stream_resource_cache: dict | None = None,
-        stream_datum_cache: dict | None = None,
+        handler_cache: collections.abc.MutableMapping | None = None,
+        resource_cache: collections.abc.MutableMapping | None = None,
+        datum_cache: collections.abc.MutableMapping | None = None,
+        descriptor_cache: collections.abc.MutableMapping | None = None,
+        stream_resource_cache: collections.abc.MutableMapping | None = None,
+        stream_datum_cache: collections.abc.MutableMapping | None = None,
         inplace: bool | None = None,
         retry_intervals: list[float] | None = None,
+        executor: concurrent.futures.Executor | None = None,
+        stream_handler_registry: dict | None = None,
+        prefetch: bool = False,
+        prefetch_datums: int = 1000,
+        prefetch_bytes: int | None = None,
     ) -> None:
         if retry_intervals is None:
             retry_intervals = [
@@ -693,6 +1507,16 @@ class Filler(DocumentRouter):
                 f"The valid options are {set(_coercion_registry)}."
             ) from error
         self._coerce = coerce
+        if prefetch and not self._supports_prefetch:
+            raise EventModelValueError(
+                f"{type(self).__name__} does not support prefetch=True."
+            )
+        if prefetch and coerce not in ("as_is", "force_numpy"):
+            raise EventModelValueError(
+                f"The option coerce={coerce!r} cannot be used with "
+                f"prefetch=True, because the data is loaded before the Events "
+                f"that reference it are known."
+            )
 
         # See comments on coerision functions above for the use of
         # _current_state, which is passed to coercion functions' `filler_state`
@@ -703,6 +1527,13 @@ class Filler(DocumentRouter):
         for spec, handler_class in handler_registry.items():
             self.register_handler(spec, handler_class)
         self.handler_registry = HandlerRegistryView(self._handler_registry)
+        self._unpatched_stream_handler_registry: dict = {}
+        self._stream_handler_registry: dict = {}
+        for mimetype, handler_class in (stream_handler_registry or {}).items():
+            self.register_stream_handler(mimetype, handler_class)
+        self.stream_handler_registry = HandlerRegistryView(
+            self._stream_handler_registry
+        )
         if include is not None:
             warnings.warn(
                 "In a future release of event-model, the argument `include` "
@@ -738,9 +1569,18 @@ class Filler(DocumentRouter):
         self._descriptor_cache = descriptor_cache
         self._stream_resource_cache = stream_resource_cache
         self._stream_datum_cache = stream_datum_cache
+        # Map (EventDescriptor UID, data key) to a list of the StreamDatum for
+        # that key, sorted by the start of their seq_nums, and a list of those
+        # starts, for bisection.
+        self._stream_datum_index: dict = {}
+        # StreamDatum received before their StreamResource, to be indexed when
+        # Events are filled.
+        self._unindexed_stream_datums: list = []
         if retry_intervals is None:
             retry_intervals = []
         self.retry_intervals = retry_intervals
+        self._executor = executor
+        self._init_prefetch(prefetch, prefetch_datums, prefetch_bytes)
         self._closed = False
 
     def __eq__(self, other: Any) -> bool:
@@ -765,6 +1605,7 @@ class Filler(DocumentRouter):
             "inplace": self._inplace,
             "coercion_func": self._coerce,
             "handler_registry": self._unpatched_handler_registry,
+            "stream_handler_registry": self._unpatched_stream_handler_registry,
             "include": self.include,
             "exclude": self.exclude,
             "root_map": self.root_map,
@@ -775,6 +1616,9 @@ class Filler(DocumentRouter):
             "stream_resource_cache": self._stream_resource_cache,
             "stream_datum_cache": self._stream_datum_cache,
             "retry_intervals": self.retry_intervals,
+            "prefetch": self._prefetch,
+            "prefetch_datums": self._prefetch_datums,
+            "prefetch_bytes": self._prefetch_bytes,
         }
 
     def __setstate__(self, d: dict) -> None:
@@ -790,6 +1634,13 @@ class Filler(DocumentRouter):
         for spec, handler_class in d["handler_registry"].items():
             self.register_handler(spec, handler_class)
         self.handler_registry = HandlerRegistryView(self._handler_registry)
+        self._unpatched_stream_handler_registry = {}
+        self._stream_handler_registry = {}
+        for mimetype, handler_class in d.get("stream_handler_registry", {}).items():
+            self.register_stream_handler(mimetype, handler_class)
+        self.stream_handler_registry = HandlerRegistryView(
+            self._stream_handler_registry
+        )
         self.include = d["include"]
         self.exclude = d["exclude"]
         self.root_map = d["root_map"]
@@ -799,12 +1650,39 @@ class Filler(DocumentRouter):
         self._descriptor_cache = d["descriptor_cache"]
         self._stream_resource_cache = d["stream_resource_cache"]
         self._stream_datum_cache = d["stream_datum_cache"]
+        self._stream_datum_index = {}
+        self._unindexed_stream_datums = []
+        for stream_datum in self._stream_datum_cache.values():
+            self._index_stream_datum(stream_datum)
         retry_intervals = d["retry_intervals"]
         if retry_intervals is None:
             retry_intervals = []
         self._retry_intervals = retry_intervals
+        self._executor = None
+        self._init_prefetch(
+            d.get("prefetch", False),
+            d.get("prefetch_datums", 1000),
+            d.get("prefetch_bytes"),
+        )
         self._closed = False
 
+    def _init_prefetch(
+        self, prefetch: bool, prefetch_datums: int, prefetch_bytes: int | None
+    ) -> None:
+        self._prefetch = prefetch
+        self._prefetch_datums = prefetch_datums
+        self._prefetch_bytes = prefetch_bytes
+        # Map datum_id to the _PrefetchedPage loading it and its position in
+        # that page's payloads.
+        self._prefetched: dict = {}
+        self._prefetch_executor: Any = self._executor
+        self._owns_prefetch_executor = False
+        if prefetch and self._executor is None:
+            self._prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="event_model_prefetch"
+            )
+            self._owns_prefetch_executor = True
+
     @property
     def retry_intervals(self) -> list:
         return self._retry_intervals
@@ -825,8 +1703,8 @@ class Filler(DocumentRouter):
         return {}
 
     @staticmethod
-    def get_default_datum_cache() -> dict:
-        return {}
+    def get_default_datum_cache() -> collections.abc.MutableMapping:
+        return DatumPageCache()
 
     @staticmethod
     def get_default_handler_cache() -> dict:
@@ -850,20 +1728,27 @@ class Filler(DocumentRouter):
         *,
         root_map: dict | None = None,
         coerce: str | None = None,
-        handler_cache: dict | None = None,
-        resource_cache: dict | None = None,
-        datum_cache: dict | None = None,
-        descriptor_cache: dict | None = None,
-        stream_resource_cache: dict | None = None,
-        stream_datum_cache: dict | None = None,
+        handler_cache: collections.abc.MutableMapping | None = None,
+        resource_cache: collections.abc.MutableMapping | None = None,
+        datum_cache: collections.abc.MutableMapping | None = None,
+        descriptor_cache: collections.abc.MutableMapping | None = None,
+        stream_resource_cache: collections.abc.MutableMapping | None = None,
+        stream_datum_cache: collections.abc.MutableMapping | None = None,
         inplace: bool | None = None,
         retry_intervals: list | None = None,
+        executor: concurrent.futures.Executor | None = None,
+        stream_handler_registry: dict | None = None,
+        prefetch: bool | None = None,
+        prefetch_datums: int | None = None,
+        prefetch_bytes: int | None = None,
     ) -> "Filler":
         """
         Create a new Filler instance from this one.
 
-        By default it will be created with the same settings that this Filler
-        has. Individual settings may be overridden here.
+        The new instance is of the same class as this one, e.g. an
+        :class:`AsyncFiller`. By default it will be created with the same
+        settings that this Filler has. Individual settings may be overridden
+        here.
 
         The clone does *not* share any caches or internal state with the
         original.
@@ -878,7 +1763,17 @@ class Filler(DocumentRouter):
             inplace = self.inplace
         if retry_intervals is None:
             retry_intervals = self.retry_intervals
-        return Filler(
+        if executor is None:
+            executor = self._executor
+        if stream_handler_registry is None:
+            stream_handler_registry = self._unpatched_stream_handler_registry
+        if prefetch is None:
+            prefetch = self._prefetch
+        if prefetch_datums is None:
+            prefetch_datums = self._prefetch_datums
+        if prefetch_bytes is None:
+            prefetch_bytes = self._prefetch_bytes
+        return type(self)(
             handler_registry,
             root_map=root_map,
             coerce=coerce,
@@ -890,6 +1785,11 @@ class Filler(DocumentRouter):
             stream_datum_cache=stream_datum_cache,
             inplace=inplace,
             retry_intervals=retry_intervals,
+            executor=executor,
+            stream_handler_registry=stream_handler_registry,
+            prefetch=prefetch,
+            prefetch_datums=prefetch_datums,
+            prefetch_bytes=prefetch_bytes,
         )
 
     def register_handler(
@@ -956,19 +1856,143 @@ class Filler(DocumentRouter):
                     del self._handler_cache[key]
         return handler
 
+    def register_stream_handler(
+        self, mimetype: str, handler: Any, overwrite: bool = False
+    ) -> None:
+        """
+        Register a stream handler, for StreamResources of a given mimetype.
+
+        Parameters
+        ----------
+        mimetype: str
+        handler: StreamHandler
+        overwrite: boolean, optional
+            False by default
+
+        Raises
+        ------
+        DuplicateHandler
+            If a handler is already registered for mimetype and overwrite is
+            False
+        """
+        if (not overwrite) and (mimetype in self._stream_handler_registry):
+            original = self._unpatched_stream_handler_registry[mimetype]
+            if original is handler:
+                return
+            raise DuplicateHandler(
+                f"There is already a stream handler registered for the mimetype "
+                f"{mimetype!r}. Use overwrite=True to deregister the original.\n"
+                f"Original: {original}\n"
+                f"New: {handler}"
+            )
+        self.deregister_stream_handler(mimetype)
+        self._unpatched_stream_handler_registry[mimetype] = handler
+        self._stream_handler_registry[mimetype] = self._coercion_func(
+            handler, self._current_state
+        )
+
+    def deregister_stream_handler(self, mimetype: str) -> Any:
+        """
+        Deregister a stream handler.
+
+        If no handler is registered for this mimetype, it is no-op and returns
+        None.
+
+        Parameters
+        ----------
+        mimetype: str
+
+        Returns
+        -------
+        handler: StreamHandler or None
+        """
+        handler = self._stream_handler_registry.pop(mimetype, None)
+        if handler is not None:
+            self._unpatched_stream_handler_registry.pop(mimetype)
+            # Stream handler instances share the cache of handler instances.
+            for key in list(self._handler_cache):
+                resource_uid, spec_ = key
+                if mimetype == spec_:
+                    del self._handler_cache[key]
+        return handler
+
     def resource(self, doc: Resource) -> Resource:
         # Defer creating the handler instance until we actually need it, when
         # we fill the first Event field that requires this Resource.
         self._resource_cache[doc["uid"]] = doc
         return doc
 
-    # Handlers operate document-wise, so we'll explode pages into individual
-    # documents.
-
     def datum_page(self, doc: DatumPage) -> DatumPage:
-        datum = self.datum  # Avoid attribute lookup in hot loop.
-        for datum_doc in unpack_datum_page(doc):
-            datum(datum_doc)
+        if isinstance(self._datum_cache, DatumPageCache) and (
+            type(self).datum is Filler.datum
+        ):
+            # Keep the page as it is. Datum documents are built as needed.
+            self._datum_cache.add_page(doc)
+        else:
+            # Otherwise explode the page into individual documents.
+            datum = self.datum  # Avoid attribute lookup in hot loop.
+            for datum_doc in unpack_datum_page(doc):
+                datum(datum_doc)
+        if self._prefetch:
+            self._prefetch_datum_page(doc)
+        return doc
+
+    def _prefetch_datum_page(self, doc: DatumPage) -> None:
+        "Start loading the data referenced by a DatumPage in the background."
+        budget = self._prefetch_datums - len(self._prefetched)
+        if budget <= 0:
+            return
+        if self._prefetch_bytes is not None:
+            pages = {id(page): page for page, _ in self._prefetched.values()}
+            loaded = sum(page.loaded_nbytes() for page in pages.values())
+            if loaded >= self._prefetch_bytes:
+                return
+        resource = self._resource_cache.get(doc["resource"])
+        if resource is None or resource["spec"] not in self._handler_registry:
+            return  # Leave any error to be reported when filling.
+        datum_docs = [
+            datum_doc
+            for datum_doc in itertools.islice(unpack_datum_page(doc), budget)
+            if datum_doc["datum_id"] not in self._prefetched
+        ]
+        if not datum_docs:
+            return
+        # Create the handler here, so that workers never race to create and
+        # cache the same handler.
+        handler = self._get_handler_maybe_cached(resource)
+        future = self._prefetch_executor.submit(
+            self._load_datums, None, None, resource, handler, datum_docs
+        )
+        page = _PrefetchedPage(future)
+        for i, datum_doc in enumerate(datum_docs):
+            self._prefetched[datum_doc["datum_id"]] = (page, i)
+
+    def _take_prefetched(self, datum_id: str) -> Any:
+        """
+        Return the prefetched payload of a Datum, waiting for it if necessary.
+
+        Returns ``_MISSING`` if it was not prefetched, or if prefetching it
+        failed, in which case it is to be loaded as usual.
+        """
+        try:
+            page, i = self._prefetched.pop(datum_id)
+        except KeyError:
+            return _MISSING
+        try:
+            return page.future.result()[i]
+        except Exception:
+            # Loading it again reports the error, unless the data has become
+            # accessible in the meantime.
+            return _MISSING
+
+    def _clear_prefetched(self) -> None:
+        for page, _ in self._prefetched.values():
+            page.future.cancel()
+        self._prefetched.clear()
+
+    def stop(self, doc: RunStop) -> RunStop:
+        if self._prefetched:
+            self._clear_prefetched()
         return doc
 
     def datum(self, doc: Datum) -> Datum:
@@ -981,13 +2005,47 @@ class Filler(DocumentRouter):
 
     def stream_datum(self, doc: StreamDatum) -> StreamDatum:
         self._stream_datum_cache[doc["uid"]] = doc
+        self._index_stream_datum(doc)
         return doc
 
+    def _index_stream_datum(self, doc: StreamDatum) -> None:
+        """
+        Index a StreamDatum by its descriptor and data key.
+
+        If its StreamResource is unknown, it is left to be indexed when Events
+        are filled, as the Resource of a Datum is only looked up then.
+        """
+        try:
+            stream_resource = self._stream_resource_cache[doc["stream_resource"]]
+        except KeyError:
+            self._unindexed_stream_datums.append(doc)
+            return
+        key = (doc["descriptor"], stream_resource["data_key"])
+        stream_datums, starts = self._stream_datum_index.setdefault(key, ([], []))
+        start = doc["seq_nums"]["start"]
+        i = bisect.bisect_right(starts, start)
+        starts.insert(i, start)
+        stream_datums.insert(i, doc)
+
+    def _index_unindexed_stream_datums(self, descriptor: EventDescriptor) -> None:
+        """
+        Index the StreamDatum whose StreamResource has arrived since.
+
+        Raises UnresolvableForeignKeyError if a StreamDatum of this descriptor
+        still refers to an unknown StreamResource.
+        """
+        unindexed, self._unindexed_stream_datums = self._unindexed_stream_datums, []
+        for doc in unindexed:
+            self._index_stream_datum(doc)
+        for doc in self._unindexed_stream_datums:
+            if doc["descriptor"] == descriptor["uid"]:
+                raise UnresolvableForeignKeyError(
+                    doc["stream_resource"],
+                    f"StreamDatum with uid {doc['uid']} refers to unknown "
+                    f"StreamResource uid {doc['stream_resource']}",
+                )
+
     def event_page(self, doc: EventPage) -> EventPage:
-        # TODO We may be able to fill a page in place, and that may be more
-        # efficient than unpacking the page in to Events, filling them, and the
-        # re-packing a new page. But that seems tricky in general since the
-        # page may be implemented as a DataFrame or dict, etc.
         filled_doc = self.fill_event_page(
             doc, include=self.include, exclude=self.exclude
         )
@@ -1004,38 +2062,223 @@ class Filler(DocumentRouter):
         exclude: Iterable | None = None,
         inplace: bool | None = None,
     ) -> EventPage:
-        filled_events = []
-        for event_doc in unpack_event_page(doc):
-            filled_events.append(
-                self.fill_event(
-                    event_doc, include=include, exclude=exclude, inplace=True
-                )
-            )
-        filled_doc = pack_event_page(*filled_events)
-        if inplace is None:
-            inplace = self._inplace
-        if inplace:
-            doc["data"] = filled_doc["data"]
-            doc["filled"] = filled_doc["filled"]
-            return doc
-        else:
-            return filled_doc
+        # Fill the page column-by-column, without unpacking it into Events. Only
+        # the columns that are actually filled are replaced; all others are
+        # shared with the original page.
+        descriptor, groups = self._plan_event_page_fill(doc, include, exclude)
+        streams = self._plan_stream_fill(
+            doc, descriptor, doc["seq_num"], include, exclude
+        )
+        with self._deferred_handler_close():
+            payloads = self._load_groups(descriptor, groups)
+            stream_payloads = self._load_streams(streams)
+        filled_doc = self._apply_event_page_fill(doc, groups, payloads, inplace)
+        return self._apply_stream_fill(filled_doc, stream_payloads, page=True)
 
-    def get_handler(self, resource: Resource) -> Any:
+    def _plan_event_page_fill(
+        self,
+        doc: EventPage,
+        include: Iterable | None,
+        exclude: Iterable | None,
+    ) -> tuple[EventDescriptor, dict]:
         """
-        Return a new Handler instance for this Resource.
-
-        Parameters
-        ----------
-        resource: Resource
+        Resolve the Datums referenced by the rows of an EventPage to be filled.
 
-        Returns
-        -------
-        handler: Handler
+        Returns the descriptor and the rows grouped by column and by handler,
+        as expected by ``_load_groups``.
         """
-        if self._closed:
-            raise EventModelRuntimeError(
-                "This Filler has been closed and is no longer usable."
+        descriptor = self._descriptor_cache[doc["descriptor"]]
+        self._current_state.descriptor = descriptor
+        needs_filling, from_datakeys = _page_needs_filling(doc, descriptor)
+        # Group the rows to fill by column and by handler, so that handlers
+        # that support batched reads can load all of a Resource's rows in one
+        # call, and so that different Resources can be loaded concurrently.
+        groups: defaultdict = defaultdict(list)
+        for key, rows in needs_filling.items():
+            if exclude is not None and key in exclude:
+                continue
+            if include is not None and key not in include:
+                continue
+            if _is_stream_key(descriptor, key):
+                continue  # See _plan_stream_fill.
+            try:
+                datum_ids = doc["data"][key]
+            except KeyError as err:
+                raise _mismatched_data_keys(doc, descriptor, from_datakeys) from err
+            fill_rows = [row for row, needs_fill in enumerate(rows) if needs_fill]
+            datum_docs = self._get_many_datums([datum_ids[row] for row in fill_rows])
+            for row, datum_doc in zip(fill_rows, datum_docs, strict=True):
+                datum_doc, resource = self._resolve_datum(
+                    datum_ids[row], doc["uid"][row], datum_doc
+                )
+                groups[(key, resource["uid"], resource["spec"])].append(
+                    (row, datum_doc)
+                )
+        return descriptor, groups
+
+    def _get_many_datums(self, datum_ids: list) -> list:
+        """
+        Look up many Datum in bulk, if the datum cache supports it.
+
+        Returns a list with the Datum documents, or with None where they are to
+        be looked up one by one by ``_resolve_datum``.
+        """
+        if isinstance(self._datum_cache, DatumPageCache):
+            try:
+                return self._datum_cache.get_many(datum_ids)
+            except KeyError:
+                pass  # Let _resolve_datum report which one is missing.
+        return [None] * len(datum_ids)
+
+    def _apply_event_page_fill(
+        self,
+        doc: EventPage,
+        groups: dict,
+        payloads: dict,
+        inplace: bool | None,
+    ) -> EventPage:
+        "Write the loaded payloads into (a shallow copy of) an EventPage."
+        if inplace is None:
+            inplace = self._inplace
+        if inplace:
+            filled_doc = doc
+        else:
+            filled_doc = cast(EventPage, dict(doc))
+            filled_doc["data"] = dict(doc["data"])
+            if "filled" in doc:
+                filled_doc["filled"] = dict(doc["filled"])
+        columns: dict = {}
+        for group_key, items in groups.items():
+            key = group_key[0]
+            if key not in columns:
+                N = len(doc["uid"])
+                columns[key] = (
+                    list(doc["data"][key]),
+                    list(doc.get("filled", {}).get(key, [False] * N)),
+                )
+            data_column, filled_column = columns[key]
+            for (row, datum_doc), payload in zip(
+                items, payloads[group_key], strict=True
+            ):
+                data_column[row] = payload
+                filled_column[row] = datum_doc["datum_id"]
+        for key, (data_column, filled_column) in columns.items():
+            # Here we are intentionally modifying filled_doc in place.
+            filled_doc["data"][key] = data_column
+            filled_doc.setdefault("filled", {})[key] = filled_column
+        self._clear_current_state()
+        return filled_doc
+
+    def _clear_current_state(self) -> None:
+        self._current_state.key = None
+        self._current_state.descriptor = None
+        self._current_state.resource = None
+        self._current_state.datum = None
+
+    def _load_groups(self, descriptor: EventDescriptor, groups: dict) -> dict:
+        """
+        Load the payloads for groups of Datums, concurrently if possible.
+
+        Each key of ``groups`` is ``(data_key, resource_uid, spec)`` and each
+        value is a list of ``(row, datum_doc)``. Returns a dict mapping the
+        same keys to lists of payloads, in row order.
+        """
+        prefetched: dict = {}
+        if self._prefetched:
+            groups, prefetched = self._split_prefetched(groups)
+        # Create any handlers that are not yet cached here, in this thread, so
+        # that workers never race to create and cache the same handler.
+        tasks = {}
+        for group_key, items in groups.items():
+            key, resource_uid, _ = group_key
+            resource = self._resource_cache[resource_uid]
+            handler = self._get_handler_maybe_cached(resource)
+            datum_docs = [datum_doc for _, datum_doc in items]
+            tasks[group_key] = (descriptor, key, resource, handler, datum_docs)
+        if self._executor is None or len(tasks) < 2:
+            payloads = {
+                group_key: self._load_datums(*task) for group_key, task in tasks.items()
+            }
+        else:
+            futures = {
+                group_key: self._executor.submit(self._load_datums, *task)
+                for group_key, task in tasks.items()
+            }
+            payloads = {
+                group_key: future.result() for group_key, future in futures.items()
+            }
+        if prefetched:
+            payloads = self._merge_prefetched(payloads, prefetched)
+        return payloads
+
+    def _split_prefetched(self, groups: dict) -> tuple[dict, dict]:
+        """
+        Take the prefetched payloads of the groups planned for loading.
+
+        Returns the groups with the items still to be loaded and a dict mapping
+        group keys to their payloads, with ``_MISSING`` for those to be loaded.
+        """
+        remaining = {}
+        prefetched = {}
+        for group_key, items in groups.items():
+            payloads = [
+                self._take_prefetched(datum_doc["datum_id"]) for _, datum_doc in items
+            ]
+            missing = [
+                item
+                for item, payload in zip(items, payloads, strict=True)
+                if payload is _MISSING
+            ]
+            if len(missing) < len(items):
+                prefetched[group_key] = payloads
+            if missing:
+                remaining[group_key] = missing
+        return remaining, prefetched
+
+    def _merge_prefetched(self, loaded: dict, prefetched: dict) -> dict:
+        "Combine payloads from _split_prefetched with those loaded afterwards."
+        for group_key, payloads in prefetched.items():
+            rest = iter(loaded.get(group_key, ()))
+            loaded[group_key] = [
+                next(rest) if payload is _MISSING else payload for payload in payloads
+            ]
+        return loaded
+
+    def get_handler(self, resource: Resource) -> Any:
+        """
+        Return a new Handler instance for this Resource.
+
+        Parameters
+        ----------
+        resource: Resource
+
+        Returns
+        -------
+        handler: Handler
+        """
+        handler_class, resource_path, error_to_raise = self._prepare_handler(resource)
+        handler = _attempt_with_retries(
+            func=handler_class,
+            args=(resource_path,),
+            kwargs=resource["resource_kwargs"],
+            intervals=[0] + self.retry_intervals,
+            error_to_catch=IOError,
+            error_to_raise=error_to_raise,
+        )
+        return handler
+
+    def _prepare_handler(
+        self, resource: Resource
+    ) -> tuple[Any, str, "EventModelError"]:
+        """
+        Look up the handler class for this Resource and apply root_map.
+
+        Returns the handler class, the full resource path, and the error to
+        raise if the handler cannot be instantiated.
+        """
+        if self._closed:
+            raise EventModelRuntimeError(
+                "This Filler has been closed and is no longer usable."
             )
         try:
             handler_class = self.handler_registry[resource["spec"]]
@@ -1064,16 +2307,17 @@ class Filler(DocumentRouter):
             )
         else:
             msg += f"Its 'root' field {original_root} was *not* modified by root_map."
-        error_to_raise = EventModelError(msg)
-        handler = _attempt_with_retries(
-            func=handler_class,
-            args=(resource_path,),
-            kwargs=resource["resource_kwargs"],
-            intervals=[0] + self.retry_intervals,
-            error_to_catch=IOError,
-            error_to_raise=error_to_raise,
-        )
-        return handler
+        return handler_class, resource_path, EventModelError(msg)
+
+    def _deferred_handler_close(self) -> contextlib.AbstractContextManager:
+        """
+        Keep the handlers evicted from the handler cache open until the end of
+        this context, if the cache supports it, as LRUCache does.
+        """
+        deferred_close = getattr(self._handler_cache, "deferred_close", None)
+        if deferred_close is None:
+            return contextlib.nullcontext()
+        return deferred_close()
 
     def _get_handler_maybe_cached(self, resource: Resource) -> Any:
         "Get a cached handler for this resource or make one and cache it."
@@ -1085,6 +2329,106 @@ class Filler(DocumentRouter):
             self._handler_cache[key] = handler
         return handler
 
+    def _resolve_datum(
+        self, datum_id: str, event_uid: str, datum_doc: Datum | None = None
+    ) -> tuple[Datum, Resource]:
+        """
+        Look up the cached Datum and Resource referenced by an Event.
+
+        The Datum may be given, if it was already looked up.
+        """
+        # Look up the cached Datum doc.
+        if datum_doc is None:
+            try:
+                datum_doc = self._datum_cache[datum_id]
+            except KeyError as err:
+                raise UnresolvableForeignKeyError(
+                    datum_id,
+                    f"Event with uid {event_uid} refers to unknown Datum "
+                    f"datum_id {datum_id}",
+                ) from err
+        resource_uid = datum_doc["resource"]
+        # Look up the cached Resource.
+        try:
+            resource = self._resource_cache[resource_uid]
+        except KeyError as err:
+            raise UnresolvableForeignKeyError(
+                resource_uid,
+                f"Datum with id {datum_id} refers to unknown Resource "
+                f"uid {resource_uid}",
+            ) from err
+        return datum_doc, resource
+
+    def _load_datum(self, handler: Any, resource: Resource, datum_doc: Datum) -> Any:
+        "Load the payload referenced by one Datum."
+        self._current_state.resource = resource
+        self._current_state.datum = datum_doc
+        error_to_raise = DataNotAccessible(
+            f"Filler was unable to load the data referenced by "
+            f"the Datum document {datum_doc} and the Resource "
+            f"document {resource}."
+        )
+        return _attempt_with_retries(
+            func=handler,
+            args=(),
+            kwargs=datum_doc["datum_kwargs"],
+            intervals=[0] + self.retry_intervals,
+            error_to_catch=IOError,
+            error_to_raise=error_to_raise,
+        )
+
+    def _load_datums(
+        self,
+        descriptor: EventDescriptor | None,
+        key: str | None,
+        resource: Resource,
+        handler: Any,
+        datum_docs: list[Datum],
+    ) -> list:
+        """
+        Load the payloads referenced by several Datums from one Resource.
+
+        If the handler instance implements ``get_many``, it is called once
+        with the list of all the datum_kwargs and is expected to return an
+        array whose first axis is the Datum. Otherwise, the handler is called
+        once per Datum.
+
+        This may be run on a worker thread, so it sets up the (thread-local)
+        state seen by the coercion functions itself. The descriptor and key are
+        None when the Datums are prefetched.
+        """
+        self._current_state.descriptor = descriptor
+        self._current_state.key = key
+        if len(datum_docs) < 2 or not hasattr(handler, "get_many"):
+            return [
+                self._load_datum(handler, resource, datum_doc)
+                for datum_doc in datum_docs
+            ]
+        self._current_state.resource = resource
+        self._current_state.datum = None
+        self._current_state.datums = datum_docs
+        error_to_raise = DataNotAccessible(
+            f"Filler was unable to load the data referenced by "
+            f"the Datum documents "
+            f"{[datum_doc['datum_id'] for datum_doc in datum_docs]} "
+            f"and the Resource document {resource}."
+        )
+        payload = _attempt_with_retries(
+            func=handler.get_many,
+            args=([datum_doc["datum_kwargs"] for datum_doc in datum_docs],),
+            kwargs={},
+            intervals=[0] + self.retry_intervals,
+            error_to_catch=IOError,
+            error_to_raise=error_to_raise,
+        )
+        self._current_state.datums = None
+        if len(payload) != len(datum_docs):
+            raise EventModelValueError(
+                f"The handler {handler!r} returned {len(payload)} items from "
+                f"get_many but {len(datum_docs)} were requested."
+            )
+        return list(payload)
+
     def fill_event(
         self,
         doc,
@@ -1092,12 +2436,28 @@ class Filler(DocumentRouter):
         exclude: Iterable | None = None,
         inplace: bool | None = None,
     ) -> Any:
-        if inplace is None:
-            inplace = self._inplace
-        if inplace:
-            filled_doc = doc
-        else:
-            filled_doc = copy.deepcopy(doc)
+        descriptor, groups = self._plan_event_fill(doc, include, exclude)
+        streams = self._plan_stream_fill(
+            doc, descriptor, [doc["seq_num"]], include, exclude
+        )
+        with self._deferred_handler_close():
+            payloads = self._load_groups(descriptor, groups)
+            stream_payloads = self._load_streams(streams)
+        filled_doc = self._apply_event_fill(doc, groups, payloads, inplace)
+        return self._apply_stream_fill(filled_doc, stream_payloads, page=False)
+
+    def _plan_event_fill(
+        self,
+        doc: Event,
+        include: Iterable | None,
+        exclude: Iterable | None,
+    ) -> tuple[EventDescriptor, dict]:
+        """
+        Resolve the Datums referenced by the fields of an Event to be filled.
+
+        Returns the descriptor and the fields grouped by handler, as expected
+        by ``_load_groups``.
+        """
         descriptor = self._descriptor_cache[doc["descriptor"]]
         from_datakeys = False
         self._current_state.descriptor = descriptor
@@ -1110,81 +2470,200 @@ class Filler(DocumentRouter):
                 key for key, val in descriptor["data_keys"].items() if "external" in val
             }
             from_datakeys = True
+        groups = {}
         for key in needs_filling:
-            self._current_state.key = key
             if exclude is not None and key in exclude:
                 continue
             if include is not None and key not in include:
                 continue
+            if _is_stream_key(descriptor, key):
+                continue  # See _plan_stream_fill.
             try:
                 datum_id = doc["data"][key]
             except KeyError as err:
-                if from_datakeys:
-                    raise MismatchedDataKeys(
-                        "The documents are not valid.  Either because they "
-                        "were recorded incorrectly in the first place, "
-                        "corrupted since, or exercising a yet-undiscovered "
-                        "bug in a reader. event['data'].keys() "
-                        "must equal descriptor['data_keys'].keys(). "
-                        f"event['data'].keys(): {doc['data'].keys()}, "
-                        "descriptor['data_keys'].keys(): "
-                        f"{descriptor['data_keys'].keys()}"
-                    ) from err
-                else:
-                    raise MismatchedDataKeys(
-                        "The documents are not valid.  Either because they "
-                        "were recorded incorrectly in the first place, "
-                        "corrupted since, or exercising a yet-undiscovered "
-                        "bug in a reader. event['filled'].keys() "
-                        "must be a subset of event['data'].keys(). "
-                        f"event['data'].keys(): {doc['data'].keys()}, "
-                        "event['filled'].keys(): "
-                        f"{doc['filled'].keys()}"
-                    ) from err
-            # Look up the cached Datum doc.
-            try:
-                datum_doc = self._datum_cache[datum_id]
-            except KeyError as err:
-                raise UnresolvableForeignKeyError(
-                    datum_id,
-                    f"Event with uid {doc['uid']} refers to unknown Datum "
-                    f"datum_id {datum_id}",
-                ) from err
-            resource_uid = datum_doc["resource"]
-            # Look up the cached Resource.
-            try:
-                resource = self._resource_cache[resource_uid]
-            except KeyError as err:
-                raise UnresolvableForeignKeyError(
-                    resource_uid,
-                    f"Datum with id {datum_id} refers to unknown Resource "
-                    f"uid {resource_uid}",
-                ) from err
-            self._current_state.resource = resource
-            self._current_state.datum = datum_doc
-            handler = self._get_handler_maybe_cached(resource)
-            error_to_raise = DataNotAccessible(
-                f"Filler was unable to load the data referenced by "
-                f"the Datum document {datum_doc} and the Resource "
-                f"document {resource}."
-            )
-            payload = _attempt_with_retries(
-                func=handler,
-                args=(),
-                kwargs=datum_doc["datum_kwargs"],
-                intervals=[0] + self.retry_intervals,
-                error_to_catch=IOError,
-                error_to_raise=error_to_raise,
-            )
+                raise _mismatched_data_keys(doc, descriptor, from_datakeys) from err
+            datum_doc, resource = self._resolve_datum(datum_id, doc["uid"])
+            groups[(key, resource["uid"], resource["spec"])] = [(0, datum_doc)]
+        return descriptor, groups
+
+    def _apply_event_fill(
+        self,
+        doc: Event,
+        groups: dict,
+        payloads: dict,
+        inplace: bool | None,
+    ) -> Event:
+        "Write the loaded payloads into (a deep copy of) an Event."
+        if inplace is None:
+            inplace = self._inplace
+        if inplace:
+            filled_doc = doc
+        else:
+            filled_doc = copy.deepcopy(doc)
+        for group_key, (payload,) in payloads.items():
+            key = group_key[0]
+            ((_, datum_doc),) = groups[group_key]
             # Here we are intentionally modifying doc in place.
             filled_doc["data"][key] = payload
-            filled_doc["filled"][key] = datum_id
-        self._current_state.key = None
-        self._current_state.descriptor = None
-        self._current_state.resource = None
-        self._current_state.datum = None
+            filled_doc.setdefault("filled", {})[key] = datum_doc["datum_id"]
+        self._clear_current_state()
+        return filled_doc
+
+    def _plan_stream_fill(
+        self,
+        doc: Any,
+        descriptor: EventDescriptor,
+        seq_nums: collections.abc.Sequence,
+        include: Iterable | None,
+        exclude: Iterable | None,
+    ) -> dict:
+        """
+        Find the StreamDatum that cover the rows of an Event or EventPage.
+
+        Returns a dict mapping each "STREAM:" data key to fill to a list of
+        ``(stream_datum, start, stop)``, the consecutive rows of the page that
+        are read as ``slice(start, stop)`` of the stream of one StreamDatum.
+        """
+        streams: dict = {}
+        if not self._stream_handler_registry:
+            return streams
+        if self._unindexed_stream_datums:
+            self._index_unindexed_stream_datums(descriptor)
+        filled = doc.get("filled", {})
+        for key, data_key in descriptor["data_keys"].items():
+            if data_key.get("external") != "STREAM:":
+                continue
+            if exclude is not None and key in exclude:
+                continue
+            if include is not None and key not in include:
+                continue
+            if key in doc["data"]:
+                flags = filled.get(key)
+                if not (flags is False or (isinstance(flags, list) and not any(flags))):
+                    continue  # This is filled already.
+            try:
+                stream_datums, starts = self._stream_datum_index[
+                    (descriptor["uid"], key)
+                ]
+            except KeyError:
+                continue
+            segments = _stream_segments(stream_datums, starts, seq_nums)
+            if segments is None:
+                continue  # Some rows are not covered (yet).
+            if all(
+                self._stream_resource_cache[stream_datum["stream_resource"]]["mimetype"]
+                in self._stream_handler_registry
+                for stream_datum, _, _ in segments
+            ):
+                streams[key] = segments
+        return streams
+
+    def _load_streams(self, streams: dict) -> dict:
+        """
+        Read the slices of the streams planned by ``_plan_stream_fill``.
+
+        Returns a dict mapping each data key to its column of data and the
+        StreamDatum uid of each row.
+        """
+        payloads = {}
+        for key, segments in streams.items():
+            self._current_state.key = key
+            parts = []
+            uids: list = []
+            for stream_datum, start, stop in segments:
+                stream_resource = self._stream_resource_cache[
+                    stream_datum["stream_resource"]
+                ]
+                handler = self._get_stream_handler_maybe_cached(stream_resource)
+                self._current_state.resource = stream_resource
+                self._current_state.datum = stream_datum
+                part = _attempt_with_retries(
+                    func=handler,
+                    args=(slice(start, stop),),
+                    kwargs={},
+                    intervals=[0] + self.retry_intervals,
+                    error_to_catch=IOError,
+                    error_to_raise=_stream_read_error(
+                        stream_datum, stream_resource, start, stop
+                    ),
+                )
+                _check_stream_part(handler, part, start, stop)
+                parts.append(part)
+                uids.extend([stream_datum["uid"]] * (stop - start))
+            column = parts[0] if len(parts) == 1 else _concatenate_columns(parts)
+            payloads[key] = (column, uids)
+        self._clear_current_state()
+        return payloads
+
+    def _apply_stream_fill(self, filled_doc: Any, payloads: dict, page: bool) -> Any:
+        "Write the loaded streams into the filled Event or EventPage."
+        for key, (column, uids) in payloads.items():
+            if page:
+                filled_doc["data"][key] = column
+                filled_doc.setdefault("filled", {})[key] = uids
+            else:
+                filled_doc["data"][key] = column[0]
+                filled_doc.setdefault("filled", {})[key] = uids[0]
         return filled_doc
 
+    def get_stream_handler(self, stream_resource: StreamResource) -> Any:
+        """
+        Return a new stream handler instance for this StreamResource.
+
+        Parameters
+        ----------
+        stream_resource: StreamResource
+
+        Returns
+        -------
+        handler: StreamHandler
+        """
+        handler_class, error_to_raise = self._prepare_stream_handler(stream_resource)
+        return _attempt_with_retries(
+            func=handler_class,
+            args=(stream_resource["uri"],),
+            kwargs=stream_resource["parameters"],
+            intervals=[0] + self.retry_intervals,
+            error_to_catch=IOError,
+            error_to_raise=error_to_raise,
+        )
+
+    def _prepare_stream_handler(
+        self, stream_resource: StreamResource
+    ) -> tuple[Any, "EventModelError"]:
+        """
+        Look up the stream handler class for this StreamResource.
+
+        Returns the stream handler class and the error to raise if it cannot
+        be instantiated.
+        """
+        if self._closed:
+            raise EventModelRuntimeError(
+                "This Filler has been closed and is no longer usable."
+            )
+        try:
+            handler_class = self.stream_handler_registry[stream_resource["mimetype"]]
+        except KeyError as err:
+            raise UndefinedAssetSpecification(
+                f"StreamResource document with uid {stream_resource['uid']} "
+                f"refers to mimetype {stream_resource['mimetype']!r} which is "
+                f"not defined in the Filler's stream handler registry."
+            ) from err
+        return handler_class, EventModelError(
+            f"Error instantiating stream handler class {handler_class} "
+            f"with StreamResource document {stream_resource}."
+        )
+
+    def _get_stream_handler_maybe_cached(self, stream_resource: StreamResource) -> Any:
+        "Get a cached handler for this StreamResource or make one and cache it."
+        key = (stream_resource["uid"], stream_resource["mimetype"])
+        try:
+            handler = self._handler_cache[key]
+        except KeyError:
+            handler = self.get_stream_handler(stream_resource)
+            self._handler_cache[key] = handler
+        return handler
+
     def descriptor(self, doc: EventDescriptor) -> EventDescriptor:
         self._descriptor_cache[doc["uid"]] = doc
         return doc
@@ -1205,10 +2684,17 @@ class Filler(DocumentRouter):
         # does not (e.g. they are the default caches) the gc will look after
         # them.
         self._closed = True
+        self._clear_prefetched()
+        if self._owns_prefetch_executor:
+            self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
         self._handler_cache = None
         self._resource_cache = None
         self._datum_cache = None
         self._descriptor_cache = None
+        self._stream_resource_cache = None
+        self._stream_datum_cache = None
+        self._stream_datum_index = None
+        self._unindexed_stream_datums = []
 
     @property
     def closed(self) -> bool:
@@ -1230,6 +2716,11 @@ class Filler(DocumentRouter):
         self._resource_cache.clear()
         self._descriptor_cache.clear()
         self._datum_cache.clear()
+        self._stream_resource_cache.clear()
+        self._stream_datum_cache.clear()
+        self._stream_datum_index.clear()
+        self._unindexed_stream_datums.clear()
+        self._clear_prefetched()
 
     def __exit__(self, *exc_details) -> None:
         self.close()
@@ -1284,6 +2775,162 @@ def _attempt_with_retries(
         raise error_to_raise from error
 
 
+async def _attempt_with_retries_async(
+    func,
+    args,
+    kwargs,
+    intervals: Iterable,
+    error_to_catch: type[OSError],
+    error_to_raise: EventModelError,
+    executor: concurrent.futures.Executor | None = None,
+) -> Any:
+    """
+    Return func(*args, **kwargs), using a retry loop that does not block.
+
+    This is the asyncio counterpart of ``_attempt_with_retries``. If func
+    returns an awaitable, it is awaited. If an executor is given, func is run
+    on it so that a blocking call does not stall the event loop.
+    """
+    error = None
+    loop = asyncio.get_running_loop()
+    for interval in intervals:
+        await asyncio.sleep(interval)
+        try:
+            if executor is None:
+                result = func(*args, **kwargs)
+            else:
+                result = await loop.run_in_executor(
+                    executor, functools.partial(func, *args, **kwargs)
+                )
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except error_to_catch as error_:
+            # The file may not be visible on the filesystem yet.
+            # Wait and try again. Stash the error in a variable
+            # that we can access later if we run out of attempts.
+            error = error_
+    # We have used up all our attempts. There seems to be an
+    # actual problem. Raise specified error from the error stashed above.
+    raise error_to_raise from error
+
+
+def _is_stream_key(descriptor: EventDescriptor, key: str) -> bool:
+    "Whether a data key refers to data in a StreamResource."
+    data_key: Any = descriptor["data_keys"].get(key, {})
+    return data_key.get("external") == "STREAM:"
+
+
+def _stream_segments(
+    stream_datums: list, starts: list, seq_nums: collections.abc.Sequence
+) -> list | None:
+    """
+    Map the seq_nums of the rows of an EventPage to slices of streams.
+
+    Given the StreamDatum of one data key, sorted by the starts of their
+    seq_nums, return a list of ``(stream_datum, start, stop)``, one for each
+    run of consecutive rows read as ``slice(start, stop)`` of the stream of
+    that StreamDatum, or None if some row is not covered by any StreamDatum.
+    """
+    segments: list = []
+    stream_datum: Any = None
+    stop_seq_num = previous = 0
+    for seq_num in seq_nums:
+        if stream_datum is not None and seq_num == previous + 1 < stop_seq_num:
+            segments[-1][2] += 1
+        else:
+            i = bisect.bisect_right(starts, seq_num) - 1
+            if i < 0:
+                return None
+            stream_datum = stream_datums[i]
+            stop_seq_num = stream_datum["seq_nums"]["stop"]
+            if seq_num >= stop_seq_num:
+                return None
+            start = stream_datum["indices"]["start"] + (
+                seq_num - stream_datum["seq_nums"]["start"]
+            )
+            segments.append([stream_datum, start, start + 1])
+        previous = seq_num
+    return [tuple(segment) for segment in segments]
+
+
+def _stream_read_error(
+    stream_datum: StreamDatum, stream_resource: StreamResource, start: int, stop: int
+) -> "DataNotAccessible":
+    "Build the error raised when a slice of a stream cannot be read."
+    return DataNotAccessible(
+        f"Filler was unable to load the data at indices "
+        f"{start}:{stop} referenced by the StreamDatum document "
+        f"{stream_datum} and the StreamResource document "
+        f"{stream_resource}."
+    )
+
+
+def _check_stream_part(handler: Any, part: Any, start: int, stop: int) -> None:
+    "Check that a stream handler returned one item per index requested."
+    if len(part) != stop - start:
+        raise EventModelValueError(
+            f"The stream handler {handler!r} returned {len(part)} "
+            f"items but {stop - start} were requested."
+        )
+
+
+def _page_needs_filling(
+    doc: EventPage, descriptor: EventDescriptor
+) -> tuple[dict[str, list[bool]], bool]:
+    """
+    Work out which rows of which columns of an EventPage need filling.
+
+    Returns a dict mapping each key that needs filling to a per-row list of
+    booleans, and a flag indicating whether this was inferred from the
+    descriptor because the page has no 'filled' field.
+    """
+    try:
+        filled = doc["filled"]
+    except KeyError:
+        # This document is not telling us which, if any, keys are filled.
+        # Infer that none of the external data is filled.
+        N = len(doc["uid"])
+        return {
+            key: [True] * N
+            for key, val in descriptor["data_keys"].items()
+            if "external" in val
+        }, True
+    needs_filling = {}
+    for key, column in filled.items():
+        rows = [val is False for val in column]
+        if any(rows):
+            needs_filling[key] = rows
+    return needs_filling, False
+
+
+def _mismatched_data_keys(
+    doc: collections.abc.Mapping, descriptor: EventDescriptor, from_datakeys: bool
+) -> "MismatchedDataKeys":
+    "Build the error raised when a key to be filled is missing from doc['data']."
+    if from_datakeys:
+        return MismatchedDataKeys(
+            "The documents are not valid.  Either because they "
+            "were recorded incorrectly in the first place, "
+            "corrupted since, or exercising a yet-undiscovered "
+            "bug in a reader. event['data'].keys() "
+            "must equal descriptor['data_keys'].keys(). "
+            f"event['data'].keys(): {doc['data'].keys()}, "
+            "descriptor['data_keys'].keys(): "
+            f"{descriptor['data_keys'].keys()}"
+        )
+    return MismatchedDataKeys(
+        "The documents are not valid.  Either because they "
+        "were recorded incorrectly in the first place, "
+        "corrupted since, or exercising a yet-undiscovered "
+        "bug in a reader. event['filled'].keys() "
+        "must be a subset of event['data'].keys(). "
+        f"event['data'].keys(): {doc['data'].keys()}, "
+        "event['filled'].keys(): "
+        f"{doc['filled'].keys()}"
+    )
+
+
 class NoFiller(Filler):
     """
     This does not fill the documents; it merely validates them.
@@ -1340,31 +2987,12 @@ class NoFiller(Filler):
                 continue
             if include is not None and key not in include:
                 continue
+            if _is_stream_key(descriptor, key):
+                continue  # See _plan_stream_fill.
             try:
                 datum_id = doc["data"][key]
             except KeyError as err:
-                if from_datakeys:
-                    raise MismatchedDataKeys(
-                        "The documents are not valid.  Either because they "
-                        "were recorded incorrectly in the first place, "
-                        "corrupted since, or exercising a yet-undiscovered "
-                        "bug in a reader. event['data'].keys() "
-                        "must equal descriptor['data_keys'].keys(). "
-                        f"event['data'].keys(): {doc['data'].keys()}, "
-                        "descriptor['data_keys'].keys(): "
-                        f"{descriptor['data_keys'].keys()}"
-                    ) from err
-                else:
-                    raise MismatchedDataKeys(
-                        "The documents are not valid.  Either because they "
-                        "were recorded incorrectly in the first place, "
-                        "corrupted since, or exercising a yet-undiscovered "
-                        "bug in a reader. event['filled'].keys() "
-                        "must be a subset of event['data'].keys(). "
-                        f"event['data'].keys(): {doc['data'].keys()}, "
-                        "event['filled'].keys(): "
-                        f"{doc['filled'].keys()}"
-                    ) from err
+                raise _mismatched_data_keys(doc, descriptor, from_datakeys) from err
             # Look up the cached Datum doc.
             try:
                 datum_doc = self._datum_cache[datum_id]
@@ -1389,6 +3017,290 @@ class NoFiller(Filler):
         return doc
 
 
+class AsyncFiller(Filler):
+    """
+    A Filler for use with asyncio, which loads external data without blocking.
+
+    It accepts the same parameters as :class:`Filler`. The methods
+    ``fill_event``, ``fill_event_page`` and ``__call__`` are coroutines, and
+    the retry loop waits using ``asyncio.sleep`` instead of ``time.sleep``.
+
+    Handler classes and handler instances may return awaitables, which are
+    awaited. Blocking handlers are called on the event loop's thread unless
+    an ``executor`` is given, in which case they are run on that executor.
+    Within one Event or EventPage, the data from different Resources is loaded
+    concurrently.
+
+    Because it is a coroutine, ``__call__`` cannot be used as a plain
+    ``(name, doc)`` callback, for example as the ``filler_class`` of a
+    :class:`RunRouter`, so an AsyncFiller cannot stand in for a Filler. The
+    synchronous methods ``event`` and ``event_page`` raise an error.
+
+    The ``prefetch`` parameter is not supported, because handlers may return
+    awaitables.
+
+    Examples
+    --------
+    >>> async with AsyncFiller(handler_registry, inplace=False) as filler:
+    ...     async for name, doc in stream:
+    ...         name, doc = await filler(name, doc)
+    """
+
+    _supports_prefetch = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_details) -> None:
+        self.close()
+
+    async def __call__(  # type: ignore[override]
+        self, name: str, doc: dict, validate: bool = False
+    ) -> tuple[str, dict]:
+        if self._closed:
+            raise EventModelRuntimeError(
+                "This Filler has been closed and is no longer usable."
+            )
+        if name == "event":
+            output_doc: Any = await self.fill_event(
+                doc, include=self.include, exclude=self.exclude
+            )
+        elif name == "event_page":
+            output_doc = await self.fill_event_page(
+                cast(EventPage, doc), include=self.include, exclude=self.exclude
+            )
+        elif name == "bulk_events":
+            # As in DocumentRouter.bulk_events, but awaiting each EventPage.
+            warnings.warn(
+                "The document type 'bulk_events' has been deprecated in favor of "
+                "'event_page', whose structure is a transpose of 'bulk_events'.",
+                stacklevel=2,
+            )
+            for page in bulk_events_to_event_pages(doc):
+                await self.fill_event_page(
+                    page, include=self.include, exclude=self.exclude
+                )
+            output_doc = doc
+        else:
+            # The other documents are only cached, which does not block.
+            return super().__call__(name, doc, validate)
+        if validate:
+            schema_validators[getattr(DocumentNames, name)].validate(output_doc)
+        return (name, output_doc)
+
+    def event_page(self, doc: EventPage) -> EventPage:
+        raise EventModelRuntimeError(
+            "AsyncFiller cannot fill documents synchronously. Use "
+            "`await filler('event_page', doc)` or `await filler.fill_event_page(doc)`."
+        )
+
+    def event(self, doc: Event) -> Event:
+        raise EventModelRuntimeError(
+            "AsyncFiller cannot fill documents synchronously. Use "
+            "`await filler('event', doc)` or `await filler.fill_event(doc)`."
+        )
+
+    async def fill_event_page(  # type: ignore[override]
+        self,
+        doc: EventPage,
+        include: Iterable | None = None,
+        exclude: Iterable | None = None,
+        inplace: bool | None = None,
+    ) -> EventPage:
+        descriptor, groups = self._plan_event_page_fill(doc, include, exclude)
+        streams = self._plan_stream_fill(
+            doc, descriptor, doc["seq_num"], include, exclude
+        )
+        with self._deferred_handler_close():
+            payloads = await self._load_groups_async(descriptor, groups)
+            stream_payloads = await self._load_streams_async(streams)
+        filled_doc = self._apply_event_page_fill(doc, groups, payloads, inplace)
+        return self._apply_stream_fill(filled_doc, stream_payloads, page=True)
+
+    async def fill_event(  # type: ignore[override]
+        self,
+        doc,
+        include: Iterable | None = None,
+        exclude: Iterable | None = None,
+        inplace: bool | None = None,
+    ) -> Any:
+        descriptor, groups = self._plan_event_fill(doc, include, exclude)
+        streams = self._plan_stream_fill(
+            doc, descriptor, [doc["seq_num"]], include, exclude
+        )
+        with self._deferred_handler_close():
+            payloads = await self._load_groups_async(descriptor, groups)
+            stream_payloads = await self._load_streams_async(streams)
+        filled_doc = self._apply_event_fill(doc, groups, payloads, inplace)
+        return self._apply_stream_fill(filled_doc, stream_payloads, page=False)
+
+    async def _load_streams_async(self, streams: dict) -> dict:
+        "Like Filler._load_streams, but awaiting and without blocking."
+        payloads = {}
+        for key, segments in streams.items():
+            parts = []
+            uids: list = []
+            for stream_datum, start, stop in segments:
+                stream_resource = self._stream_resource_cache[
+                    stream_datum["stream_resource"]
+                ]
+                handler = await self._get_stream_handler_maybe_cached_async(
+                    stream_resource
+                )
+                state = {
+                    "descriptor": self._descriptor_cache.get(
+                        stream_datum["descriptor"]
+                    ),
+                    "key": key,
+                    "resource": stream_resource,
+                    "datum": stream_datum,
+                    "datums": None,
+                }
+                part = await _attempt_with_retries_async(
+                    func=functools.partial(self._call_with_state, handler, state),
+                    args=(slice(start, stop),),
+                    kwargs={},
+                    intervals=[0] + self.retry_intervals,
+                    error_to_catch=IOError,
+                    error_to_raise=_stream_read_error(
+                        stream_datum, stream_resource, start, stop
+                    ),
+                    executor=self._executor,
+                )
+                _check_stream_part(handler, part, start, stop)
+                parts.append(part)
+                uids.extend([stream_datum["uid"]] * (stop - start))
+            column = parts[0] if len(parts) == 1 else _concatenate_columns(parts)
+            payloads[key] = (column, uids)
+        return payloads
+
+    async def _get_stream_handler_maybe_cached_async(
+        self, stream_resource: StreamResource
+    ) -> Any:
+        "Get a cached handler for this StreamResource or make one and cache it."
+        key = (stream_resource["uid"], stream_resource["mimetype"])
+        try:
+            handler = self._handler_cache[key]
+        except KeyError:
+            handler_class, error_to_raise = self._prepare_stream_handler(
+                stream_resource
+            )
+            handler = await _attempt_with_retries_async(
+                func=handler_class,
+                args=(stream_resource["uri"],),
+                kwargs=stream_resource["parameters"],
+                intervals=[0] + self.retry_intervals,
+                error_to_catch=IOError,
+                error_to_raise=error_to_raise,
+                executor=self._executor,
+            )
+            self._handler_cache[key] = handler
+        return handler
+
+    async def _get_handler_maybe_cached_async(self, resource: Resource) -> Any:
+        "Get a cached handler for this resource or make one and cache it."
+        key = (resource["uid"], resource["spec"])
+        try:
+            handler = self._handler_cache[key]
+        except KeyError:
+            handler_class, resource_path, error_to_raise = self._prepare_handler(
+                resource
+            )
+            handler = await _attempt_with_retries_async(
+                func=handler_class,
+                args=(resource_path,),
+                kwargs=resource["resource_kwargs"],
+                intervals=[0] + self.retry_intervals,
+                error_to_catch=IOError,
+                error_to_raise=error_to_raise,
+                executor=self._executor,
+            )
+            self._handler_cache[key] = handler
+        return handler
+
+    async def _load_groups_async(
+        self, descriptor: EventDescriptor, groups: dict
+    ) -> dict:
+        "Like Filler._load_groups, but the groups are loaded as asyncio tasks."
+        tasks = {}
+        for group_key, items in groups.items():
+            key, resource_uid, _ = group_key
+            resource = self._resource_cache[resource_uid]
+            handler = await self._get_handler_maybe_cached_async(resource)
+            datum_docs = [datum_doc for _, datum_doc in items]
+            tasks[group_key] = (descriptor, key, resource, handler, datum_docs)
+        results = await asyncio.gather(
+            *(self._load_datums_async(*task) for task in tasks.values())
+        )
+        return dict(zip(tasks, results, strict=True))
+
+    def _call_with_state(self, func: Callable, state: dict, *args, **kwargs) -> Any:
+        "Set the state seen by coercion functions in this thread, then call func."
+        for name, value in state.items():
+            setattr(self._current_state, name, value)
+        return func(*args, **kwargs)
+
+    async def _load_datums_async(
+        self,
+        descriptor: EventDescriptor,
+        key: str,
+        resource: Resource,
+        handler: Any,
+        datum_docs: list[Datum],
+    ) -> list:
+        "Like Filler._load_datums, but awaiting and without blocking."
+        # The groups are loaded concurrently, and maybe on the executor, so
+        # the state seen by coercion functions is set by each call, in the
+        # thread making it, immediately before calling the handler.
+        state = {"descriptor": descriptor, "key": key, "resource": resource}
+        if len(datum_docs) < 2 or not hasattr(handler, "get_many"):
+            payloads = []
+            for datum_doc in datum_docs:
+                payload = await _attempt_with_retries_async(
+                    func=functools.partial(
+                        self._call_with_state,
+                        handler,
+                        {**state, "datum": datum_doc, "datums": None},
+                    ),
+                    args=(),
+                    kwargs=datum_doc["datum_kwargs"],
+                    intervals=[0] + self.retry_intervals,
+                    error_to_catch=IOError,
+                    error_to_raise=DataNotAccessible(
+                        f"Filler was unable to load the data referenced by "
+                        f"the Datum document {datum_doc} and the Resource "
+                        f"document {resource}."
+                    ),
+                    executor=self._executor,
+                )
+                payloads.append(payload)
+            return payloads
+        payload = await _attempt_with_retries_async(
+            func=functools.partial(
+                self._call_with_state,
+                handler.get_many,
+                {**state, "datum": None, "datums": datum_docs},
+            ),
+            args=([datum_doc["datum_kwargs"] for datum_doc in datum_docs],),
+            kwargs={},
+            intervals=[0] + self.retry_intervals,
+            error_to_catch=IOError,
+            error_to_raise=DataNotAccessible(
+                f"Filler was unable to load the data referenced by "
+                f"the Datum documents "
+                f"{[datum_doc['datum_id'] for datum_doc in datum_docs]} "
+                f"and the Resource document {resource}."
+            ),
+            executor=self._executor,
+        )
+        if len(payload) != len(datum_docs):
+            raise EventModelValueError(
+                f"The handler {handler!r} returned {len(payload)} items from "
+                f"get_many but {len(datum_docs)} were requested."
+            )
+        return list(payload)
+
+
 DOCS_PASSED_IN_1_14_0_WARNING = (
     "The callback {callback!r} raised {err!r} when "
     "RunRouter passed it a {name!r} document. This is "
@@ -1476,6 +3388,29 @@ class RunRouter(DocumentRouter):
         ``handler_registry`` is encountered, let it pass through unfilled. But
         if set to True, fill everything and raise
         ``UndefinedAssetSpecification`` if some unknown spec is encountered.
+    parallel: boolean, optional
+        By default (False), documents are processed on the caller's thread. If
+        True, the documents of each run are filled and passed to that run's
+        callbacks on a worker thread dedicated to the run, so that a slow
+        callback for one run does not hold up the others. Documents are still
+        processed in order within each run. The factories and callbacks must
+        then be safe to use from multiple threads. Any exception raised on a
+        worker is raised by the next call to the RunRouter (or to
+        :meth:`join`), and the rest of that run's documents are dropped.
+    max_queue_size: int, optional
+        In parallel mode, the maximum number of documents waiting to be
+        processed for each run. When it is reached, calling the RunRouter
+        blocks until that run's worker catches up. 1000 by default.
+    stream_handler_registry: dict, optional
+        This is passed to the Filler or whatever class is given in the
+        filler_class parameter, if given. It maps each StreamResource
+        'mimetype' to a stream handler class; see :class:`Filler`.
+    run_timeout: float, optional
+        If given, whenever a new run starts, forget every run that has not
+        received a document for this many seconds, as if it had stopped but
+        without sending a RunStop document to its callbacks; see :meth:`reap`.
+        By default, runs that never receive a RunStop are kept until
+        :meth:`reap` is called.
     """
 
     def __init__(
@@ -1486,12 +3421,20 @@ class RunRouter(DocumentRouter):
         root_map: dict | None = None,
         filler_class: type[Filler] = Filler,
         fill_or_fail: bool = False,
+        parallel: bool = False,
+        max_queue_size: int = 1000,
+        run_timeout: float | None = None,
+        stream_handler_registry: dict | None = None,
     ) -> None:
         self.factories = factories
         self.handler_registry = handler_registry or {}
         self.filler_class = filler_class
         self.fill_or_fail = fill_or_fail
         self.root_map = root_map
+        self.parallel = parallel
+        self.max_queue_size = max_queue_size
+        self.run_timeout = run_timeout
+        self.stream_handler_registry = stream_handler_registry or {}
 
         # Map RunStart UID to "subfactory" functions that want all
         # EventDescriptors from that run.
@@ -1529,12 +3472,42 @@ class RunRouter(DocumentRouter):
         self._resources: dict = {}
         self._stream_resources: dict = {}
 
+        # Map RunStart UID to the list of Resource and StreamResource UIDs.
+        # This is used to facilitate efficient cleanup of the caches above.
+        self._start_to_resources: defaultdict = defaultdict(list)
+
+        # Map RunStart UID to the time.monotonic() of its latest document, in
+        # the order in which runs started. This is used to find abandoned runs.
+        self._last_seen: dict[str, float] = {}
+
         # Old-style Resources that do not have a RunStart UID
-        self._unlabeled_resources: deque = deque(maxlen=10000)
+        self._unlabeled_resources = _UnlabeledResources(max_size=10000)
+
+        # Map EventDescriptor UID to its external (non-"STREAM:") data keys,
+        # whose values in Events are Datum IDs. This is used to bind old-style
+        # Resources to runs.
+        self._external_keys: dict[str, list[str]] = {}
 
         # Map Runstart UID to instances of self.filler_class.
         self._fillers: dict = {}
 
+        # Guards the state above that is shared between runs, in parallel mode.
+        # Every change to these indexes is made holding it, so that stats()
+        # can read them from any thread.
+        self._lock = threading.RLock()
+
+        # In parallel mode, map RunStart UID to the _RunWorker for that run,
+        # and map the UIDs of the documents that other documents refer to
+        # (EventDescriptors, Resources and StreamResources) to the RunStart UID
+        # of their run, so documents can be routed on the caller's thread.
+        self._workers: dict[str, _RunWorker] = {}
+        self._stopped_workers: list[_RunWorker] = []
+        self._routes: dict[str, str] = {}
+        self._routes_by_start: defaultdict = defaultdict(list)
+        self._worker_errors: deque = deque()
+        # On worker threads, the RunStart UID of the run they process.
+        self._local = threading.local()
+
     def __repr__(self):
         return (
             "RunRouter([\n"
@@ -1542,8 +3515,291 @@ class RunRouter(DocumentRouter):
             + "])"
         )
 
+    def __call__(
+        self, name: str, doc: dict, validate: bool = False
+    ) -> tuple[str, dict]:
+        if not self.parallel:
+            return super().__call__(name, doc, validate)
+        self._raise_worker_error()
+        if name == "start" and self.run_timeout is not None:
+            self.reap()
+        now = ttime.monotonic()
+        for start_uid in self._route(name, doc):
+            with self._lock:
+                self._last_seen[start_uid] = now
+            self._workers[start_uid].put((name, doc, validate))
+        if name == "stop" and doc["run_start"] in self._workers:
+            self._stop_worker(doc["run_start"])
+        return name, doc
+
+    def join(self) -> None:
+        """
+        In parallel mode, wait for all documents received so far to be
+        processed, and raise any exception that was raised doing so.
+        """
+        for worker in [*self._workers.values(), *self._stopped_workers]:
+            worker.join()
+        self._stopped_workers = [
+            worker for worker in self._stopped_workers if worker.is_alive()
+        ]
+        self._raise_worker_error()
+
+    def close(self) -> None:
+        """
+        In parallel mode, process the documents received so far and then stop
+        all worker threads, including those of runs that have not stopped.
+        """
+        for start_uid in list(self._workers):
+            self._workers[start_uid].put(None)
+            self._stop_worker(start_uid)
+        for worker in self._stopped_workers:
+            worker.thread.join()
+        self._stopped_workers.clear()
+        self._raise_worker_error()
+
+    def reap(self, timeout: float | None = None) -> list[str]:
+        """
+        Forget the runs that have not received a document for timeout seconds.
+
+        This releases everything the RunRouter holds for runs that were
+        abandoned without a RunStop document, including their callbacks. Their
+        callbacks are not sent a RunStop document, and any later documents from
+        those runs are rejected as for runs that have stopped. A warning is
+        issued for each run forgotten.
+
+        Parameters
+        ----------
+        timeout: float, optional
+            In seconds. By default, the ``run_timeout`` of the RunRouter.
+
+        Returns
+        -------
+        start_uids: list
+            The RunStart UIDs of the runs forgotten.
+        """
+        if timeout is None:
+            timeout = self.run_timeout
+        if timeout is None:
+            raise EventModelValueError(
+                "A timeout is required if the RunRouter has no run_timeout."
+            )
+        deadline = ttime.monotonic() - timeout
+        with self._lock:
+            abandoned = [
+                start_uid
+                for start_uid, last_seen in self._last_seen.items()
+                if last_seen < deadline
+            ]
+        for start_uid in abandoned:
+            warnings.warn(
+                f"RunRouter is forgetting the run {start_uid!r}, which has not "
+                f"received a document for more than {timeout} seconds and never "
+                "received a RunStop document.",
+                stacklevel=2,
+            )
+            if self.parallel:
+                if start_uid in self._workers:
+                    # The worker forgets the run when it exits.
+                    self._workers[start_uid].put(None)
+                    self._stop_worker(start_uid)
+            else:
+                self._forget_run(start_uid)
+        return abandoned
+
+    def stats(self) -> dict[str, int]:
+        """
+        Report what the RunRouter is holding on to.
+
+        Returns
+        -------
+        stats: dict
+            The numbers of live runs, and of their EventDescriptors, Resources
+            and StreamResources, of old-style Resources (which are not tied to
+            a run), and of worker threads (in parallel mode). Also
+            ``"index_bytes"``, the memory in bytes used by the indexes of those
+            documents, not counting the documents and callbacks themselves.
+        """
+        with self._lock:
+            indexes = [
+                self._subfactories,
+                self._factory_cbs_by_start,
+                self._factory_cbs_by_descriptor,
+                self._subfactory_cbs_by_descriptor,
+                self._subfactory_cbs_by_start,
+                self._start_to_start_doc,
+                self._start_to_descriptors,
+                self._descriptor_to_start,
+                self._resources,
+                self._stream_resources,
+                self._start_to_resources,
+                self._last_seen,
+                self._external_keys,
+                self._fillers,
+                self._workers,
+                self._routes,
+                self._routes_by_start,
+            ]
+            index_bytes = sys.getsizeof(self._unlabeled_resources)
+            for index in indexes:
+                index_bytes += sys.getsizeof(index)
+                for value in index.values():
+                    if isinstance(value, list):
+                        index_bytes += sys.getsizeof(value)
+            return {
+                "runs": len(self._start_to_start_doc),
+                "descriptors": len(self._descriptor_to_start),
+                "resources": len(self._resources),
+                "stream_resources": len(self._stream_resources),
+                "unlabeled_resources": len(self._unlabeled_resources),
+                "workers": len(self._workers),
+                "index_bytes": index_bytes,
+            }
+
+    def _raise_worker_error(self) -> None:
+        if self._worker_errors:
+            raise self._worker_errors.popleft()
+
+    def _route(self, name: str, doc: dict) -> Iterable[str]:
+        "Return the RunStart UIDs of the runs that doc belongs to."
+        if name == "start":
+            start_uid = doc["uid"]
+            if start_uid in self._workers:
+                raise ValueError(
+                    "RunRouter received two 'start' documents with the same uid "
+                    f"{start_uid!r}"
+                )
+            worker = _RunWorker(self, start_uid)
+            with self._lock:
+                self._workers[start_uid] = worker
+            return (start_uid,)
+        if name in ("descriptor", "resource", "stream_resource"):
+            start_uid = doc.get("run_start")
+            if start_uid is None:
+                # An old Resource, which goes to all runs; see resource().
+                with self._lock:
+                    self._unlabeled_resources.add(doc["uid"])
+                return tuple(self._workers)
+            with self._lock:
+                if name == "descriptor":
+                    self._note_external_keys(doc)
+                self._routes[doc["uid"]] = start_uid
+                self._routes_by_start[start_uid].append(doc["uid"])
+            return (start_uid,)
+        if name in ("event", "event_page"):
+            start_uid = self._routes[doc["descriptor"]]
+            self._bind_unlabeled_resources(name, doc, start_uid)
+            return (start_uid,)
+        if name in ("datum", "datum_page", "bulk_datum"):
+            resource_uid = doc["resource"]
+            if resource_uid in self._routes:
+                return (self._routes[resource_uid],)
+            return self._unlabeled_targets(doc, self._workers)
+        if name == "stream_datum":
+            return (self._routes[doc["stream_resource"]],)
+        if name == "stop":
+            start_uid = doc["run_start"]
+            return (start_uid,) if start_uid in self._workers else ()
+        if name == "bulk_events":
+            return {self._routes[descriptor_uid] for descriptor_uid in doc}
+        raise EventModelValueError(f"RunRouter cannot route {name!r} documents")
+
+    def _stop_worker(self, start_uid: str) -> None:
+        "Stop routing to a run whose worker has been sent its last document."
+        self._stopped_workers = [
+            worker for worker in self._stopped_workers if worker.is_alive()
+        ]
+        with self._lock:
+            self._stopped_workers.append(self._workers.pop(start_uid))
+            for uid in self._routes_by_start.pop(start_uid, ()):
+                self._routes.pop(uid, None)
+                self._external_keys.pop(uid, None)
+
+    def _touch(self, start_uid: str) -> None:
+        "Note that a run has received a document."
+        if not self.parallel:  # Otherwise, this is done by __call__.
+            with self._lock:
+                self._last_seen[start_uid] = ttime.monotonic()
+
+    def _forget_run(self, start_uid: str) -> None:
+        "Release every reference held for a run."
+        with self._lock:
+            self._last_seen.pop(start_uid, None)
+            self._fillers.pop(start_uid, None)
+            self._subfactories.pop(start_uid, None)
+            self._factory_cbs_by_start.pop(start_uid, None)
+            self._subfactory_cbs_by_start.pop(start_uid, None)
+            for descriptor_uid in self._start_to_descriptors.pop(start_uid, ()):
+                self._descriptor_to_start.pop(descriptor_uid, None)
+                self._factory_cbs_by_descriptor.pop(descriptor_uid, None)
+                self._subfactory_cbs_by_descriptor.pop(descriptor_uid, None)
+                self._external_keys.pop(descriptor_uid, None)
+            for resource_uid in self._start_to_resources.pop(start_uid, ()):
+                self._resources.pop(resource_uid, None)
+                self._stream_resources.pop(resource_uid, None)
+            self._start_to_start_doc.pop(start_uid, None)
+            self._unlabeled_resources.forget_run(start_uid)
+
+    def _note_external_keys(self, descriptor_doc: Any) -> None:
+        self._external_keys[descriptor_doc["uid"]] = [
+            key
+            for key, data_key in descriptor_doc.get("data_keys", {}).items()
+            if data_key.get("external") and data_key["external"] != "STREAM:"
+        ]
+
+    def _bind_unlabeled_resources(self, name: str, doc: Any, start_uid: str):
+        """
+        Bind the old-style Resources of any Datum referenced by an Event or
+        EventPage to the run of that Event.
+        """
+        if not self._unlabeled_resources.has_unbound_datum:
+            return
+        datum_ids: list = []
+        for key in self._external_keys.get(doc["descriptor"], ()):
+            if key in doc["data"]:
+                value = doc["data"][key]
+                if name == "event":
+                    datum_ids.append(value)
+                else:
+                    datum_ids.extend(value)
+        with self._lock:
+            self._unlabeled_resources.bind(datum_ids, start_uid)
+
+    def _unlabeled_targets(self, doc: Any, runs: Iterable[str]) -> list[str]:
+        """
+        Return the RunStart UIDs of the runs, among runs, to which Datum of an
+        old-style Resource should go: the run it is bound to or else all.
+        """
+        resource_uid = doc["resource"]
+        with self._lock:
+            if resource_uid not in self._unlabeled_resources:
+                raise UnresolvableForeignKeyError(
+                    resource_uid,
+                    f"DatumPage refers to unknown Resource uid {resource_uid}",
+                )
+            start_uid = self._unlabeled_resources.run_of(resource_uid)
+            if start_uid is not None and start_uid in runs:
+                return [start_uid]
+            targets = list(runs)
+            self._unlabeled_resources.note_datum(
+                resource_uid, doc.get("datum_id", doc.get("datum_ids", ())), targets
+            )
+        return targets
+
+    def _fan_out_targets(self) -> list[str]:
+        """
+        Return the RunStart UIDs of the runs to which documents related to old
+        Resources, which do not reference a RunStart, are fanned out.
+        """
+        start_uid = getattr(self._local, "start_uid", None)
+        if start_uid is not None:
+            # In parallel mode, each run's worker handles its own run.
+            return [start_uid]
+        return list(self._fillers)
+
     def start(self, start_doc: RunStart) -> None:
         uid = start_doc["uid"]
+        if self.run_timeout is not None and not self.parallel:
+            self.reap()
         # If we get the same uid twice, weird things will happen, so check for
         # that and give a nice error message.
         if uid in self._start_to_start_doc:
@@ -1558,11 +3814,17 @@ class RunRouter(DocumentRouter):
                     "First: {self._start_to_start_doc[uid]!r}\n"
                     "Second: {start_doc!r}"
                 )
-        self._start_to_start_doc[uid] = start_doc
+        with self._lock:
+            self._start_to_start_doc[uid] = start_doc
+        self._touch(uid)
+        kwargs: dict[str, Any] = {}
+        if self.stream_handler_registry:
+            kwargs["stream_handler_registry"] = self.stream_handler_registry
         filler = self.filler_class(
-            self.handler_registry, root_map=self.root_map, inplace=False
+            self.handler_registry, root_map=self.root_map, inplace=False, **kwargs
         )
-        self._fillers[uid] = filler
+        with self._lock:
+            self._fillers[uid] = filler
         # No need to pass the document to filler
         # because Fillers do nothing with 'start'.
         for factory in self.factories:
@@ -1578,31 +3840,38 @@ class RunRouter(DocumentRouter):
                         stacklevel=2,
                     )
                     raise err
-            self._factory_cbs_by_start[uid].extend(callbacks)
-            self._subfactories[uid].extend(subfactories)
+            with self._lock:
+                self._factory_cbs_by_start[uid].extend(callbacks)
+                self._subfactories[uid].extend(subfactories)
 
     def descriptor(self, descriptor_doc: EventDescriptor) -> None:
         descriptor_uid = descriptor_doc["uid"]
         start_uid = descriptor_doc["run_start"]
 
-        # Keep track of the RunStart UID -> [EventDescriptor UIDs] mapping for
-        # purposes of cleanup in stop().
-        self._start_to_descriptors[start_uid].append(descriptor_uid)
-        # Keep track of the EventDescriptor UID -> RunStartUID for filling
-        # purposes.
-        self._descriptor_to_start[descriptor_uid] = start_uid
+        with self._lock:
+            # Keep track of the RunStart UID -> [EventDescriptor UIDs] mapping
+            # for purposes of cleanup in stop().
+            self._start_to_descriptors[start_uid].append(descriptor_uid)
+            # Keep track of the EventDescriptor UID -> RunStartUID for filling
+            # purposes.
+            self._descriptor_to_start[descriptor_uid] = start_uid
+            if not self.parallel:  # Otherwise, this was done by _route.
+                self._note_external_keys(descriptor_doc)
+        self._touch(start_uid)
 
         self._fillers[start_uid].descriptor(descriptor_doc)
         # Apply all factory cbs for this run to this descriptor, and run them.
-        factory_cbs = self._factory_cbs_by_start[start_uid]
-        self._factory_cbs_by_descriptor[descriptor_uid].extend(factory_cbs)
+        with self._lock:
+            factory_cbs = self._factory_cbs_by_start[start_uid]
+            self._factory_cbs_by_descriptor[descriptor_uid].extend(factory_cbs)
         for callback in factory_cbs:
             callback("descriptor", descriptor_doc)
         # Let all the subfactories add any relevant callbacks.
         for subfactory in self._subfactories[start_uid]:
             callbacks = subfactory("descriptor", descriptor_doc)
-            self._subfactory_cbs_by_start[start_uid].extend(callbacks)
-            self._subfactory_cbs_by_descriptor[descriptor_uid].extend(callbacks)
+            with self._lock:
+                self._subfactory_cbs_by_start[start_uid].extend(callbacks)
+                self._subfactory_cbs_by_descriptor[descriptor_uid].extend(callbacks)
             for callback in callbacks:
                 try:
                     start_doc = self._start_to_start_doc[start_uid]
@@ -1629,6 +3898,9 @@ class RunRouter(DocumentRouter):
     def event_page(self, doc: EventPage):
         descriptor_uid = doc["descriptor"]
         start_uid = self._descriptor_to_start[descriptor_uid]
+        if not self.parallel:  # Otherwise, this was done by _route and __call__.
+            self._bind_unlabeled_resources("event_page", doc, start_uid)
+            self._last_seen[start_uid] = ttime.monotonic()
         try:
             doc = self._fillers[start_uid].event_page(doc)
         except UndefinedAssetSpecification:
@@ -1643,27 +3915,28 @@ class RunRouter(DocumentRouter):
         resource_uid = doc["resource"]
         try:
             start_uid = self._resources[resource_uid]
-        except KeyError as error:
-            if resource_uid not in self._unlabeled_resources:
-                raise UnresolvableForeignKeyError(
-                    resource_uid,
-                    f"DatumPage refers to unknown Resource uid {resource_uid}",
-                ) from error
+        except KeyError:
             # Old Resources do not have a reference to a RunStart document,
             # so in turn we cannot immediately tell which run these datum
             # documents belong to.
-            # Fan them out to every run currently flowing through RunRouter. If
-            # they are not applicable they will do no harm, and this is
-            # expected to be an increasingly rare case.
-            for callbacks in self._factory_cbs_by_start.values():
-                for callback in callbacks:
+            # Fan them out to every run currently flowing through RunRouter,
+            # until an Event from one of them references one of the Resource's
+            # Datum; from then on, send them only to that run. If they are not
+            # applicable they will do no harm, and this is expected to be an
+            # increasingly rare case.
+            if self.parallel:
+                # The documents were routed by _route.
+                targets = self._fan_out_targets()
+            else:
+                targets = self._unlabeled_targets(doc, self._fillers)
+            for start_uid in targets:
+                for callback in self._factory_cbs_by_start.get(start_uid, ()):
                     callback("datum_page", doc)
-            for callbacks in self._subfactory_cbs_by_start.values():
-                for callback in callbacks:
+                for callback in self._subfactory_cbs_by_start.get(start_uid, ()):
                     callback("datum_page", doc)
-            for filler in self._fillers.values():
-                filler.datum_page(doc)
+                self._fillers[start_uid].datum_page(doc)
         else:
+            self._touch(start_uid)
             self._fillers[start_uid].datum_page(doc)
             for callback in self._factory_cbs_by_start[start_uid]:
                 callback("datum_page", doc)
@@ -1673,6 +3946,7 @@ class RunRouter(DocumentRouter):
     def stream_datum(self, doc: StreamDatum) -> None:
         resource_uid = doc["stream_resource"]
         start_uid = self._stream_resources[resource_uid]
+        self._touch(start_uid)
         self._fillers[start_uid].stream_datum(doc)
         for callback in self._factory_cbs_by_start[start_uid]:
             callback("stream_datum", doc)
@@ -1687,18 +3961,20 @@ class RunRouter(DocumentRouter):
             # Fan them out to every run currently flowing through RunRouter. If
             # they are not applicable they will do no harm, and this is
             # expected to be an increasingly rare case.
-            self._unlabeled_resources.append(doc["uid"])
-            for callbacks in self._factory_cbs_by_start.values():
-                for callback in callbacks:
+            if not self.parallel:  # Otherwise, this was done by _route.
+                self._unlabeled_resources.add(doc["uid"])
+            for start_uid in self._fan_out_targets():
+                for callback in self._factory_cbs_by_start.get(start_uid, ()):
                     callback("resource", doc)
-            for callbacks in self._subfactory_cbs_by_start.values():
-                for callback in callbacks:
+                for callback in self._subfactory_cbs_by_start.get(start_uid, ()):
                     callback("resource", doc)
-            for filler in self._fillers.values():
-                filler.resource(doc)
+                self._fillers[start_uid].resource(doc)
         else:
+            self._touch(start_uid)
             self._fillers[start_uid].resource(doc)
-            self._resources[doc["uid"]] = doc["run_start"]
+            with self._lock:
+                self._resources[doc["uid"]] = doc["run_start"]
+                self._start_to_resources[start_uid].append(doc["uid"])
             for callback in self._factory_cbs_by_start[start_uid]:
                 callback("resource", doc)
             for callback in self._subfactory_cbs_by_start[start_uid]:
@@ -1706,8 +3982,11 @@ class RunRouter(DocumentRouter):
 
     def stream_resource(self, doc: StreamResource) -> None:
         start_uid = doc["run_start"]  # No need for Try
+        self._touch(start_uid)
         self._fillers[start_uid].stream_resource(doc)
-        self._stream_resources[doc["uid"]] = doc["run_start"]
+        with self._lock:
+            self._stream_resources[doc["uid"]] = doc["run_start"]
+            self._start_to_resources[start_uid].append(doc["uid"])
         for callback in self._factory_cbs_by_start[start_uid]:
             callback("stream_resource", doc)
         for callback in self._subfactory_cbs_by_start[start_uid]:
@@ -1720,16 +3999,149 @@ class RunRouter(DocumentRouter):
         for callback in self._subfactory_cbs_by_start[start_uid]:
             callback("stop", doc)
         # Clean up references.
-        self._fillers.pop(start_uid, None)
-        self._subfactories.pop(start_uid, None)
-        self._factory_cbs_by_start.pop(start_uid, None)
-        self._subfactory_cbs_by_start.pop(start_uid, None)
-        for descriptor_uid in self._start_to_descriptors.pop(start_uid, ()):
-            self._descriptor_to_start.pop(descriptor_uid, None)
-            self._factory_cbs_by_descriptor.pop(descriptor_uid, None)
-            self._subfactory_cbs_by_descriptor.pop(descriptor_uid, None)
-        self._resources.pop(start_uid, None)
-        self._start_to_start_doc.pop(start_uid, None)
+        self._forget_run(start_uid)
+
+
+class _UnlabeledResources:
+    """
+    An index of old-style Resources, which do not reference a RunStart.
+
+    It holds at most max_size Resource UIDs, forgetting the oldest first. Each
+    Resource may be bound to the run that first references one of its Datum
+    from an Event. Until then, the IDs of its most recent max_datum Datum are
+    kept to detect that, as long as any run they were fanned out to is open.
+    """
+
+    def __init__(self, max_size: int, max_datum: int = 10000) -> None:
+        self.max_size = max_size
+        self.max_datum = max_datum
+        # Map Resource UID to the RunStart UID it is bound to, or None.
+        self._runs: OrderedDict[str, str | None] = OrderedDict()
+        # Map Datum ID to the UID of its unbound Resource, and vice versa.
+        self._datum: dict[str, str] = {}
+        self._datum_by_resource: defaultdict[str, deque[str]] = defaultdict(deque)
+        # Map the UID of an unbound Resource to the runs its Datum went to.
+        self._fan_out_runs: defaultdict[str, set[str]] = defaultdict(set)
+
+    def __contains__(self, resource_uid: object) -> bool:
+        return resource_uid in self._runs
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self._runs)
+            + sys.getsizeof(self._datum)
+            + sys.getsizeof(self._datum_by_resource)
+            + sum(map(sys.getsizeof, self._datum_by_resource.values()))
+            + sys.getsizeof(self._fan_out_runs)
+            + sum(map(sys.getsizeof, self._fan_out_runs.values()))
+        )
+
+    @property
+    def has_unbound_datum(self) -> bool:
+        return bool(self._datum)
+
+    def add(self, resource_uid: str) -> None:
+        self._runs[resource_uid] = None
+        self._runs.move_to_end(resource_uid)
+        while len(self._runs) > self.max_size:
+            oldest, _ = self._runs.popitem(last=False)
+            self._forget_datum(oldest)
+
+    def run_of(self, resource_uid: str) -> str | None:
+        "Return the RunStart UID that a Resource is bound to, if any."
+        return self._runs[resource_uid]
+
+    def note_datum(
+        self, resource_uid: str, datum_ids: Iterable | str, runs: Iterable[str]
+    ) -> None:
+        "Keep the IDs of the Datum of a Resource, fanned out to runs, until bound."
+        if self._runs.get(resource_uid) is not None:
+            return
+        if isinstance(datum_ids, str):
+            datum_ids = [datum_ids]
+        self._fan_out_runs[resource_uid].update(runs)
+        kept = self._datum_by_resource[resource_uid]
+        for datum_id in datum_ids:
+            self._datum[datum_id] = resource_uid
+            kept.append(datum_id)
+            if len(kept) > self.max_datum:
+                self._datum.pop(kept.popleft(), None)
+
+    def forget_run(self, start_uid: str) -> None:
+        "Forget the Datum IDs that only went to runs which have now ended."
+        for resource_uid, runs in list(self._fan_out_runs.items()):
+            runs.discard(start_uid)
+            if not runs:
+                self._forget_datum(resource_uid)
+
+    def bind(self, datum_ids: Iterable, start_uid: str) -> None:
+        "Bind the unbound Resources of any of these Datum to a run."
+        for datum_id in datum_ids:
+            if not isinstance(datum_id, str):  # e.g. filled data
+                continue
+            resource_uid = self._datum.get(datum_id)
+            if resource_uid is not None:
+                self._runs[resource_uid] = start_uid
+                self._forget_datum(resource_uid)
+
+    def _forget_datum(self, resource_uid: str) -> None:
+        self._fan_out_runs.pop(resource_uid, None)
+        for datum_id in self._datum_by_resource.pop(resource_uid, ()):
+            self._datum.pop(datum_id, None)
+
+
+class _RunWorker:
+    """
+    Process the documents of one run, in order, on a dedicated thread.
+
+    This is used by RunRouter in parallel mode.
+    """
+
+    def __init__(self, router: RunRouter, start_uid: str) -> None:
+        self.router = router
+        self.start_uid = start_uid
+        self.failed = False
+        self._queue: queue.Queue = queue.Queue(maxsize=router.max_queue_size)
+        self.thread = threading.Thread(
+            target=self._run, name=f"RunRouter-{start_uid}", daemon=True
+        )
+        self.thread.start()
+
+    def put(self, item: tuple | None) -> None:
+        "Queue (name, doc, validate), or None to stop, blocking if it is full."
+        self._queue.put(item)
+
+    def join(self) -> None:
+        "Wait for all queued documents to be processed."
+        self._queue.join()
+
+    def is_alive(self) -> bool:
+        return self.thread.is_alive()
+
+    def _run(self) -> None:
+        self.router._local.start_uid = self.start_uid  # noqa: SLF001
+        while True:
+            item = self._queue.get()
+            try:
+                if item is not None:
+                    name, doc, validate = item
+                    if not self.failed:
+                        try:
+                            DocumentRouter.__call__(self.router, name, doc, validate)
+                        except Exception as err:
+                            self.failed = True
+                            self.router._worker_errors.append(err)  # noqa: SLF001
+                if item is None or name == "stop":
+                    # The run may have been stopped early, failed or been
+                    # abandoned, so make sure that it is forgotten.
+                    self.router._forget_run(self.start_uid)  # noqa: SLF001
+                    return
+            finally:
+                self._queue.task_done()
 
 
 # Here we define subclasses of all of the built-in Python exception types (as
@@ -1843,8 +4255,11 @@ _Validator = jsonschema.validators.extend(
     jsonschema.validators.Draft202012Validator, type_checker=_array_type_checker
 )
 
+# Each validator is wrapped with a fast path, compiled from its schema, that
+# accepts valid documents without walking the schema. See _schema_compiler.
 schema_validators = {
-    name: _Validator(schema=schema) for name, schema in schemas.items()
+    name: CompiledValidator(_Validator(schema=schema))
+    for name, schema in schemas.items()
 }
 
 
@@ -2202,10 +4617,47 @@ def length_of_value(dictionary: dict[str, list], error_msg: str) -> int | None:
     return length
 
 
+# The two hex digits of each byte, as the code points of a numpy str array,
+# viewed as a single uint64 so that a byte is formatted with one lookup.
+_HEX_PAIRS = (
+    numpy.array(
+        [[ord(digit) for digit in f"{byte:02x}"] for byte in range(256)],
+        dtype=numpy.uint32,
+    )
+    .view(numpy.uint64)
+    .reshape(256)
+)
+
+
+def _new_uids(n: int) -> numpy.ndarray:
+    """
+    Return an array of n random (version 4) UUID strings.
+
+    This is equivalent to ``[str(uuid.uuid4()) for _ in range(n)]``, but the
+    random bytes are read at once and formatted as arrays.
+    """
+    raw = numpy.frombuffer(os.urandom(16 * n), dtype=numpy.uint8).reshape(n, 16)
+    raw = raw.copy()
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40  # version 4
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80  # RFC 4122 variant
+    digits = _HEX_PAIRS[raw].view(numpy.uint32).reshape(n, 32)
+    chars = numpy.full((n, 36), ord("-"), dtype=numpy.uint32)
+    chars[:, 0:8] = digits[:, 0:8]
+    chars[:, 9:13] = digits[:, 8:12]
+    chars[:, 14:18] = digits[:, 12:16]
+    chars[:, 19:23] = digits[:, 16:20]
+    chars[:, 24:36] = digits[:, 20:32]
+    return chars.view("U36").reshape(n)
+
+
 @dataclass
 class ComposeEventPage:
     descriptor: EventDescriptor
     event_counters: dict[str, int]
+    _event_keys: "_EventKeys" = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._event_keys = _EventKeys(self.descriptor["data_keys"])
 
     def __call__(
         self,
@@ -2256,36 +4708,94 @@ class ComposeEventPage:
         if validate:
             schema_validators[DocumentNames.event_page].validate(doc)
 
-            if not (
-                set(
-                    keys_without_stream_keys(
-                        self.descriptor["data_keys"], self.descriptor["data_keys"]
-                    )
-                )
-                == set(keys_without_stream_keys(data, self.descriptor["data_keys"]))
-                == set(
-                    keys_without_stream_keys(timestamps, self.descriptor["data_keys"])
-                )
-            ):
-                raise EventModelValidationError(
-                    'These sets of keys must match (other than "STREAM:" keys):\n'
-                    "event['data'].keys(): {}\n"
-                    "event['timestamps'].keys(): {}\n"
-                    "descriptor['data_keys'].keys(): {}\n".format(
-                        data.keys(),
-                        timestamps.keys(),
-                        self.descriptor["data_keys"].keys(),
-                    )
-                )
-            if set(filled) - set(data):
-                raise EventModelValidationError(
-                    f"Keys in event['filled'] {filled.keys()} "
-                    "must be a subset of those in "
-                    f"event['data'] {data.keys()}"
-                )
+            self._event_keys.check(data, timestamps, filled)
         self.event_counters[self.descriptor["name"]] += len(seq_num)
         return doc
 
+    def from_arrays(
+        self,
+        data: dict[str, Any],
+        timestamps: dict[str, Any],
+        filled: dict[str, Any] | None = None,
+        time: Any = None,
+        validate: bool = True,
+    ) -> "ArrayEventPage":
+        """
+        Compose an EventPage whose columns are numpy arrays, in bulk.
+
+        Unlike calling this object, the uids are generated together, seq_num
+        is a range continuing from the previous Event(Page) of this stream,
+        and the columns are kept as arrays in an :class:`ArrayEventPage`.
+
+        Parameters
+        ----------
+        data : dict
+            A column (e.g. an array whose first axis is the rows) for each
+            data key.
+        timestamps : dict
+            A column, or a single time for every row, for each data key.
+        filled : dict, optional
+        time : array or float, optional
+            The time of each row, or a single time for every row. By default,
+            the current time.
+        validate : bool, optional
+            Check the keys and the lengths of the columns, and validate the
+            first row against the schema. The remaining rows are assumed to
+            match, as they do when each column is an array.
+
+        Returns
+        -------
+        ArrayEventPage
+        """
+        N = length_of_value(
+            data,
+            "Cannot compose event_page: event_page contains `data` "
+            "lists of different lengths",
+        )
+        if N is None:
+            raise EventModelValueError("Cannot compose event_page without any data.")
+        float64 = numpy.dtype("float64")
+        timestamps = {
+            key: numpy.full(N, value, dtype=float64)
+            if numpy.ndim(value) == 0
+            else _as_column(value, float64)
+            for key, value in timestamps.items()
+        }
+        if any(len(column) != N for column in timestamps.values()):
+            raise EventModelError(
+                "Cannot compose event_page: the lists in `timestamps` are of a "
+                "different length to those in `data`"
+            )
+        if time is None:
+            time = ttime.time()
+        if numpy.ndim(time) == 0:
+            time = numpy.full(N, time, dtype=float64)
+        last_seq_num = self.event_counters[self.descriptor["name"]]
+        page = ArrayEventPage(
+            {
+                "uid": _new_uids(N),
+                "time": time,
+                "data": data,
+                "timestamps": timestamps,
+                "seq_num": numpy.arange(last_seq_num, last_seq_num + N),
+                "filled": filled or {},
+                "descriptor": self.descriptor["uid"],
+            },
+            self.descriptor,
+        )
+        if validate:
+            if len(page["time"]) != N:
+                raise EventModelError(
+                    "Cannot compose event_page: `time` is of a different length "
+                    "to the lists in `data`"
+                )
+            schema_validators[DocumentNames.event_page].validate(
+                page.slice(0, 1).to_event_page()
+            )
+            self._event_keys.check(page["data"], page["timestamps"], page["filled"])
+        self.event_counters[self.descriptor["name"]] += N
+        return page
+
 
 def compose_event_page(
     *,
@@ -2324,10 +4834,60 @@ def keys_without_stream_keys(dictionary, descriptor_data_keys):
     ]
 
 
+class _EventKeys:
+    """
+    The keys expected in the Events of one descriptor, computed once.
+
+    Checking a document's keys is then a single comparison of key views.
+    The original, slower comparison is only repeated to raise the error.
+    """
+
+    def __init__(self, data_keys: dict[str, DataKey]):
+        self.data_keys = data_keys
+        self.stream_keys = frozenset(
+            key
+            for key, value in data_keys.items()
+            if value.get("external") == "STREAM:"
+        )
+        self.expected_keys = frozenset(data_keys) - self.stream_keys
+        self.all_keys = frozenset(data_keys)
+
+    def check(self, data, timestamps, filled):
+        if not (
+            data.keys() <= self.all_keys
+            and timestamps.keys() <= self.all_keys
+            and data.keys() - self.stream_keys
+            == self.expected_keys
+            == timestamps.keys() - self.stream_keys
+        ):
+            # Unknown keys raise KeyError here, as they always have.
+            if not (
+                self.expected_keys
+                == set(keys_without_stream_keys(data, self.data_keys))
+                == set(keys_without_stream_keys(timestamps, self.data_keys))
+            ):
+                raise EventModelValidationError(
+                    'These sets of keys must match (other than "STREAM:" keys):\n'
+                    f"event['data'].keys(): {data.keys()}\n"
+                    f"event['timestamps'].keys(): {timestamps.keys()}\n"
+                    f"descriptor['data_keys'].keys(): {self.data_keys.keys()}\n"
+                )
+        if filled.keys() - data.keys():
+            raise EventModelValidationError(
+                f"Keys in event['filled'] {filled.keys()} "
+                "must be a subset of those in "
+                f"event['data'] {data.keys()}"
+            )
+
+
 @dataclass
 class ComposeEvent:
     descriptor: EventDescriptor
     event_counters: dict[str, int]
+    _event_keys: "_EventKeys" = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._event_keys = _EventKeys(self.descriptor["data_keys"])
 
     def __call__(
         self,
@@ -2359,33 +4919,7 @@ class ComposeEvent:
         if validate:
             schema_validators[DocumentNames.event].validate(doc)
 
-            if not (
-                set(
-                    keys_without_stream_keys(
-                        self.descriptor["data_keys"], self.descriptor["data_keys"]
-                    )
-                )
-                == set(keys_without_stream_keys(data, self.descriptor["data_keys"]))
-                == set(
-                    keys_without_stream_keys(timestamps, self.descriptor["data_keys"])
-                )
-            ):
-                raise EventModelValidationError(
-                    'These sets of keys must match (other than "STREAM:" keys):\n'
-                    "event['data'].keys(): {}\n"
-                    "event['timestamps'].keys(): {}\n"
-                    "descriptor['data_keys'].keys(): {}\n".format(
-                        data.keys(),
-                        timestamps.keys(),
-                        self.descriptor["data_keys"].keys(),
-                    )
-                )
-            if set(filled) - set(data):
-                raise EventModelValidationError(
-                    f"Keys in event['filled'] {filled.keys()} "
-                    "must be a subset of those in "
-                    f"event['data'] {data.keys()}"
-                )
+            self._event_keys.check(data, timestamps, filled)
         self.event_counters[self.descriptor["name"]] = seq_num + 1
         return doc
 
@@ -2665,29 +5199,35 @@ def pack_event_page(*events: Event) -> EventPage:
     return event_page
 
 
-def unpack_event_page(event_page: EventPage) -> Generator:
+def unpack_event_page(event_page: EventPage, *, views: bool = False) -> Generator:
     """
     Transform an EventPage document into individual Event documents.
 
+    Events are built lazily, one row at a time, as they are consumed.
+
     Parameters
     ----------
     event_page : EventPage
+    views : boolean, optional
+        If True, the ``data``, ``timestamps`` and ``filled`` of each Event are
+        lightweight, read-only Mappings onto the row of the page's columns,
+        rather than new dicts. These cannot be modified in place (e.g. by an
+        in-place Filler) and are not dicts as far as schema validation is
+        concerned. False by default.
 
     Yields
     ------
     event : Event
     """
     descriptor = event_page["descriptor"]
-    data_list = _transpose_dict_of_lists(event_page["data"])
-    timestamps_list = _transpose_dict_of_lists(event_page["timestamps"])
-    filled_list = _transpose_dict_of_lists(event_page.get("filled", {}))
+    rows: Callable[[Any], Iterator[Any]] = _iter_row_views if views else _iter_rows
     for uid, time, seq_num, data, timestamps, filled in itertools.zip_longest(
         event_page["uid"],
         event_page["time"],
         event_page["seq_num"],
-        data_list,
-        timestamps_list,
-        filled_list,
+        rows(event_page["data"]),
+        rows(event_page["timestamps"]),
+        rows(event_page.get("filled", {})),
         fillvalue={},
     ):
         yield Event(
@@ -2755,67 +5295,60 @@ def unpack_datum_page(datum_page: DatumPage) -> Generator:
         yield Datum(datum_id=datum_id, datum_kwargs=datum_kwargs, resource=resource)
 
 
-def rechunk_event_pages(event_pages: Iterable, chunk_size: int) -> Generator:
+def rechunk_event_pages(
+    event_pages: Iterable, chunk_size: int, *, views: bool = False
+) -> Generator:
     """
     Resizes the event_pages in a iterable of event_pages.
 
+    Columns are not copied unless a chunk straddles two or more input pages,
+    in which case they are copied once. Chunks that coincide with an input
+    page are that page itself, and numpy array columns of other chunks are
+    views of the input columns.
+
     Parameters
     ----------
     event_pages: Iterabile
         An iterable of event_pages
     chunk_size: integer
         Size of pages to yield
+    views: boolean, optional
+        If True, list columns of chunks lying within one input page are
+        lazy, read-only views of the input lists rather than copies. False by
+        default.
 
     Yields
     ------
     event_page : dict
     """
-    remainder = chunk_size
-    chunk_list = []
-
-    def page_chunks(page: dict, chunk_size: int, remainder: int) -> Generator:
-        """
-        Yields chunks of a event_page.
-        The first chunk will be of size remainder, the following chunks will be
-        of size chunk_size. The last chunk will be what ever is left over.
-        """
-        array_keys = ["seq_num", "time", "uid"]
-        page_size = len(page["uid"])  # Number of events in the page.
-
-        # Make a list of the chunk indexes.
-        chunks = [(0, remainder)]
-        chunks.extend(
-            [(i, i + chunk_size) for i in range(remainder, page_size, chunk_size)]
-        )
-
-        for start, stop in chunks:
-            yield {
-                "descriptor": page["descriptor"],
-                **{key: page[key][start:stop] for key in array_keys},
-                "data": {
-                    key: page["data"][key][start:stop] for key in page["data"].keys()
-                },
-                "timestamps": {
-                    key: page["timestamps"][key][start:stop]
-                    for key in page["timestamps"].keys()
-                },
-                "filled": {
-                    key: page["filled"][key][start:stop]
-                    for key in page["filled"].keys()
-                },
-            }
-
-    for page in event_pages:
-        new_chunks = page_chunks(page, chunk_size, remainder)
-        for chunk in new_chunks:
-            remainder -= len(chunk["uid"])  # Subtract the size of the chunk.
-            chunk_list.append(chunk)
-            if remainder == 0:
-                yield merge_event_pages(chunk_list)
-                remainder = chunk_size
-                chunk_list = []
-    if chunk_list:
-        yield merge_event_pages(chunk_list)
+    for segments in _plan_chunks(event_pages, chunk_size, "uid"):
+        if len(segments) == 1:
+            page, start, stop = segments[0]
+            if start == 0 and stop == len(page["uid"]):
+                yield page
+                continue
+            if isinstance(page, ArrayEventPage):
+                yield page.slice(start, stop)
+                continue
+        if all(isinstance(page, ArrayEventPage) for page, _, _ in segments):
+            yield ArrayEventPage.concatenate(
+                page.slice(start, stop) for page, start, stop in segments
+            )
+            continue
+        first = segments[0][0]
+        yield {
+            "descriptor": first["descriptor"],
+            **{
+                key: _take_rows(segments, views, key)
+                for key in ("seq_num", "time", "uid")
+            },
+            **{
+                key: {
+                    name: _take_rows(segments, views, key, name) for name in first[key]
+                }
+                for key in ("data", "timestamps", "filled")
+            },
+        }
 
 
 def merge_event_pages(event_pages: Iterable[EventPage]) -> EventPage:
@@ -2834,6 +5367,10 @@ def merge_event_pages(event_pages: Iterable[EventPage]) -> EventPage:
     pages = list(event_pages)
     if len(pages) == 1:
         return pages[0]
+    if all(isinstance(page, ArrayEventPage) for page in pages):
+        return cast(
+            EventPage, ArrayEventPage.concatenate(cast(list[ArrayEventPage], pages))
+        )
 
     doc = {
         "descriptor": pages[0]["descriptor"],
@@ -2866,61 +5403,231 @@ def merge_event_pages(event_pages: Iterable[EventPage]) -> EventPage:
     return cast(EventPage, doc)
 
 
-def rechunk_datum_pages(datum_pages: Iterable, chunk_size: int) -> Generator:
+# Numeric dtypes used for columns when the descriptor does not give dtype_numpy.
+_DTYPE_DEFAULTS = {
+    "number": numpy.dtype("float64"),
+    "integer": numpy.dtype("int64"),
+    "boolean": numpy.dtype("bool"),
+}
+
+
+def _column_dtype(data_key: collections.abc.Mapping) -> numpy.dtype | None:
+    "Return the dtype for the column of a scalar, numeric data key, else None."
+    if data_key.get("shape") or data_key.get("external"):
+        return None
+    dtype_numpy = data_key.get("dtype_numpy")
+    if isinstance(dtype_numpy, str):
+        dtype = numpy.dtype(dtype_numpy)
+        return dtype if dtype.kind in "biuf" else None
+    return _DTYPE_DEFAULTS.get(data_key.get("dtype", ""))
+
+
+def _as_column(values: Any, dtype: numpy.dtype | None) -> Any:
+    """
+    Return values as a 1-D numeric array, or unchanged if that would lose
+    information (e.g. strings, None, nested values or fractions in an integer
+    column).
+    """
+    if isinstance(values, numpy.ndarray) and values.ndim == 1:
+        if dtype is None or values.dtype == dtype:
+            return values
+    if dtype is not None and not len(values):
+        return numpy.empty(0, dtype=dtype)
+    try:
+        array = numpy.asarray(values)
+    except ValueError:  # ragged
+        return values
+    if array.ndim != 1 or array.dtype.kind not in "biuf":
+        return values
+    if dtype is None or array.dtype == dtype:
+        return array
+    with numpy.errstate(all="ignore"):
+        column = array.astype(dtype)
+    # Floats may lose precision to the declared dtype, but no value may change
+    # otherwise, e.g. by truncation or overflow.
+    if not (dtype.kind == "f" or numpy.array_equal(column, array)):
+        return values
+    return column
+
+
+def _concatenate_columns(columns: list) -> Any:
+    if all(isinstance(column, numpy.ndarray) for column in columns):
+        return numpy.concatenate(columns)
+    return list(itertools.chain.from_iterable(columns))
+
+
+class ArrayEventPage(collections.abc.Mapping):
+    """
+    A read-only EventPage whose scalar columns are numpy arrays.
+
+    ``time``, ``seq_num`` and every ``timestamps`` column are stored as
+    float64, int64 and float64 arrays respectively. Each ``data`` column of a
+    scalar, numeric, internal data key is stored as an array of the dtype given
+    by its ``dtype_numpy`` (or ``dtype``) in the descriptor. Other columns,
+    such as strings, datum ids, and non-scalar data, are kept as they are, as
+    are columns whose values would not survive the conversion.
+
+    This uses much less memory than lists of Python objects, and slicing and
+    merging pages become array views and concatenations. Because it is a
+    Mapping, code that reads EventPages works with it unchanged. Use
+    :meth:`to_event_page` to obtain a plain EventPage, e.g. for validation or
+    serialization.
+
+    Parameters
+    ----------
+    event_page : EventPage
+    descriptor : EventDescriptor, optional
+        The descriptor referenced by the event_page. Without it, the dtypes of
+        the ``data`` columns are inferred from their values.
+
+    Examples
+    --------
+    >>> page = ArrayEventPage(event_page, descriptor)
+    >>> page["data"]["motor"].mean()
+    >>> merge_event_pages([page, ArrayEventPage(next_page, descriptor)])
+    """
+
+    def __init__(
+        self,
+        event_page: collections.abc.Mapping,
+        descriptor: EventDescriptor | None = None,
+    ) -> None:
+        data = {}
+        for key, values in event_page["data"].items():
+            if descriptor is None:
+                data[key] = _as_column(values, None)
+                continue
+            dtype = _column_dtype(descriptor["data_keys"].get(key, {}))
+            data[key] = values if dtype is None else _as_column(values, dtype)
+        float64 = numpy.dtype("float64")
+        self._doc = {
+            **event_page,
+            "time": _as_column(event_page["time"], float64),
+            "seq_num": _as_column(event_page["seq_num"], numpy.dtype("int64")),
+            "data": data,
+            "timestamps": {
+                key: _as_column(values, float64)
+                for key, values in event_page["timestamps"].items()
+            },
+            "filled": dict(event_page.get("filled", {})),
+        }
+
+    @classmethod
+    def _from_columns(cls, doc: dict) -> "ArrayEventPage":
+        "Wrap columns that are already converted."
+        page = cls.__new__(cls)
+        page.__setstate__(doc)
+        return page
+
+    def __getitem__(self, key: str) -> Any:
+        return self._doc[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._doc)
+
+    def __len__(self) -> int:
+        return len(self._doc)
+
+    def __repr__(self) -> str:
+        return f"ArrayEventPage({self._doc!r})"
+
+    def __getstate__(self) -> dict:
+        return self._doc
+
+    def __setstate__(self, state: dict) -> None:
+        self._doc = state
+
+    def slice(self, start: int | None, stop: int | None) -> "ArrayEventPage":
+        """
+        Return the rows from start to stop as a new ArrayEventPage.
+
+        The array columns of the result are views of this page's arrays.
+        """
+        doc = {
+            key: value
+            for key, value in self._doc.items()
+            if key not in ("data", "timestamps", "filled")
+        }
+        for key in ("uid", "time", "seq_num"):
+            doc[key] = self._doc[key][start:stop]
+        for key in ("data", "timestamps", "filled"):
+            doc[key] = {
+                name: column[start:stop] for name, column in self._doc[key].items()
+            }
+        return self._from_columns(doc)
+
+    @classmethod
+    def concatenate(cls, pages: Iterable["ArrayEventPage"]) -> "ArrayEventPage":
+        "Combine pages with the same descriptor into a single ArrayEventPage."
+        pages = list(pages)
+        if not pages:
+            raise EventModelValueError("Cannot concatenate an empty list of pages.")
+        first = pages[0]
+        doc = dict(first)
+        for key in ("uid", "time", "seq_num"):
+            doc[key] = _concatenate_columns([page[key] for page in pages])
+        for key in ("data", "timestamps", "filled"):
+            doc[key] = {
+                name: _concatenate_columns([page[key][name] for page in pages])
+                for name in first[key]
+            }
+        return cls._from_columns(doc)
+
+    def to_event_page(self) -> EventPage:
+        "Return a plain EventPage, with lists in place of arrays."
+
+        def as_list(column: Any) -> list:
+            if isinstance(column, numpy.ndarray):
+                return column.tolist()
+            return list(column)
+
+        doc = dict(self._doc)
+        for key in ("uid", "time", "seq_num"):
+            doc[key] = as_list(doc[key])
+        for key in ("data", "timestamps", "filled"):
+            doc[key] = {name: as_list(column) for name, column in doc[key].items()}
+        return cast(EventPage, doc)
+
+
+def rechunk_datum_pages(
+    datum_pages: Iterable, chunk_size: int, *, views: bool = False
+) -> Generator:
     """
     Resizes the datum_pages in a iterable of event_pages.
 
+    As in :func:`rechunk_event_pages`, columns are only copied for chunks
+    straddling two or more input pages.
+
     Parameters
     ----------
     datum_pages: Iterabile
         An iterable of datum_pages
     chunk_size: integer
         Size of pages to yield
+    views: boolean, optional
+        If True, list columns of chunks lying within one input page are
+        lazy, read-only views of the input lists rather than copies. False by
+        default.
 
     Yields
     ------
     datum_page : dict
     """
-    remainder = chunk_size
-    chunk_list = []
-
-    def page_chunks(page: dict, chunk_size: int, remainder: int) -> Generator:
-        """
-        Yields chunks of a datum_page.
-        The first chunk will be of size remainder, the following chunks will be
-        of size chunk_size. The last chunk will be what ever is left over.
-        """
-
-        array_keys = ["datum_id"]
-        page_size = len(page["datum_id"])  # Number of datum in the page.
-
-        # Make a list of the chunk indexes.
-        chunks = [(0, remainder)]
-        chunks.extend(
-            [(i, i + chunk_size) for i in range(remainder, page_size, chunk_size)]
-        )
-
-        for start, stop in chunks:
-            yield {
-                "resource": page["resource"],
-                **{key: page[key][start:stop] for key in array_keys},
-                "datum_kwargs": {
-                    key: page["datum_kwargs"][key][start:stop]
-                    for key in page["datum_kwargs"].keys()
-                },
-            }
-
-    for page in datum_pages:
-        new_chunks = page_chunks(page, chunk_size, remainder)
-        for chunk in new_chunks:
-            remainder -= len(chunk["datum_id"])  # Subtract the size of the chunk.
-            chunk_list.append(chunk)
-            if remainder == 0:
-                yield merge_datum_pages(chunk_list)
-                remainder = chunk_size
-                chunk_list = []
-    if chunk_list:
-        yield merge_datum_pages(chunk_list)
+    for segments in _plan_chunks(datum_pages, chunk_size, "datum_id"):
+        if len(segments) == 1:
+            page, start, stop = segments[0]
+            if start == 0 and stop == len(page["datum_id"]):
+                yield page
+                continue
+        first = segments[0][0]
+        yield {
+            "resource": first["resource"],
+            "datum_id": _take_rows(segments, views, "datum_id"),
+            "datum_kwargs": {
+                name: _take_rows(segments, views, "datum_kwargs", name)
+                for name in first["datum_kwargs"]
+            },
+        }
 
 
 def merge_datum_pages(datum_pages: Iterable) -> DatumPage:
@@ -2960,6 +5667,123 @@ def merge_datum_pages(datum_pages: Iterable) -> DatumPage:
     return cast(DatumPage, doc)
 
 
+def _plan_chunks(pages: Iterable, chunk_size: int, length_key: str) -> Generator:
+    """
+    Yield, for each chunk of chunk_size rows, the (page, start, stop) segments
+    of the input pages that make it up. The last chunk may be shorter.
+    """
+    segments: list[tuple[Any, int, int]] = []
+    remainder = chunk_size
+    for page in pages:
+        size = len(page[length_key])
+        if not size and not segments:
+            # Empty pages only make up a chunk if nothing else does.
+            segments.append((page, 0, 0))
+        start = 0
+        while start < size:
+            if segments and segments[-1][2] == segments[-1][1]:
+                segments.pop()  # Drop a placeholder for an empty page.
+            stop = min(size, start + remainder)
+            segments.append((page, start, stop))
+            remainder -= stop - start
+            start = stop
+            if remainder == 0:
+                yield segments
+                segments = []
+                remainder = chunk_size
+    if segments:
+        yield segments
+
+
+def _get_path(doc: collections.abc.Mapping, path: tuple[str, ...]) -> Any:
+    for key in path:
+        doc = doc[key]
+    return doc
+
+
+def _take_rows(segments: list, views: bool, *path: str) -> Any:
+    """
+    Return the rows of the column at page[path[0]][path[1]]... given by
+    segments of one or more pages.
+
+    Rows from one page are a slice (a view for numpy arrays, or if views is
+    True, for any sequence). Rows from several pages are copied exactly once.
+    """
+    if len(segments) == 1:
+        page, start, stop = segments[0]
+        column = _get_path(page, path)
+        if views and not isinstance(column, numpy.ndarray):
+            return _SliceView(column, start, stop)
+        return column[start:stop]
+    parts = [(_get_path(page, path), start, stop) for page, start, stop in segments]
+    if all(isinstance(column, numpy.ndarray) for column, _, _ in parts):
+        return numpy.concatenate([column[start:stop] for column, start, stop in parts])
+    rows: list = []
+    for column, start, stop in parts:
+        rows.extend(column[start:stop])
+    return rows
+
+
+class _SliceView(collections.abc.Sequence):
+    """
+    A lazy, read-only view of column[start:stop].
+
+    It compares equal to a list with the same items, and it is pickled and
+    JSON-encoded (by NumpyEncoder) as a list.
+    """
+
+    __slots__ = ("_column", "_start", "_stop")
+    _column: collections.abc.Sequence
+    _start: int
+    _stop: int
+
+    def __init__(self, column: collections.abc.Sequence, start: int, stop: int):
+        if isinstance(column, _SliceView):
+            start, stop = column._start + start, column._start + stop  # noqa: SLF001
+            column = column._column  # noqa: SLF001
+        self._column = column
+        self._start = start
+        self._stop = max(start, min(stop, len(column)))
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            rows = range(len(self))[index]
+            if rows.step == 1:
+                return _SliceView(self, rows.start, rows.stop)
+            return [self._column[self._start + i] for i in rows]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index out of range")
+        return self._column[self._start + index]
+
+    def __iter__(self) -> Iterator:
+        return map(self._column.__getitem__, range(self._start, self._stop))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, collections.abc.Sequence) and not isinstance(
+            other, str | bytes
+        ):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other, strict=True)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def __array__(self, dtype=None, copy=None):
+        return numpy.asarray(list(self), dtype=dtype)
+
+
 def bulk_events_to_event_pages(bulk_events: dict) -> list:
     """
     Transform a BulkEvents document into a list of EventPage documents.
@@ -3028,6 +5852,49 @@ def _transpose_list_of_dicts(list_of_dicts: list) -> dict:
     return dict(dict_of_lists)
 
 
+def _iter_rows(dict_of_lists: collections.abc.Mapping) -> Iterator[dict]:
+    "Lazily transform dict-of-lists into dicts, one per row."
+    keys = list(dict_of_lists)
+    for row in zip(*(dict_of_lists[k] for k in keys), strict=False):
+        yield dict(zip(keys, row, strict=False))
+
+
+def _iter_row_views(dict_of_lists: collections.abc.Mapping) -> Iterator["_RowView"]:
+    "Like _iter_rows, but yield read-only views of each row."
+    length = min((len(column) for column in dict_of_lists.values()), default=0)
+    for index in range(length):
+        yield _RowView(dict_of_lists, index)
+
+
+class _RowView(collections.abc.Mapping):
+    """
+    A read-only view of one row of a dict-of-lists.
+
+    It is pickled and copied as a dict.
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: collections.abc.Mapping, index: int):
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._columns[key][self._index]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
 def _transpose_dict_of_lists(dict_of_lists: dict) -> list:
     "Transform dict-of-lists (i.e. DataFrame-like) into list-of-dicts."
     list_of_dicts = []
@@ -3064,7 +5931,7 @@ def verify_filled(event_page: dict) -> None:
                 )
 
 
-def sanitize_doc(doc: dict) -> dict:
+def sanitize_doc(doc: dict, copy: bool = True) -> dict:
     """Return a copy with any numpy objects converted to built-in Python types.
 
     This function takes in an event-model document and returns a copy with any
@@ -3072,18 +5939,32 @@ def sanitize_doc(doc: dict) -> dict:
     sanitizing documents prior to sending to any consumer that does not
     recognize numpy types, such as a MongoDB database or a JSON encoder.
 
+    The result is the same as encoding the document to JSON with
+    :class:`NumpyEncoder` and decoding it again (e.g. tuples become lists and
+    dict keys become strings), but it is built in one pass, without the
+    intermediate string.
+
     Parameters
     ----------
     doc : dict
         The event-model document to be sanitized
+    copy : bool, optional
+        True by default. If False, any dicts and lists that need no conversion
+        are not copied, so the result shares them with ``doc``, and ``doc``
+        itself is returned if nothing needs converting.
 
     Returns
     -------
     sanitized_doc : event-model document
         The event-model document with numpy objects converted to built-in
         Python types.
+
+    Raises
+    ------
+    TypeError
+        If the document contains an object that cannot be encoded as JSON.
     """
-    return json.loads(json.dumps(doc, cls=NumpyEncoder))
+    return _sanitize(doc, copy)
 
 
 class NumpyEncoder(json.JSONEncoder):
@@ -3112,4 +5993,86 @@ class NumpyEncoder(json.JSONEncoder):
             if numpy.isscalar(obj):
                 return obj.item()
             return obj.tolist()
+        if isinstance(obj, collections.abc.Mapping):  # e.g. ArrayEventPage
+            return dict(obj)
+        if isinstance(obj, _SliceView):
+            return list(obj)
         return json.JSONEncoder.default(self, obj)
+
+
+# The types that JSON decodes to, which sanitize_doc leaves as they are.
+_JSON_ATOMS = frozenset({str, int, float, bool, type(None)})
+
+
+def _json_key(key: Any) -> str:
+    "Convert a dict key to a string as json.dumps does."
+    if isinstance(key, str):
+        return str(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return json.dumps(float(key))
+    raise TypeError(
+        f"keys must be str, int, float, bool or None, not {type(key).__name__}"
+    )
+
+
+@no_type_check
+def _sanitize(obj: Any, copy: bool) -> Any:
+    """
+    Convert obj to what json.loads(json.dumps(obj, cls=NumpyEncoder)) returns.
+
+    Unless copy is True, obj is returned itself if nothing needs converting.
+    """
+    type_ = type(obj)
+    if type_ in _JSON_ATOMS:
+        return obj
+    if isinstance(obj, dict):
+        changed = copy or type_ is not dict
+        result = {}
+        for key, value in obj.items():
+            new_key = key if type(key) is str else _json_key(key)
+            new_value = value if type(value) in _JSON_ATOMS else _sanitize(value, copy)
+            if new_key is not key or new_value is not value:
+                changed = True
+            result[new_key] = new_value
+        return result if changed else obj
+    if isinstance(obj, list | tuple):
+        if set(map(type, obj)) <= _JSON_ATOMS:
+            # e.g. a column of an EventPage
+            return obj if not copy and type_ is list else list(obj)
+        result = [_sanitize(item, copy) for item in obj]
+        if not copy and type_ is list:
+            if all(map(operator.is_, result, obj)):
+                return obj
+        return result
+    # Subclasses of the JSON types are encoded as their base type.
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, float):
+        return float(obj)
+    # The rest mirrors NumpyEncoder.default.
+    if isinstance(obj, numpy.ndarray):
+        if obj.dtype.kind in "biuf":
+            return obj.tolist()  # which is made only of JSON types
+        return _sanitize(obj.tolist(), False)
+    if isinstance(obj, numpy.generic):
+        return _sanitize(obj.item(), False)
+    # A dask array can only exist if dask.array has been imported, so do not
+    # pay for trying to import it.
+    dask_array = sys.modules.get("dask.array")
+    if dask_array is not None and isinstance(obj, dask_array.Array):
+        return _sanitize(numpy.asarray(obj), False)
+    if isinstance(obj, collections.abc.Mapping):  # e.g. ArrayEventPage
+        return _sanitize(dict(obj), copy)
+    if isinstance(obj, _SliceView):
+        return _sanitize(list(obj), copy)
+    raise TypeError(f"Object of type {type_.__name__} is not JSON serializable")
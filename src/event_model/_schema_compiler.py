@@ -0,0 +1,347 @@
+"""
+Compile the event-model JSON schemas into specialized Python validators.
+
+A generic jsonschema validator walks the schema for every document it
+validates. For the high rates at which Events are composed this dominates the
+cost of composition, so each schema is instead translated, once, into Python
+source code containing one function per subschema, which only checks whether a
+document is valid.
+
+The compiled check is deliberately conservative: it may reject some valid
+documents (for example, numpy scalars where a Python ``int`` is expected), but
+it never accepts an invalid one. When it rejects a document, the original
+jsonschema validator is consulted, which gives the definitive answer and
+raises exactly the same ``ValidationError`` as before. Schemas using keywords
+not understood by the compiler are not compiled at all and always use the
+original validator.
+"""
+
+import re
+from collections.abc import Callable
+from typing import Any
+
+# Keywords that do not affect validation.
+_ANNOTATIONS = frozenset(
+    {"title", "description", "default", "examples", "$comment", "$defs"}
+)
+_SUPPORTED = _ANNOTATIONS | {
+    "type",
+    "properties",
+    "patternProperties",
+    "additionalProperties",
+    "unevaluatedProperties",
+    "required",
+    "items",
+    "prefixItems",
+    "minItems",
+    "maxItems",
+    "pattern",
+    "enum",
+    "const",
+    "allOf",
+    "anyOf",
+    "$ref",
+}
+# Applicators whose annotations (evaluated properties) depend on which of
+# their subschemas succeed. unevaluatedProperties is only compiled when it can
+# be resolved statically, i.e. when none of these are involved.
+_DYNAMIC_APPLICATORS = frozenset(
+    {"anyOf", "oneOf", "not", "if", "then", "else", "dependentSchemas"}
+)
+
+# These mirror the type checks of jsonschema's Draft 2020-12 validator, as
+# extended by event-model to accept tuples and array-likes as arrays. Where
+# they are stricter than jsonschema (e.g. "number") the fallback decides.
+_TYPE_CHECKS = {
+    "object": "isinstance(x, dict)",
+    "array": "(isinstance(x, (list, tuple)) or hasattr(x, '__array__'))",
+    "string": "isinstance(x, str)",
+    "number": "(isinstance(x, (int, float)) and not isinstance(x, bool))",
+    "integer": "(isinstance(x, int) and not isinstance(x, bool))",
+    "boolean": "isinstance(x, bool)",
+    "null": "x is None",
+}
+
+
+class UnsupportedSchema(Exception):
+    "Raised when a schema uses a feature that the compiler does not handle."
+
+
+class _Compiler:
+    def __init__(self, root: dict) -> None:
+        self.root = root
+        self.lines: list[str] = []
+        self.namespace: dict[str, Any] = {}
+        # Map id(subschema) to the name of its compiled function.
+        self.functions: dict[int, str] = {}
+
+    def constant(self, value: Any) -> str:
+        "Stash a value in the namespace of the generated code and name it."
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def resolve(self, ref: str) -> Any:
+        if ref == "#":
+            return self.root
+        if not ref.startswith("#/"):
+            raise UnsupportedSchema(f"Only local $ref is supported, not {ref!r}")
+        node = self.root
+        for part in ref[2:].split("/"):
+            node = node[part.replace("~1", "/").replace("~0", "~")]
+        return node
+
+    def compile(self, schema: Any) -> str:
+        "Return the name of a function that checks instances against schema."
+        if schema is True or schema == {}:
+            return self.constant(lambda x: True)
+        if schema is False:
+            return self.constant(lambda x: False)
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"Invalid schema {schema!r}")
+        try:
+            return self.functions[id(schema)]
+        except KeyError:
+            pass
+        name = f"_v{len(self.functions)}"
+        # Register first so that recursive references resolve to this name.
+        self.functions[id(schema)] = name
+        unsupported = set(schema) - _SUPPORTED
+        if unsupported:
+            raise UnsupportedSchema(f"Unsupported keywords {unsupported}")
+        body: list[str] = []
+        self.type_check(schema, body)
+        self.object_checks(schema, body)
+        self.array_checks(schema, body)
+        self.value_checks(schema, body)
+        self.subschema_checks(schema, body)
+        self.lines.append(f"def {name}(x):")
+        self.lines.extend(f"    {line}" for line in body)
+        self.lines.append("    return True")
+        self.lines.append("")
+        return name
+
+    def type_check(self, schema: dict, body: list[str]) -> None:
+        if "type" not in schema:
+            return
+        types = schema["type"]
+        if isinstance(types, str):
+            types = [types]
+        try:
+            check = " or ".join(_TYPE_CHECKS[type_] for type_ in types)
+        except KeyError as err:
+            raise UnsupportedSchema(f"Unsupported type {err}") from err
+        body.append(f"if not ({check}):")
+        body.append("    return False")
+
+    def object_checks(self, schema: dict, body: list[str]) -> None:
+        checks: list[str] = []
+        for key in schema.get("required", ()):
+            checks.append(f"if {key!r} not in x:")
+            checks.append("    return False")
+        properties = schema.get("properties", {})
+        for key, subschema in properties.items():
+            if subschema is True or subschema == {}:
+                continue
+            func = self.compile(subschema)
+            checks.append(f"if {key!r} in x and not {func}(x[{key!r}]):")
+            checks.append("    return False")
+        patterns = [
+            (self.constant(re.compile(pattern)), self.compile(subschema))
+            for pattern, subschema in schema.get("patternProperties", {}).items()
+        ]
+        additional = schema.get("additionalProperties", True)
+        unevaluated = schema.get("unevaluatedProperties", True)
+        if unevaluated is not True:
+            if unevaluated is not False:
+                raise UnsupportedSchema("unevaluatedProperties must be a boolean")
+            names, unevaluated_patterns = self.evaluated_properties(schema)
+            if names is None:
+                # Everything is evaluated by some additionalProperties.
+                unevaluated = True
+        loop: list[str] = []
+        if patterns or additional is not True:
+            for pattern, func in patterns:
+                loop.append(f"if {pattern}.search(k) and not {func}(v):")
+                loop.append("    return False")
+            if additional is not True:
+                known = self.constant(frozenset(properties))
+                matched = " or ".join(
+                    [f"k in {known}"]
+                    + [f"{pattern}.search(k)" for pattern, _ in patterns]
+                )
+                if additional is False:
+                    loop.append(f"if not ({matched}):")
+                    loop.append("    return False")
+                else:
+                    func = self.compile(additional)
+                    loop.append(f"if not ({matched}) and not {func}(v):")
+                    loop.append("    return False")
+        if unevaluated is False:
+            known = self.constant(frozenset(names))
+            matched = " or ".join(
+                [f"k in {known}"]
+                + [
+                    f"{self.constant(re.compile(pattern))}.search(k)"
+                    for pattern in unevaluated_patterns
+                ]
+            )
+            loop.append(f"if not ({matched}):")
+            loop.append("    return False")
+        if loop:
+            checks.append("for k, v in x.items():")
+            checks.extend(f"    {line}" for line in loop)
+        if checks:
+            body.append("if isinstance(x, dict):")
+            body.extend(f"    {line}" for line in checks)
+
+    def evaluated_properties(self, schema: dict, seen: set | None = None) -> tuple:
+        """
+        Statically collect the property names and patterns evaluated by schema
+        and the subschemas it applies to the same instance.
+
+        Returns ``(None, None)`` if any property may be evaluated, because some
+        additionalProperties applies.
+        """
+        if seen is None:
+            seen = set()
+        if id(schema) in seen or not isinstance(schema, dict):
+            return set(), set()
+        seen.add(id(schema))
+        if set(schema) & _DYNAMIC_APPLICATORS:
+            raise UnsupportedSchema(
+                "unevaluatedProperties can only be compiled alongside static "
+                "applicators"
+            )
+        if "additionalProperties" in schema:
+            return None, None
+        names = set(schema.get("properties", {}))
+        patterns = set(schema.get("patternProperties", {}))
+        subschemas = list(schema.get("allOf", []))
+        if "$ref" in schema:
+            subschemas.append(self.resolve(schema["$ref"]))
+        for subschema in subschemas:
+            sub_names, sub_patterns = self.evaluated_properties(subschema, seen)
+            if sub_names is None:
+                return None, None
+            names |= sub_names
+            patterns |= sub_patterns
+        return names, patterns
+
+    def array_checks(self, schema: dict, body: list[str]) -> None:
+        checks: list[str] = []
+        if "minItems" in schema:
+            checks.append(f"if len(x) < {int(schema['minItems'])}:")
+            checks.append("    return False")
+        if "maxItems" in schema:
+            checks.append(f"if len(x) > {int(schema['maxItems'])}:")
+            checks.append("    return False")
+        prefix = schema.get("prefixItems", [])
+        for index, subschema in enumerate(prefix):
+            func = self.compile(subschema)
+            checks.append(f"if len(x) > {index} and not {func}(x[{index}]):")
+            checks.append("    return False")
+        if "items" in schema:
+            items = schema["items"]
+            if items is False:
+                checks.append(f"if len(x) > {len(prefix)}:")
+                checks.append("    return False")
+            elif not (items is True or items == {}):
+                func = self.compile(items)
+                rest = f"x[{len(prefix)}:]" if prefix else "x"
+                checks.append(f"for item in {rest}:")
+                checks.append(f"    if not {func}(item):")
+                checks.append("        return False")
+        if checks:
+            body.append("if isinstance(x, (list, tuple)):")
+            body.extend(f"    {line}" for line in checks)
+            # Leave other array-likes (e.g. numpy arrays) to jsonschema.
+            body.append("elif hasattr(x, '__array__'):")
+            body.append("    return False")
+
+    def value_checks(self, schema: dict, body: list[str]) -> None:
+        if "pattern" in schema:
+            pattern = self.constant(re.compile(schema["pattern"]))
+            body.append(f"if isinstance(x, str) and not {pattern}.search(x):")
+            body.append("    return False")
+        if "enum" in schema or "const" in schema:
+            values = schema["enum"] if "enum" in schema else [schema["const"]]
+            if not all(isinstance(value, str) for value in values):
+                raise UnsupportedSchema("Only string enum and const are supported")
+            if "enum" in schema and "const" in schema:
+                values = [value for value in values if value == schema["const"]]
+            allowed = self.constant(frozenset(values))
+            body.append(f"if not (isinstance(x, str) and x in {allowed}):")
+            body.append("    return False")
+
+    def subschema_checks(self, schema: dict, body: list[str]) -> None:
+        for subschema in schema.get("allOf", ()):
+            func = self.compile(subschema)
+            body.append(f"if not {func}(x):")
+            body.append("    return False")
+        if "anyOf" in schema:
+            funcs = [self.compile(subschema) for subschema in schema["anyOf"]]
+            body.append(f"if not ({' or '.join(f'{func}(x)' for func in funcs)}):")
+            body.append("    return False")
+        if "$ref" in schema:
+            func = self.compile(self.resolve(schema["$ref"]))
+            body.append(f"if not {func}(x):")
+            body.append("    return False")
+
+
+def compile_schema(schema: dict) -> tuple[Callable[[Any], bool], str]:
+    """
+    Translate a JSON schema into a Python function that checks instances.
+
+    Returns the function and its generated source code.
+
+    Raises
+    ------
+    UnsupportedSchema
+        If the schema uses a feature that cannot be compiled.
+    """
+    compiler = _Compiler(schema)
+    name = compiler.compile(schema)
+    source = "\n".join(compiler.lines)
+    namespace = compiler.namespace
+    exec(
+        compile(source, f"<compiled schema {schema.get('title')!r}>", "exec"), namespace
+    )
+    return namespace[name], source
+
+
+class CompiledValidator:
+    """
+    Wrap a jsonschema validator with a compiled fast path.
+
+    ``validate`` and ``is_valid`` first run the compiled check. Only if that
+    fails is the wrapped validator consulted, so the same documents are
+    accepted and the same errors are raised as with the wrapped validator
+    alone. Any other attribute is looked up on the wrapped validator.
+    """
+
+    def __init__(self, validator: Any) -> None:
+        self.validator = validator
+        self.source: str | None
+        try:
+            self._check, self.source = compile_schema(validator.schema)
+        except UnsupportedSchema:
+            self._check, self.source = validator.is_valid, None
+
+    def __repr__(self) -> str:
+        return f"CompiledValidator({self.validator!r})"
+
+    @property
+    def compiled(self) -> bool:
+        "Whether the schema could be compiled."
+        return self.source is not None
+
+    def is_valid(self, instance: Any) -> bool:
+        return self._check(instance) or self.validator.is_valid(instance)
+
+    def validate(self, instance: Any) -> None:
+        if not self._check(instance):
+            self.validator.validate(instance)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.validator, name)
@@ -0,0 +1,345 @@
+"""
+An offline index of the runs, streams and seq_num ranges in a document stream.
+
+A :class:`DocumentIndex` is built in one pass over an iterable of
+``(name, doc)``, or over a :class:`event_model.document_log.DocumentLogReader`.
+It follows the same relationships as :class:`event_model.RunRouter` (RunStart
+to EventDescriptors, EventDescriptor to RunStart, Resource to RunStart) but
+keeps them after each run ends, along with:
+
+* for each EventDescriptor, its stream name and the seq_num range and position
+  of each Event and EventPage,
+* for each Resource, the position and number of Datum in each Datum and
+  DatumPage,
+* for each StreamResource, the index and seq_num ranges and position of each
+  StreamDatum.
+
+The 'position' of a document is its offset in the document log, or else its
+position in the iterable. The index can be saved to a compact file and
+loaded again, so that the Events in a range of seq_num can be read from a log
+without reading the rest of the stream.
+
+Examples
+--------
+>>> with DocumentLogReader("scans.emlog") as log:
+...     index = DocumentIndex.from_log(log)
+...     index.save("scans.emindex")
+>>> index = DocumentIndex.load("scans.emindex")
+>>> with DocumentLogReader("scans.emlog") as log:
+...     pages = list(index.read_events(log.read, start_uid, "primary", 5000, 6000))
+"""
+
+import os
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+import numpy
+
+from . import EventModelKeyError, EventModelValueError, pack_event_page
+from .serialization import dumps, loads
+
+_NAME = "document_index"
+
+
+def _select_rows(page: dict, rows: list[int]) -> dict:
+    "Return an EventPage with only the given rows of page."
+
+    def take(column: Any) -> Any:
+        if isinstance(column, numpy.ndarray):
+            return column[rows]
+        return [column[row] for row in rows]
+
+    return {
+        "descriptor": page["descriptor"],
+        **{key: take(page[key]) for key in ("seq_num", "time", "uid")},
+        **{
+            key: {name: take(column) for name, column in page[key].items()}
+            for key in ("data", "timestamps", "filled")
+            if key in page
+        },
+    }
+
+
+class DocumentIndex:
+    """
+    An index of the runs, streams and seq_num ranges of some documents.
+
+    Use :meth:`from_documents`, :meth:`from_log` or :meth:`load` to make one,
+    or call :meth:`add` with each document.
+
+    Parameters
+    ----------
+    doc : dict, optional
+        The output of :meth:`to_doc`, to start from. By default the index is
+        empty.
+    """
+
+    def __init__(self, doc: dict | None = None) -> None:
+        # These mirror the state of RunRouter of the same names.
+        self._start_to_descriptors: defaultdict = defaultdict(list)
+        self._descriptor_to_start: dict = {}
+        self._resources: dict = {}  # Resource and StreamResource uid to start
+        self._runs: dict = {}  # RunStart uid to [start position, stop position]
+        self._stream_names: dict = {}  # EventDescriptor uid to stream name
+        # EventDescriptor uid to lists of the first seq_num, last seq_num and
+        # position of each Event or EventPage.
+        self._events: defaultdict = defaultdict(lambda: ([], [], []))
+        # Resource uid to lists of the position and number of Datum of each
+        # Datum or DatumPage.
+        self._datum: defaultdict = defaultdict(lambda: ([], []))
+        # StreamResource uid to lists of the indices start and stop, seq_nums
+        # start and stop, and position of each StreamDatum.
+        self._stream_datum: defaultdict = defaultdict(lambda: ([], [], [], [], []))
+        if doc is not None:
+            self._runs = doc["runs"]
+            self._start_to_descriptors.update(doc["start_to_descriptors"])
+            self._descriptor_to_start = doc["descriptor_to_start"]
+            self._stream_names = doc["stream_names"]
+            self._resources = doc["resources"]
+            for attr in ("events", "datum", "stream_datum"):
+                getattr(self, f"_{attr}").update(
+                    {
+                        uid: tuple(column.tolist() for column in columns)
+                        for uid, columns in doc[attr].items()
+                    }
+                )
+
+    @classmethod
+    def from_documents(cls, documents: Iterable) -> "DocumentIndex":
+        """
+        Index an iterable of ``(name, doc)``.
+
+        The position of each document is its position in the iterable.
+        """
+        index = cls()
+        for position, (name, doc) in enumerate(documents):
+            index.add(name, doc, position)
+        return index
+
+    @classmethod
+    def from_log(cls, log: Any) -> "DocumentIndex":
+        """
+        Index a :class:`~event_model.document_log.DocumentLogReader`.
+
+        The position of each document is the offset of its record, as accepted
+        by the log's ``read`` method.
+        """
+        index = cls()
+        for offset, name, doc in log.records():
+            index.add(name, doc, offset)
+        return index
+
+    def add(self, name: str, doc: Any, position: int) -> None:
+        "Index one document, found at the given position."
+        if name == "start":
+            self._runs[doc["uid"]] = [position, None]
+        elif name == "stop":
+            if doc["run_start"] in self._runs:
+                self._runs[doc["run_start"]][1] = position
+        elif name == "descriptor":
+            self._start_to_descriptors[doc["run_start"]].append(doc["uid"])
+            self._descriptor_to_start[doc["uid"]] = doc["run_start"]
+            self._stream_names[doc["uid"]] = doc.get("name", "primary")
+        elif name in ("event", "event_page"):
+            seq_nums = doc["seq_num"]
+            if name == "event":
+                first = last = seq_nums
+            elif len(seq_nums):
+                first, last = min(seq_nums), max(seq_nums)
+            else:
+                return
+            firsts, lasts, positions = self._events[doc["descriptor"]]
+            firsts.append(int(first))
+            lasts.append(int(last))
+            positions.append(position)
+        elif name in ("resource", "stream_resource"):
+            self._resources[doc["uid"]] = doc.get("run_start")
+        elif name in ("datum", "datum_page"):
+            positions, counts = self._datum[doc["resource"]]
+            positions.append(position)
+            counts.append(1 if name == "datum" else len(doc["datum_id"]))
+        elif name == "stream_datum":
+            columns = self._stream_datum[doc["stream_resource"]]
+            for column, value in zip(
+                columns,
+                (
+                    doc["indices"]["start"],
+                    doc["indices"]["stop"],
+                    doc["seq_nums"]["start"],
+                    doc["seq_nums"]["stop"],
+                    position,
+                ),
+                strict=True,
+            ):
+                column.append(value)
+
+    @property
+    def runs(self) -> list[str]:
+        "The uids of the RunStart documents, in order."
+        return list(self._runs)
+
+    def run_positions(self, start_uid: str) -> tuple:
+        "Return the positions of the RunStart and of the RunStop (or None)."
+        try:
+            return tuple(self._runs[start_uid])
+        except KeyError:
+            raise EventModelKeyError(
+                f"There is no run with RunStart uid {start_uid} in this index."
+            ) from None
+
+    def streams(self, start_uid: str) -> dict[str, list[str]]:
+        "Map the name of each stream of a run to the uids of its descriptors."
+        self.run_positions(start_uid)  # Check that the run is known.
+        streams: dict = {}
+        for descriptor_uid in self._start_to_descriptors.get(start_uid, []):
+            name = self._stream_names[descriptor_uid]
+            streams.setdefault(name, []).append(descriptor_uid)
+        return streams
+
+    def descriptor_to_start(self, descriptor_uid: str) -> str:
+        "Return the RunStart uid of an EventDescriptor."
+        return self._descriptor_to_start[descriptor_uid]
+
+    def resource_to_start(self, resource_uid: str) -> str | None:
+        "Return the RunStart uid of a (Stream)Resource, or None if unlabeled."
+        return self._resources[resource_uid]
+
+    def _stream_events(self, start_uid: str, stream: str) -> tuple:
+        try:
+            descriptors = self.streams(start_uid)[stream]
+        except KeyError:
+            raise EventModelKeyError(
+                f"The run with RunStart uid {start_uid} has no stream {stream!r}."
+            ) from None
+        # Concatenate the columns of all the descriptors of the stream.
+        columns = [self._events.get(uid, ([], [], [])) for uid in descriptors]
+        return tuple(
+            numpy.asarray(
+                [value for column in columns for value in column[i]], dtype=numpy.int64
+            )
+            for i in range(3)
+        )
+
+    def seq_num_range(self, start_uid: str, stream: str) -> tuple | None:
+        "Return the first and last seq_num of a stream, or None if it is empty."
+        firsts, lasts, _ = self._stream_events(start_uid, stream)
+        if not len(firsts):
+            return None
+        return int(firsts.min()), int(lasts.max())
+
+    def event_positions(
+        self,
+        start_uid: str,
+        stream: str,
+        start: int | None = None,
+        stop: int | None = None,
+    ) -> numpy.ndarray:
+        """
+        Return the positions of the Events and EventPages of a stream with
+        any seq_num in ``range(start, stop)``, in order.
+        """
+        firsts, lasts, positions = self._stream_events(start_uid, stream)
+        mask = numpy.ones(len(positions), dtype=bool)
+        if start is not None:
+            mask &= lasts >= start
+        if stop is not None:
+            mask &= firsts < stop
+        return numpy.sort(positions[mask])
+
+    def read_events(
+        self,
+        read: Callable[[int], tuple[str, Any]],
+        start_uid: str,
+        stream: str,
+        start: int | None = None,
+        stop: int | None = None,
+    ) -> Iterator[dict]:
+        """
+        Yield EventPages with the Events of a stream in ``range(start, stop)``
+        of seq_num, reading only the documents that contain them.
+
+        Parameters
+        ----------
+        read : callable
+            Return the ``(name, doc)`` at a position, e.g. the ``read`` method
+            of a DocumentLogReader, or the ``__getitem__`` of a list of
+            ``(name, doc)``.
+        start_uid : str
+        stream : str
+        start, stop : int, optional
+            The range of seq_num. By default, the whole stream.
+        """
+        low = -numpy.inf if start is None else start
+        high = numpy.inf if stop is None else stop
+        for position in self.event_positions(start_uid, stream, start, stop).tolist():
+            name, doc = read(position)
+            if name == "event":
+                doc = pack_event_page(doc)
+            elif name != "event_page":
+                raise EventModelValueError(
+                    f"Expected an Event or EventPage at position {position} but "
+                    f"found a {name!r} document. Is this the index of these "
+                    f"documents?"
+                )
+            seq_nums = doc["seq_num"]
+            rows = [
+                row for row, seq_num in enumerate(seq_nums) if low <= seq_num < high
+            ]
+            if len(rows) == len(seq_nums):
+                yield doc
+            elif rows:
+                yield _select_rows(doc, rows)
+
+    def datum_positions(self, resource_uid: str) -> tuple:
+        """
+        Return the positions of the Datum and DatumPages of a Resource and the
+        number of Datum in each.
+        """
+        positions, counts = self._datum.get(resource_uid, ([], []))
+        return (
+            numpy.asarray(positions, dtype=numpy.int64),
+            numpy.asarray(counts, dtype=numpy.int64),
+        )
+
+    def stream_datum_ranges(self, stream_resource_uid: str) -> numpy.ndarray:
+        """
+        Return an array with a row for each StreamDatum of a StreamResource,
+        whose columns are its indices start and stop, its seq_nums start and
+        stop, and its position.
+        """
+        columns = self._stream_datum.get(stream_resource_uid, ([],) * 5)
+        return numpy.asarray(columns, dtype=numpy.int64).reshape(5, -1).T
+
+    def to_doc(self) -> dict:
+        "Return the index as a dict of lists and arrays."
+
+        def arrays(columns: Iterable) -> list:
+            return [numpy.asarray(column, dtype=numpy.int64) for column in columns]
+
+        return {
+            "runs": self._runs,
+            "start_to_descriptors": dict(self._start_to_descriptors),
+            "descriptor_to_start": self._descriptor_to_start,
+            "stream_names": self._stream_names,
+            "resources": self._resources,
+            "events": {uid: arrays(value) for uid, value in self._events.items()},
+            "datum": {uid: arrays(value) for uid, value in self._datum.items()},
+            "stream_datum": {
+                uid: arrays(value) for uid, value in self._stream_datum.items()
+            },
+        }
+
+    def save(self, path: str | os.PathLike) -> None:
+        "Write the index to a file."
+        with open(path, "wb") as file:
+            file.write(dumps(_NAME, self.to_doc()))
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "DocumentIndex":
+        "Read an index written by :meth:`save`."
+        with open(path, "rb") as file:
+            name, doc = loads(file.read())
+        if name != _NAME:
+            raise EventModelValueError(f"{path} is not a document index.")
+        return cls(doc)
@@ -0,0 +1,410 @@
+"""
+An append-only file of documents, which can be replayed run by run.
+
+:class:`DocumentLogWriter` is a ``(name, doc)`` callback, e.g. for a
+:class:`event_model.RunRouter` or a RunEngine subscription, which appends each
+document to the log. :class:`DocumentLogReader` yields the documents back as
+``(name, doc)``, either all of them in order or only those of one run, or of
+one stream of one run.
+
+The file is made of
+
+* 8 bytes identifying the format,
+* one record per document: its length, as a little-endian unsigned 64-bit
+  integer, followed by the document serialized by
+  :func:`event_model.serialization.dumps` and zero-padding to a multiple of 8
+  bytes,
+* a record holding the index, written by :meth:`DocumentLogWriter.close`,
+* the offset of the index record and 8 bytes marking the end of the index.
+
+The index maps each RunStart uid to the offsets of the records of that run and
+each EventDescriptor uid to its run, stream name and offset, so that a reader
+can go straight to the records of one run. If the log was not closed, e.g.
+because the process writing it crashed, the reader rebuilds the index by
+reading every record instead.
+
+Examples
+--------
+>>> with DocumentLogWriter("scans.emlog", append=True) as log:
+...     RE.subscribe(log)
+...     RE(scan(...))
+>>> with DocumentLogReader("scans.emlog") as log:
+...     for name, doc in log.replay(start_uid, stream="primary"):
+...         run_router(name, doc)
+"""
+
+import array
+import mmap
+import os
+import struct
+from collections.abc import Iterator
+from typing import Any, BinaryIO
+
+import numpy
+
+from . import EventModelKeyError, EventModelValueError
+from .serialization import dumps, loads
+
+_MAGIC = b"EMDLOG\x00\x01"
+_INDEX_MAGIC = b"EMDLOGIX"
+_LENGTH = struct.Struct("<Q")
+_TRAILER = struct.Struct("<Q8s")
+# A record name that no document has.
+_INDEX = "index"
+
+
+def _padding(n: int) -> int:
+    return -n % 8
+
+
+class _LogIndex:
+    "Follow which run, and which stream, each record belongs to."
+
+    def __init__(self) -> None:
+        # Map RunStart uid to the offsets of its records and, for each record,
+        # the position of its stream in the run's list of stream names, or -1
+        # if the record is not specific to one stream.
+        self.runs: dict[str, tuple[array.array, array.array, list[str]]] = {}
+        # Map EventDescriptor uid to [RunStart uid, stream name, offset].
+        self.descriptors: dict[str, list] = {}
+        # Map Resource and StreamResource uid to the uids of their runs.
+        self.resources: dict[str, list[str]] = {}
+        # Runs without a RunStop yet, to which unlabeled Resources belong.
+        self.open_runs: list[str] = []
+
+    def add(self, name: str, doc: Any, offset: int) -> None:
+        descriptor = None
+        if name == "start":
+            self.runs[doc["uid"]] = (array.array("Q"), array.array("i"), [])
+            self.open_runs.append(doc["uid"])
+            start_uids = [doc["uid"]]
+        elif name == "descriptor":
+            start_uids = [doc["run_start"]]
+            descriptor = doc["uid"]
+            self.descriptors[descriptor] = [
+                doc["run_start"],
+                doc.get("name", "primary"),
+                offset,
+            ]
+        elif name in ("event", "event_page", "stream_datum"):
+            descriptor = doc["descriptor"]
+            try:
+                start_uids = [self.descriptors[descriptor][0]]
+            except KeyError:
+                return  # It can only be read by iterating over the whole log.
+        elif name in ("resource", "stream_resource"):
+            if "run_start" in doc:
+                start_uids = [doc["run_start"]]
+            else:
+                start_uids = list(self.open_runs)
+            self.resources[doc["uid"]] = start_uids
+        elif name in ("datum", "datum_page", "bulk_datum"):
+            start_uids = self.resources.get(doc["resource"], [])
+        elif name == "stop":
+            start_uids = [doc["run_start"]]
+            if doc["run_start"] in self.open_runs:
+                self.open_runs.remove(doc["run_start"])
+        else:
+            return
+        for start_uid in start_uids:
+            try:
+                offsets, tags, streams = self.runs[start_uid]
+            except KeyError:
+                continue
+            tag = -1
+            if descriptor is not None:
+                stream = self.descriptors[descriptor][1]
+                try:
+                    tag = streams.index(stream)
+                except ValueError:
+                    tag = len(streams)
+                    streams.append(stream)
+            offsets.append(offset)
+            tags.append(tag)
+
+    def to_doc(self) -> dict:
+        return {
+            "runs": {
+                start_uid: {
+                    "offsets": numpy.frombuffer(offsets, dtype=numpy.uint64),
+                    "tags": numpy.frombuffer(tags, dtype=numpy.intc),
+                    "streams": streams,
+                }
+                for start_uid, (offsets, tags, streams) in self.runs.items()
+            },
+            "descriptors": self.descriptors,
+            "resources": self.resources,
+            "open_runs": self.open_runs,
+        }
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "_LogIndex":
+        index = cls()
+        for start_uid, run in doc["runs"].items():
+            index.runs[start_uid] = (
+                array.array("Q", run["offsets"].tobytes()),
+                array.array("i", run["tags"].tobytes()),
+                list(run["streams"]),
+            )
+        index.descriptors = doc["descriptors"]
+        index.resources = doc["resources"]
+        index.open_runs = doc["open_runs"]
+        return index
+
+
+def _read_log(buffer: Any) -> tuple[_LogIndex, int]:
+    """
+    Read the index of a log, rebuilding it if the log was not closed.
+
+    Returns the index and the offset of the end of the document records.
+    """
+    if bytes(buffer[: len(_MAGIC)]) != _MAGIC:
+        raise EventModelValueError("This is not a document log.")
+    size = len(buffer)
+    if size >= len(_MAGIC) + _TRAILER.size:
+        index_offset, index_magic = _TRAILER.unpack_from(buffer, size - _TRAILER.size)
+        if index_magic == _INDEX_MAGIC:
+            name, doc = _read_record(buffer, index_offset)
+            if name == _INDEX:
+                return _LogIndex.from_doc(doc), index_offset
+    # Rebuild the index, up to the last complete record.
+    index = _LogIndex()
+    offset = len(_MAGIC)
+    while offset + _LENGTH.size <= size:
+        (length,) = _LENGTH.unpack_from(buffer, offset)
+        end = offset + _LENGTH.size + length
+        if end > size:
+            break
+        try:
+            name, doc = _read_record(buffer, offset)
+        except EventModelValueError:
+            break
+        if name == _INDEX:
+            break
+        index.add(name, doc, offset)
+        offset = end + _padding(end)
+    return index, offset
+
+
+def _close_buffer(buffer: mmap.mmap) -> None:
+    try:
+        buffer.close()
+    except BufferError:
+        # Arrays that were read still refer to the file. It is unmapped when
+        # they are garbage collected.
+        pass
+
+
+def _read_record(buffer: Any, offset: int) -> tuple[str, Any]:
+    (length,) = _LENGTH.unpack_from(buffer, offset)
+    start = offset + _LENGTH.size
+    if start + length > len(buffer):
+        raise EventModelValueError(f"The record at offset {offset} is truncated.")
+    return loads(memoryview(buffer)[start : start + length])
+
+
+class DocumentLogWriter:
+    """
+    Append documents to a document log.
+
+    This is a ``(name, doc)`` callback. The index is written when the writer
+    is closed, so use it as a context manager or call :meth:`close`.
+
+    Parameters
+    ----------
+    path : str or Path
+        The path of the log file.
+    append : bool, optional
+        False by default, in which case any existing file is overwritten. If
+        True, documents are appended to an existing log, if there is one.
+    """
+
+    def __init__(self, path: str | os.PathLike, append: bool = False) -> None:
+        self._path = path
+        self._index = _LogIndex()
+        self._file: BinaryIO
+        if append and os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    self._index, end = _read_log(buffer)
+                finally:
+                    _close_buffer(buffer)
+            self._file = open(path, "r+b")
+            # Drop the old index (or any incomplete record) and append after
+            # the last document.
+            self._file.truncate(end)
+            self._file.seek(end)
+            self._offset = end
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_MAGIC)
+            self._offset = len(_MAGIC)
+        self._closed = False
+
+    def __call__(self, name: str, doc: dict) -> None:
+        if self._closed:
+            raise EventModelValueError("This DocumentLogWriter has been closed.")
+        offset = self._write(name, doc)
+        self._index.add(name, doc, offset)
+
+    def _write(self, name: str, doc: Any) -> int:
+        "Write one record and return its offset."
+        payload = dumps(name, doc)
+        offset = self._offset
+        size = _LENGTH.size + len(payload)
+        self._file.write(_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+        self._file.write(bytes(_padding(size)))
+        self._offset += size + _padding(size)
+        return offset
+
+    def flush(self) -> None:
+        "Flush the written documents to the operating system."
+        self._file.flush()
+
+    def close(self) -> None:
+        "Write the index and close the file."
+        if self._closed:
+            return
+        index_offset = self._write(_INDEX, self._index.to_doc())
+        self._file.write(_TRAILER.pack(index_offset, _INDEX_MAGIC))
+        self._file.close()
+        self._closed = True
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __enter__(self) -> "DocumentLogWriter":
+        return self
+
+    def __exit__(self, *exc_details) -> None:
+        self.close()
+
+
+class DocumentLogReader:
+    """
+    Read documents from a document log.
+
+    The file is memory-mapped. The arrays in the documents are read-only views
+    of it, so they remain valid only while the reader is open (or while they
+    are referenced).
+
+    Parameters
+    ----------
+    path : str or Path
+        The path of the log file.
+
+    Examples
+    --------
+    Replay every document.
+
+    >>> with DocumentLogReader(path) as log:
+    ...     for name, doc in log:
+    ...         ...
+
+    Replay the RunStart, the 'primary' stream and the RunStop of one run,
+    with the Resources and Datums of that run, without reading the rest.
+
+    >>> with DocumentLogReader(path) as log:
+    ...     for name, doc in log.replay(log.runs[-1], stream="primary"):
+    ...         ...
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index, self._end = _read_log(self._buffer)
+        except Exception:
+            self._file.close()
+            raise
+
+    @property
+    def runs(self) -> list[str]:
+        "The uids of the RunStart documents in the log, in order."
+        return list(self._index.runs)
+
+    def streams(self, start_uid: str) -> list[str]:
+        "The names of the streams of a run, in order."
+        return list(self._run(start_uid)[2])
+
+    @property
+    def descriptors(self) -> dict:
+        """
+        Map each EventDescriptor uid to its RunStart uid, its stream name and
+        the offset of its record.
+        """
+        return {uid: tuple(value) for uid, value in self._index.descriptors.items()}
+
+    def _run(self, start_uid: str) -> tuple:
+        try:
+            return self._index.runs[start_uid]
+        except KeyError:
+            raise EventModelKeyError(
+                f"There is no run with RunStart uid {start_uid} in this log."
+            ) from None
+
+    def offsets(self, start_uid: str, stream: str | None = None) -> numpy.ndarray:
+        """
+        Return the offsets of the records of a run, in order.
+
+        If a stream is given, the EventDescriptors, Events, EventPages and
+        StreamDatums of other streams are left out.
+        """
+        offsets, tags, streams = self._run(start_uid)
+        offsets = numpy.frombuffer(offsets, dtype=numpy.uint64)
+        if stream is None:
+            return offsets
+        tags = numpy.frombuffer(tags, dtype=numpy.intc)
+        tag = streams.index(stream) if stream in streams else -2
+        return offsets[(tags == -1) | (tags == tag)]
+
+    def read(self, offset: int) -> tuple[str, Any]:
+        "Read the document in the record at this offset."
+        if not len(_MAGIC) <= offset < self._end:
+            raise EventModelValueError(f"There is no record at offset {offset}.")
+        return _read_record(self._buffer, int(offset))
+
+    def replay(self, start_uid: str, stream: str | None = None) -> Iterator:
+        """
+        Yield the ``(name, doc)`` of one run, in order.
+
+        Parameters
+        ----------
+        start_uid : str
+            The uid of the RunStart document.
+        stream : str, optional
+            If given, only the documents of this stream, along with those
+            common to all the streams (e.g. RunStart, Resource, RunStop), are
+            yielded.
+        """
+        # Look up the offsets now, so that an unknown run is reported now.
+        offsets = self.offsets(start_uid, stream).tolist()
+        return (self.read(offset) for offset in offsets)
+
+    def __iter__(self) -> Iterator:
+        "Yield the ``(name, doc)`` of every document in the log, in order."
+        for _, name, doc in self.records():
+            yield name, doc
+
+    def records(self) -> Iterator:
+        "Yield the ``(offset, name, doc)`` of every record in the log, in order."
+        offset = len(_MAGIC)
+        while offset < self._end:
+            name, doc = self.read(offset)
+            yield offset, name, doc
+            (length,) = _LENGTH.unpack_from(self._buffer, offset)
+            end = offset + _LENGTH.size + length
+            offset = end + _padding(end)
+
+    def close(self) -> None:
+        _close_buffer(self._buffer)
+        self._file.close()
+
+    def __enter__(self) -> "DocumentLogReader":
+        return self
+
+    def __exit__(self, *exc_details) -> None:
+        self.close()
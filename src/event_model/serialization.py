@@ -0,0 +1,437 @@
+"""
+A compact binary serialization of documents, with arrays carried out-of-band.
+
+A ``(name, doc)`` pair is encoded as the MessagePack array ``[name, doc]``,
+except that each numpy array is replaced by a MessagePack extension (of type
+``NDARRAY_EXT_TYPE``) holding ``[dtype, shape, index]``. The array's data is
+not copied into the MessagePack header. Instead it is referenced as a separate
+buffer, the ``index``-th that follows the header.
+
+:func:`encode` returns the header and the buffers as a list of frames, suitable
+for multipart messages or vectored writes, without copying the arrays' data.
+:func:`decode` builds the arrays as views of the frames. :func:`dumps` and
+:func:`loads` do the same with all the frames packed into one ``bytes``.
+
+As with :class:`event_model.NumpyEncoder`, numpy scalars become Python
+scalars, tuples and other sequences become lists, and other mappings become
+dicts. Dask arrays are computed.
+
+Examples
+--------
+>>> data = dumps("event", event)
+>>> name, doc = loads(data)
+"""
+
+import collections.abc
+import struct
+from typing import Any
+
+import numpy
+
+from . import EventModelTypeError, EventModelValueError
+
+# The MessagePack extension type code of numpy arrays.
+NDARRAY_EXT_TYPE = 1
+# Each buffer packed by dumps starts at a multiple of this many bytes, so that
+# the arrays decoded by loads are aligned.
+ALIGNMENT = 64
+# Lists at least this long of only floats (or only ints) are packed and
+# unpacked with numpy, using fixed-width MessagePack items.
+_VECTORIZE_MIN = 16
+
+_FLOAT_ITEMS = numpy.dtype([("marker", "u1"), ("value", ">f8")])
+_INT_ITEMS = numpy.dtype([("marker", "u1"), ("value", ">i8")])
+_DUMPS_HEADER = struct.Struct("<4sI")
+_MAGIC = b"EMB\x01"
+
+
+def _pack_length(out: bytearray, n: int, fix: int, fix_max: int, codes: bytes):
+    "Pack the header of a str, bin, array or map of length n."
+    if n <= fix_max:
+        out.append(fix | n)
+    elif codes[0] and n < 0x100:
+        out.append(codes[0])
+        out.append(n)
+    elif n < 0x10000:
+        out.append(codes[1])
+        out += n.to_bytes(2, "big")
+    elif n < 0x100000000:
+        out.append(codes[2])
+        out += n.to_bytes(4, "big")
+    else:
+        raise EventModelValueError(f"Cannot pack an object of length {n}.")
+
+
+def _pack_int(out: bytearray, obj: int) -> None:
+    if 0 <= obj < 0x80:
+        out.append(obj)
+    elif -0x20 <= obj < 0:
+        out.append(obj & 0xFF)
+    elif 0 <= obj < 0x10000000000000000:
+        if obj < 0x100:
+            out.append(0xCC)
+            out.append(obj)
+        elif obj < 0x10000:
+            out.append(0xCD)
+            out += obj.to_bytes(2, "big")
+        elif obj < 0x100000000:
+            out.append(0xCE)
+            out += obj.to_bytes(4, "big")
+        else:
+            out.append(0xCF)
+            out += obj.to_bytes(8, "big")
+    elif -0x8000000000000000 <= obj < 0:
+        if obj >= -0x80:
+            out.append(0xD0)
+            out += obj.to_bytes(1, "big", signed=True)
+        elif obj >= -0x8000:
+            out.append(0xD1)
+            out += obj.to_bytes(2, "big", signed=True)
+        elif obj >= -0x80000000:
+            out.append(0xD2)
+            out += obj.to_bytes(4, "big", signed=True)
+        else:
+            out.append(0xD3)
+            out += obj.to_bytes(8, "big", signed=True)
+    else:
+        raise OverflowError(f"Integer {obj} is too large to pack.")
+
+
+def _pack_vector(out: bytearray, obj: list, types: set) -> bool:
+    "Pack a long list of only floats or only ints in one go, if possible."
+    if types == {float}:
+        items = numpy.empty(len(obj), dtype=_FLOAT_ITEMS)
+        items["marker"] = 0xCB
+    elif types == {int}:
+        items = numpy.empty(len(obj), dtype=_INT_ITEMS)
+        items["marker"] = 0xD3
+    else:
+        return False
+    try:
+        items["value"] = obj
+    except OverflowError:
+        return False
+    _pack_length(out, len(obj), 0x90, 0x0F, b"\x00\xdc\xdd")
+    out += items.tobytes()
+    return True
+
+
+def _pack_array(out: bytearray, buffers: list, obj: numpy.ndarray) -> None:
+    if obj.dtype.hasobject:
+        _pack(out, buffers, obj.tolist())
+        return
+    if not obj.flags.c_contiguous:
+        obj = numpy.ascontiguousarray(obj)
+    payload = bytearray()
+    descr = numpy.lib.format.dtype_to_descr(obj.dtype)
+    _pack(payload, buffers, [descr, list(obj.shape), len(buffers)])
+    # Viewed as bytes, because not every dtype supports the buffer protocol.
+    buffers.append(obj.reshape(-1).view(numpy.uint8).data)
+    n = len(payload)
+    if n in (1, 2, 4, 8, 16):
+        out.append({1: 0xD4, 2: 0xD5, 4: 0xD6, 8: 0xD7, 16: 0xD8}[n])
+    elif n < 0x100:
+        out.append(0xC7)
+        out.append(n)
+    elif n < 0x10000:
+        out.append(0xC8)
+        out += n.to_bytes(2, "big")
+    else:
+        out.append(0xC9)
+        out += n.to_bytes(4, "big")
+    out.append(NDARRAY_EXT_TYPE)
+    out += payload
+
+
+def _pack(out: bytearray, buffers: list, obj: Any) -> None:
+    type_ = type(obj)
+    if type_ is str:
+        data = obj.encode("utf-8")
+        _pack_length(out, len(data), 0xA0, 0x1F, b"\xd9\xda\xdb")
+        out += data
+    elif type_ is float:
+        out.append(0xCB)
+        out += struct.pack(">d", obj)
+    elif obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif type_ is int:
+        _pack_int(out, obj)
+    elif type_ is dict:
+        _pack_length(out, len(obj), 0x80, 0x0F, b"\x00\xde\xdf")
+        for key, value in obj.items():
+            _pack(out, buffers, key)
+            _pack(out, buffers, value)
+    elif type_ is list or type_ is tuple:
+        if len(obj) >= _VECTORIZE_MIN and _pack_vector(out, obj, set(map(type, obj))):
+            return
+        _pack_length(out, len(obj), 0x90, 0x0F, b"\x00\xdc\xdd")
+        for item in obj:
+            _pack(out, buffers, item)
+    elif isinstance(obj, numpy.ndarray):
+        _pack_array(out, buffers, obj)
+    elif isinstance(obj, numpy.generic):
+        _pack(out, buffers, obj.item())
+    # Subclasses of the types above are packed as their base type.
+    elif isinstance(obj, str):
+        _pack(out, buffers, str(obj))
+    elif isinstance(obj, int):
+        _pack(out, buffers, int(obj))
+    elif isinstance(obj, float):
+        _pack(out, buffers, float(obj))
+    elif isinstance(obj, bytes | bytearray | memoryview):
+        data = bytes(obj)
+        _pack_length(out, len(data), 0, -1, b"\xc4\xc5\xc6")
+        out += data
+    elif isinstance(obj, collections.abc.Mapping):  # e.g. ArrayEventPage
+        _pack(out, buffers, dict(obj))
+    elif isinstance(obj, collections.abc.Sequence):
+        _pack(out, buffers, list(obj))
+    else:
+        try:
+            import dask.array
+
+            if isinstance(obj, dask.array.Array):
+                _pack(out, buffers, numpy.asarray(obj))
+                return
+        except ImportError:
+            pass
+        raise EventModelTypeError(
+            f"Object of type {type_.__name__} cannot be serialized."
+        )
+
+
+def encode(name: str, doc: Any) -> list:
+    """
+    Encode a document as a MessagePack header followed by array buffers.
+
+    The data of contiguous arrays is not copied: their buffers are memoryviews
+    of the arrays, so the arrays must not be modified until the frames have
+    been written.
+
+    Parameters
+    ----------
+    name : str
+        The name of the document, e.g. ``"event_page"``.
+    doc : dict
+        The document.
+
+    Returns
+    -------
+    frames : list
+        The header, as ``bytes``, and a bytes-like object for each array.
+    """
+    header = bytearray()
+    buffers: list = []
+    _pack(header, buffers, [name, doc])
+    return [bytes(header), *buffers]
+
+
+def _tuples(descr: Any) -> Any:
+    "Restore the tuples of a structured dtype's descr, which were packed as lists."
+    if not isinstance(descr, list):
+        return descr
+    # Each field is [name, descr] or [name, descr, shape].
+    return [
+        (field[0], _tuples(field[1]), *(tuple(shape) for shape in field[2:]))
+        for field in descr
+    ]
+
+
+class _Unpacker:
+    "Unpack the MessagePack header of encoded documents."
+
+    def __init__(self, data: bytes, buffers: list) -> None:
+        self.data = data
+        self.pos = 0
+        self.buffers = buffers
+
+    def take(self, n: int) -> bytes:
+        start = self.pos
+        self.pos += n
+        if self.pos > len(self.data):
+            raise EventModelValueError("The serialized document is truncated.")
+        return self.data[start : self.pos]
+
+    def length(self, size: int) -> int:
+        return int.from_bytes(self.take(size), "big")
+
+    def unpack(self) -> Any:
+        code = self.take(1)[0]
+        if code < 0x80:
+            return code
+        if code >= 0xE0:
+            return code - 0x100
+        if 0xA0 <= code <= 0xBF:
+            return self.take(code & 0x1F).decode("utf-8")
+        if 0x90 <= code <= 0x9F:
+            return self.unpack_list(code & 0x0F)
+        if 0x80 <= code <= 0x8F:
+            return self.unpack_dict(code & 0x0F)
+        if code == 0xCB:
+            return struct.unpack(">d", self.take(8))[0]
+        if code == 0xC0:
+            return None
+        if code == 0xC2:
+            return False
+        if code == 0xC3:
+            return True
+        if 0xCC <= code <= 0xCF:
+            return self.length(1 << (code - 0xCC))
+        if 0xD0 <= code <= 0xD3:
+            return int.from_bytes(self.take(1 << (code - 0xD0)), "big", signed=True)
+        if 0xD9 <= code <= 0xDB:
+            return self.take(self.length(1 << (code - 0xD9))).decode("utf-8")
+        if code in (0xDC, 0xDD):
+            return self.unpack_list(self.length(2 if code == 0xDC else 4))
+        if code in (0xDE, 0xDF):
+            return self.unpack_dict(self.length(2 if code == 0xDE else 4))
+        if 0xC4 <= code <= 0xC6:
+            return self.take(self.length(1 << (code - 0xC4)))
+        if code == 0xCA:
+            return struct.unpack(">f", self.take(4))[0]
+        if 0xD4 <= code <= 0xD8:
+            return self.unpack_ext(1 << (code - 0xD4))
+        if 0xC7 <= code <= 0xC9:
+            return self.unpack_ext(self.length(1 << (code - 0xC7)))
+        raise EventModelValueError(f"Invalid MessagePack type code {code:#x}.")
+
+    def unpack_list(self, n: int) -> list:
+        if n >= _VECTORIZE_MIN:
+            code = self.data[self.pos]
+            items_dtype = {0xCB: _FLOAT_ITEMS, 0xD3: _INT_ITEMS}.get(code)
+            if items_dtype is not None and self.pos + 9 * n <= len(self.data):
+                items = numpy.frombuffer(
+                    self.data, dtype=items_dtype, count=n, offset=self.pos
+                )
+                if (items["marker"] == code).all():
+                    self.pos += 9 * n
+                    return items["value"].tolist()
+        unpack = self.unpack
+        return [unpack() for _ in range(n)]
+
+    def unpack_dict(self, n: int) -> dict:
+        unpack = self.unpack
+        result = {}
+        for _ in range(n):
+            key = unpack()
+            result[key] = unpack()
+        return result
+
+    def unpack_ext(self, n: int) -> Any:
+        ext_type = self.take(1)[0]
+        end = self.pos + n
+        if ext_type != NDARRAY_EXT_TYPE:
+            raise EventModelValueError(f"Unknown MessagePack extension {ext_type}.")
+        descr, shape, index = self.unpack()
+        if self.pos != end:
+            raise EventModelValueError("Invalid numpy array extension.")
+        try:
+            buffer = self.buffers[index]
+        except IndexError as err:
+            raise EventModelValueError(
+                f"The serialized document refers to buffer {index} of "
+                f"{len(self.buffers)}."
+            ) from err
+        dtype = numpy.lib.format.descr_to_dtype(_tuples(descr))
+        return numpy.frombuffer(buffer, dtype=dtype).reshape(shape)
+
+
+def decode(frames: list) -> tuple[str, Any]:
+    """
+    Decode a document encoded by :func:`encode`.
+
+    The arrays of the document are views of the given frames, not copies.
+    They are read-only unless the frames are writable.
+
+    Parameters
+    ----------
+    frames : list
+        The header and the array buffers, as bytes-like objects.
+
+    Returns
+    -------
+    name, doc : tuple
+    """
+    if not frames:
+        raise EventModelValueError("There are no frames to decode.")
+    unpacker = _Unpacker(bytes(frames[0]), frames[1:])
+    try:
+        name, doc = unpacker.unpack()
+    except (IndexError, TypeError, ValueError) as err:
+        # e.g. a truncated header, or one that is not a [name, doc] pair.
+        raise EventModelValueError("Invalid serialized document.") from err
+    if unpacker.pos != len(unpacker.data):
+        raise EventModelValueError("Unexpected data after the serialized document.")
+    return name, doc
+
+
+def dumps(name: str, doc: Any) -> bytes:
+    """
+    Serialize a document as bytes.
+
+    The frames of :func:`encode` are preceded by their number and sizes, and
+    each is aligned to ``ALIGNMENT`` bytes.
+
+    Parameters
+    ----------
+    name : str
+        The name of the document, e.g. ``"event_page"``.
+    doc : dict
+        The document.
+
+    Returns
+    -------
+    data : bytes
+    """
+    frames = encode(name, doc)
+    sizes = [memoryview(frame).nbytes for frame in frames]
+    parts: list = [
+        _DUMPS_HEADER.pack(_MAGIC, len(frames)),
+        struct.pack(f"<{len(frames)}Q", *sizes),
+    ]
+    pos = _DUMPS_HEADER.size + 8 * len(frames)
+    for frame, size in zip(frames, sizes, strict=True):
+        padding = -pos % ALIGNMENT
+        parts.append(bytes(padding))
+        parts.append(frame)
+        pos += padding + size
+    # The frames are copied once, straight into the result.
+    return b"".join(parts)
+
+
+def loads(data: Any) -> tuple[str, Any]:
+    """
+    Deserialize a document serialized by :func:`dumps`.
+
+    The arrays of the document are views of ``data``, not copies. They are
+    read-only unless ``data`` is writable.
+
+    Parameters
+    ----------
+    data : bytes-like
+
+    Returns
+    -------
+    name, doc : tuple
+    """
+    data = memoryview(data).cast("B")
+    try:
+        magic, count = _DUMPS_HEADER.unpack_from(data)
+        sizes = struct.unpack_from(f"<{count}Q", data, _DUMPS_HEADER.size)
+    except struct.error as err:
+        raise EventModelValueError("Invalid serialized document.") from err
+    if magic != _MAGIC:
+        raise EventModelValueError("This is not a serialized document.")
+    frames = []
+    pos = _DUMPS_HEADER.size + 8 * count
+    for size in sizes:
+        pos += -pos % ALIGNMENT
+        if pos + size > len(data):
+            raise EventModelValueError("The serialized document is truncated.")
+        frames.append(data[pos : pos + size])
+        pos += size
+    return decode(frames)
@@ -0,0 +1,245 @@
+"""
+Reference stream handlers for reading the data of StreamResources.
+
+These may be registered with :class:`event_model.Filler` through its
+``stream_handler_registry`` parameter, for example::
+
+    from event_model.stream_handlers import STREAM_HANDLERS
+
+    filler = Filler(handler_registry, stream_handler_registry=STREAM_HANDLERS,
+                    inplace=False)
+
+Each handler is constructed from the ``uri`` and ``parameters`` of a
+StreamResource and called with a ``slice`` of the stream's indices. Where the
+file format allows, it returns a view of a memory-mapped file rather than a
+copy. Because they already return numpy arrays, the ``force_numpy`` coercion
+leaves these handlers unchanged.
+
+Reading HDF5 files requires h5py, which is an optional dependency.
+"""
+
+import os
+import urllib.parse
+import urllib.request
+from typing import Any
+
+import numpy
+
+
+def _path_from_uri(uri: str) -> str:
+    "Return the local filesystem path of a file:// URI (or of a plain path)."
+    parsed = urllib.parse.urlparse(uri)
+    if parsed.scheme == "":
+        return uri
+    if parsed.scheme != "file":
+        raise ValueError(f"Only file:// URIs can be read, not {uri!r}")
+    return urllib.request.url2pathname(parsed.path)
+
+
+def _check_available(indices: slice, length: int, path: str) -> None:
+    "Raise an IOError, which Filler retries, if indices go past the end."
+    start, stop, _ = indices.indices(2**63 - 1)
+    if stop > length:
+        raise OSError(
+            f"Indices {start}:{stop} were requested but {path!r} only has "
+            f"{length} so far."
+        )
+
+
+class NPYStreamHandler:
+    """
+    Read a stream from a .npy file, whose first axis is the stream index.
+
+    The file is memory-mapped, so each slice is a view of the file.
+
+    Parameters
+    ----------
+    uri : str
+        A file:// URI.
+    """
+
+    returns_numpy = True
+
+    def __init__(self, uri: str, **parameters: Any) -> None:
+        self._path = _path_from_uri(uri)
+        self._array = self._open()
+
+    def _open(self) -> numpy.ndarray:
+        return numpy.load(self._path, mmap_mode="r")
+
+    def __call__(self, indices: slice) -> numpy.ndarray:
+        if indices.stop is not None and indices.stop > len(self._array):
+            # Another process may have rewritten the file since it was mapped.
+            self._array = self._open()
+            _check_available(indices, len(self._array), self._path)
+        return self._array[indices]
+
+    def get_file_list(self) -> list[str]:
+        return [self._path]
+
+    def close(self) -> None:
+        self._array = None  # type: ignore[assignment]
+
+
+class RawStreamHandler:
+    """
+    Read a stream of fixed-size items from a raw binary file.
+
+    The file is memory-mapped, so each slice is a view of the file. If the
+    file is still being appended to, it is mapped again when indices beyond
+    its end are requested.
+
+    Parameters
+    ----------
+    uri : str
+        A file:// URI.
+    dtype : str
+        The numpy dtype of the values, e.g. ``"<u2"``.
+    shape : list, optional
+        The shape of each item of the stream. Scalar by default.
+    offset : int, optional
+        The number of bytes before the first item, e.g. a header. 0 by
+        default.
+    """
+
+    returns_numpy = True
+
+    def __init__(
+        self,
+        uri: str,
+        dtype: str,
+        shape: list | tuple = (),
+        offset: int = 0,
+        **parameters: Any,
+    ) -> None:
+        self._path = _path_from_uri(uri)
+        self._dtype = numpy.dtype(dtype)
+        self._shape = tuple(shape)
+        self._offset = offset
+        self._array = self._open()
+
+    def _open(self) -> numpy.ndarray:
+        item_size = self._dtype.itemsize * int(numpy.prod(self._shape))
+        length = (os.path.getsize(self._path) - self._offset) // item_size
+        if length <= 0:
+            # numpy.memmap cannot map an empty region.
+            return numpy.empty((0, *self._shape), dtype=self._dtype)
+        return numpy.memmap(
+            self._path,
+            dtype=self._dtype,
+            mode="r",
+            offset=self._offset,
+            shape=(length, *self._shape),
+        )
+
+    def __call__(self, indices: slice) -> numpy.ndarray:
+        if indices.stop is not None and indices.stop > len(self._array):
+            self._array = self._open()
+            _check_available(indices, len(self._array), self._path)
+        return self._array[indices]
+
+    def get_file_list(self) -> list[str]:
+        return [self._path]
+
+    def close(self) -> None:
+        self._array = None  # type: ignore[assignment]
+
+
+class HDF5StreamHandler:
+    """
+    Read a stream from a dataset in an HDF5 file, whose first axis is the
+    stream index.
+
+    If the dataset is stored contiguously and uncompressed, it is
+    memory-mapped and each slice is a view of the file. Otherwise it is read
+    with h5py, using a chunk cache sized for reading many consecutive frames.
+
+    This requires h5py.
+
+    Parameters
+    ----------
+    uri : str
+        A file:// URI.
+    dataset : str
+        The path of the dataset within the file, e.g. ``"/entry/data/data"``.
+    swmr : bool, optional
+        Open the file in single-writer-multiple-reader mode, to read a file
+        that is still being written. False by default.
+    chunk_cache_bytes : int, optional
+        The size of the HDF5 chunk cache. 64 MiB by default, rather than
+        HDF5's default of 1 MiB, which holds only a few detector frames.
+    chunk_cache_slots : int, optional
+        The number of slots in the chunk cache's hash table. This should be a
+        prime number, much larger than the number of chunks that fit in the
+        cache. 100003 by default.
+    """
+
+    returns_numpy = True
+
+    def __init__(
+        self,
+        uri: str,
+        dataset: str,
+        swmr: bool = False,
+        chunk_cache_bytes: int = 64 * 2**20,
+        chunk_cache_slots: int = 100003,
+        **parameters: Any,
+    ) -> None:
+        try:
+            import h5py
+        except ImportError as err:
+            raise ImportError(
+                "The HDF5StreamHandler requires h5py, which is not installed."
+            ) from err
+        self._path = _path_from_uri(uri)
+        self._swmr = swmr
+        self._file = h5py.File(
+            self._path,
+            "r",
+            swmr=swmr,
+            rdcc_nbytes=chunk_cache_bytes,
+            rdcc_nslots=chunk_cache_slots,
+            # Frames are read in order, so evict fully read chunks first.
+            rdcc_w0=1.0,
+        )
+        self._dataset = self._file[dataset]
+        self._array = None
+        offset = self._dataset.id.get_offset()
+        if (
+            not swmr
+            and self._dataset.chunks is None
+            and self._dataset.compression is None
+            and offset is not None
+            and not self._dataset.dtype.hasobject
+        ):
+            self._array = numpy.memmap(
+                self._path,
+                dtype=self._dataset.dtype,
+                mode="r",
+                offset=offset,
+                shape=self._dataset.shape,
+            )
+
+    def __call__(self, indices: slice) -> numpy.ndarray:
+        if self._array is not None:
+            _check_available(indices, len(self._array), self._path)
+            return self._array[indices]
+        if self._swmr:
+            self._dataset.refresh()
+        _check_available(indices, len(self._dataset), self._path)
+        return self._dataset[indices]
+
+    def get_file_list(self) -> list[str]:
+        return [self._path]
+
+    def close(self) -> None:
+        self._array = None
+        self._file.close()
+
+
+# Map each mimetype to the handler above that reads it.
+STREAM_HANDLERS = {
+    "application/x-hdf5": HDF5StreamHandler,
+    "application/x-npy": NPYStreamHandler,
+    "application/octet-stream": RawStreamHandler,
+}
@@ -0,0 +1,119 @@
+import numpy
+import pytest
+
+import event_model
+from event_model.document_index import DocumentIndex
+from event_model.document_log import DocumentLogReader, DocumentLogWriter
+from event_model.documents.stream_datum import StreamRange
+
+
+def _documents():
+    "Yield the (name, doc) of a run with Events in pages of 4 and a single Event."
+    run_bundle = event_model.compose_run()
+    yield "start", run_bundle.start_doc
+    primary = run_bundle.compose_descriptor(
+        data_keys={"x": {"shape": [], "dtype": "number", "source": "..."}},
+        name="primary",
+    )
+    yield "descriptor", primary.descriptor_doc
+    baseline = run_bundle.compose_descriptor(
+        data_keys={"y": {"shape": [], "dtype": "number", "source": "..."}},
+        name="baseline",
+    )
+    yield "descriptor", baseline.descriptor_doc
+    yield (
+        "event",
+        baseline.compose_event(data={"y": 0}, timestamps={"y": 0}, seq_num=1),
+    )
+    resource = run_bundle.compose_resource(
+        spec="DUMMY", root="/", resource_path="a.h5", resource_kwargs={}
+    )
+    yield "resource", resource.resource_doc
+    for first in range(1, 13, 4):
+        seq_num = list(range(first, first + 4))
+        yield (
+            "event_page",
+            primary.compose_event_page(
+                data={"x": numpy.asarray(seq_num, dtype=float)},
+                timestamps={"x": [0] * 4},
+                seq_num=seq_num,
+                validate=False,
+            ),
+        )
+        yield (
+            "datum_page",
+            resource.compose_datum_page(datum_kwargs={"n": seq_num}),
+        )
+    yield (
+        "event",
+        primary.compose_event(data={"x": 13}, timestamps={"x": 0}, seq_num=13),
+    )
+    stream_resource, compose_stream_datum = run_bundle.compose_stream_resource(
+        mimetype="application/x-hdf5", data_key="det", uri="file:///a.h5", parameters={}
+    )
+    yield "stream_resource", stream_resource
+    for start in (0, 5):
+        yield (
+            "stream_datum",
+            compose_stream_datum(
+                StreamRange(start=start, stop=start + 5),
+                StreamRange(start=start + 1, stop=start + 6),
+                primary.descriptor_doc,
+            ),
+        )
+    yield "stop", run_bundle.compose_stop()
+
+
+def _check(index, read, positions):
+    (start_uid,) = index.runs
+    assert index.run_positions(start_uid) == (positions[0], positions[-1])
+    streams = index.streams(start_uid)
+    assert list(streams) == ["primary", "baseline"]
+    assert index.descriptor_to_start(streams["primary"][0]) == start_uid
+    assert index.seq_num_range(start_uid, "primary") == (1, 13)
+    assert index.seq_num_range(start_uid, "baseline") == (1, 1)
+
+    # Pages that only partly overlap the range are trimmed.
+    pages = list(index.read_events(read, start_uid, "primary", 3, 10))
+    assert [list(page["seq_num"]) for page in pages] == [[3, 4], [5, 6, 7, 8], [9]]
+    numpy.testing.assert_array_equal(pages[0]["data"]["x"], [3.0, 4.0])
+    assert len(pages[0]["uid"]) == 2
+    pages = list(index.read_events(read, start_uid, "primary", 12))
+    assert [list(page["seq_num"]) for page in pages] == [[12], [13]]
+    assert len(index.event_positions(start_uid, "primary")) == 4
+    assert not len(index.event_positions(start_uid, "primary", 14))
+    with pytest.raises(event_model.EventModelKeyError):
+        index.event_positions(start_uid, "other")
+    with pytest.raises(event_model.EventModelKeyError):
+        index.streams("unknown")
+
+    (resource_uid, stream_resource_uid) = index._resources
+    assert index.resource_to_start(resource_uid) == start_uid
+    datum_positions, counts = index.datum_positions(resource_uid)
+    assert counts.tolist() == [4, 4, 4]
+    assert [read(position)[0] for position in datum_positions] == ["datum_page"] * 3
+    ranges = index.stream_datum_ranges(stream_resource_uid)
+    assert ranges[:, :4].tolist() == [[0, 5, 1, 6], [5, 10, 6, 11]]
+    assert read(int(ranges[1, 4]))[0] == "stream_datum"
+
+
+def test_document_index(tmp_path):
+    documents = list(_documents())
+    index = DocumentIndex.from_documents(documents)
+    _check(index, documents.__getitem__, list(range(len(documents))))
+
+    index.save(tmp_path / "documents.emindex")
+    loaded = DocumentIndex.load(tmp_path / "documents.emindex")
+    assert loaded.to_doc().keys() == index.to_doc().keys()
+    _check(loaded, documents.__getitem__, list(range(len(documents))))
+
+    path = tmp_path / "documents.emlog"
+    with DocumentLogWriter(path) as writer:
+        for name, doc in documents:
+            writer(name, doc)
+    with DocumentLogReader(path) as log:
+        index = DocumentIndex.from_log(log)
+        _check(index, log.read, [offset for offset, _, _ in log.records()])
+
+    with pytest.raises(event_model.EventModelValueError):
+        DocumentIndex.load(path)
@@ -0,0 +1,127 @@
+import numpy
+import pytest
+
+import event_model
+from event_model.document_log import DocumentLogReader, DocumentLogWriter
+
+
+def _interleaved_runs():
+    """
+    Yield the (name, doc) of two interleaved runs, with the position of the
+    run and the name of the stream (or None) of each.
+    """
+    runs = []
+    for i in range(2):
+        run_bundle = event_model.compose_run(metadata={"scan_id": i})
+        primary = run_bundle.compose_descriptor(
+            data_keys={"image": {"shape": [2, 2], "dtype": "array", "source": "..."}},
+            name="primary",
+        )
+        baseline = run_bundle.compose_descriptor(
+            data_keys={"motor": {"shape": [], "dtype": "number", "source": "..."}},
+            name="baseline",
+        )
+        resource = run_bundle.compose_resource(
+            spec="DUMMY", root="/", resource_path=f"{i}.h5", resource_kwargs={}
+        )
+        runs.append((run_bundle, primary, baseline, resource))
+    for i, (run_bundle, *_) in enumerate(runs):
+        yield "start", run_bundle.start_doc, i, None
+    for i, (_, primary, baseline, resource) in enumerate(runs):
+        yield "descriptor", primary.descriptor_doc, i, "primary"
+        yield "descriptor", baseline.descriptor_doc, i, "baseline"
+        yield "resource", resource.resource_doc, i, None
+        datum_page = resource.compose_datum_page(datum_kwargs={"n": [0, 1]})
+        yield "datum_page", datum_page, i, None
+    for seq_num in (1, 2):
+        for i, (_, primary, baseline, _) in enumerate(runs):
+            event = baseline.compose_event(
+                data={"motor": seq_num}, timestamps={"motor": 0}, seq_num=seq_num
+            )
+            yield "event", event, i, "baseline"
+            event_page = primary.compose_event_page(
+                data={"image": numpy.full((3, 2, 2), seq_num, dtype="<f4")},
+                timestamps={"image": [0, 0, 0]},
+                seq_num=[1, 2, 3],
+                validate=False,
+            )
+            yield "event_page", event_page, i, "primary"
+    for i, (run_bundle, *_) in enumerate(runs):
+        yield "stop", run_bundle.compose_stop(), i, None
+
+
+def _assert_same(actual, expected):
+    actual = [(name, event_model.sanitize_doc(doc)) for name, doc in actual]
+    expected = [(name, event_model.sanitize_doc(doc)) for name, doc, *_ in expected]
+    assert actual == expected
+
+
+@pytest.mark.parametrize("close", [True, False])
+def test_document_log(tmp_path, close):
+    path = tmp_path / "documents.emlog"
+    documents = list(_interleaved_runs())
+    writer = DocumentLogWriter(path)
+    for name, doc, _, _ in documents:
+        writer(name, doc)
+    if close:
+        writer.close()
+        assert writer.closed
+    else:
+        # As if the writer crashed: the index is rebuilt by the reader.
+        writer.flush()
+
+    start_uids = [doc["uid"] for name, doc, _, _ in documents if name == "start"]
+    with DocumentLogReader(path) as reader:
+        _assert_same(reader, documents)
+        assert reader.runs == start_uids
+        assert reader.streams(start_uids[1]) == ["primary", "baseline"]
+        _assert_same(
+            reader.replay(start_uids[1]),
+            [document for document in documents if document[2] == 1],
+        )
+        _assert_same(
+            reader.replay(start_uids[1], stream="primary"),
+            [
+                document
+                for document in documents
+                if document[2] == 1 and document[3] in (None, "primary")
+            ],
+        )
+        assert [name for name, _ in reader.replay(start_uids[0], "other")] == [
+            "start",
+            "resource",
+            "datum_page",
+            "stop",
+        ]
+        # Arrays are views of the file.
+        name, doc = reader.read(reader.offsets(start_uids[0], "primary")[-2])
+        assert name == "event_page"
+        assert not doc["data"]["image"].flags.writeable
+        with pytest.raises(event_model.EventModelKeyError):
+            reader.replay("unknown")
+    if not close:
+        writer.close()
+
+
+def test_document_log_append(tmp_path):
+    path = tmp_path / "documents.emlog"
+    first = list(_interleaved_runs())
+    second = list(_interleaved_runs())
+    with DocumentLogWriter(path) as writer:
+        for name, doc, _, _ in first:
+            writer(name, doc)
+    with DocumentLogWriter(path, append=True) as writer:
+        for name, doc, _, _ in second:
+            writer(name, doc)
+    with DocumentLogReader(path) as reader:
+        _assert_same(reader, first + second)
+        assert len(reader.runs) == 4
+        _assert_same(
+            reader.replay(reader.runs[3]),
+            [document for document in second if document[2] == 1],
+        )
+
+    with open(path, "wb") as file:
+        file.write(b"something else")
+    with pytest.raises(event_model.EventModelValueError):
+        DocumentLogReader(path)
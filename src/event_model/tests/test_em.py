@@ -1,6 +1,11 @@
+import builtins
 import json
 import pickle
+import sys
+import types
+import uuid
 
+import jsonschema
 import numpy
 import pytest
 
@@ -44,6 +49,119 @@ def test_schema_validators():
     assert len(event_model.schema_validators) == len(event_model.schemas)
 
 
+def _mutations(doc):
+    "Yield copies of doc with one value replaced, one key removed or added."
+    replacements = [None, True, 1, 1.5, "x", "X:", [], ["x"], [1, "x"], {}, {"a": 1}]
+    if isinstance(doc, dict):
+        yield {**doc, "unexpected": 1}
+        for key, value in doc.items():
+            yield {k: v for k, v in doc.items() if k != key}
+            for replacement in replacements:
+                yield {**doc, key: replacement}
+            for mutated in _mutations(value):
+                yield {**doc, key: mutated}
+    elif isinstance(doc, list):
+        for index, value in enumerate(doc):
+            for replacement in replacements:
+                yield doc[:index] + [replacement] + doc[index + 1 :]
+            for mutated in _mutations(value):
+                yield doc[:index] + [mutated] + doc[index + 1 :]
+
+
+def test_compiled_schema_validators():
+    "The compiled validators accept and reject the same documents as jsonschema."
+    bundle = event_model.compose_run(
+        metadata={
+            "data_session": "s",
+            "hints": {"dimensions": [[["x"], "primary"]]},
+            "projections": [
+                {
+                    "name": "p",
+                    "version": "1",
+                    "configuration": {},
+                    "projection": {
+                        "a": {
+                            "type": "linked",
+                            "location": "event",
+                            "stream": "primary",
+                            "field": "x",
+                        },
+                        "b": {"type": "static", "value": 1},
+                    },
+                }
+            ],
+        }
+    )
+    desc_bundle = bundle.compose_descriptor(
+        data_keys={
+            "x": {
+                "shape": [],
+                "dtype": "number",
+                "dtype_numpy": "<f8",
+                "source": "...",
+                "limits": {"control": {"low": 0, "high": 1}},
+            },
+            "y": {
+                "shape": [2],
+                "dtype": "array",
+                "dtype_numpy": [["a", "<i4"], ["b", "<f8"]],
+                "source": "...",
+                "external": "FILESTORE:",
+            },
+        },
+        configuration={"det": {"data": {}, "timestamps": {}, "data_keys": {}}},
+        hints={"det": {"fields": ["x"]}},
+        object_keys={"det": ["x"]},
+        name="primary",
+    )
+    res_bundle = bundle.compose_resource(
+        spec="S", root="/", resource_path="p", resource_kwargs={"a": 1}
+    )
+    stream_res_bundle = bundle.compose_stream_resource(
+        mimetype="application/x-hdf5", uri="file:///p", data_key="z", parameters={}
+    )
+    documents = {
+        "start": bundle.start_doc,
+        "descriptor": desc_bundle.descriptor_doc,
+        "resource": res_bundle.resource_doc,
+        "datum": res_bundle.compose_datum({"b": 1}),
+        "datum_page": res_bundle.compose_datum_page({"b": [1, 2]}),
+        "event": desc_bundle.compose_event(
+            data={"x": 1, "y": "id"}, timestamps={"x": 1, "y": 1}, filled={"y": False}
+        ),
+        "event_page": desc_bundle.compose_event_page(
+            data={"x": [1, 2], "y": ["a", "b"]},
+            timestamps={"x": [1, 2], "y": [1, 2]},
+            filled={"y": [False, "a"]},
+        ),
+        "stream_resource": stream_res_bundle.stream_resource_doc,
+        "stream_datum": stream_res_bundle.compose_stream_datum(
+            StreamRange(start=0, stop=2), StreamRange(start=1, stop=3)
+        ),
+        "stop": bundle.compose_stop(),
+    }
+    for name, doc in documents.items():
+        validator = event_model.schema_validators[event_model.DocumentNames[name]]
+        assert validator.compiled
+        assert validator._check(doc)
+        for mutated in _mutations(doc):
+            expected = validator.validator.is_valid(mutated)
+            assert validator._check(mutated) == expected, (name, mutated)
+            assert validator.is_valid(mutated) == expected
+            if not expected:
+                with pytest.raises(jsonschema.ValidationError):
+                    validator.validate(mutated)
+
+    # Valid documents that the compiled check is too strict for fall back to
+    # jsonschema, which accepts them.
+    event = documents["event"]
+    validator = event_model.schema_validators[event_model.DocumentNames.event]
+    numpy_event = {**event, "time": numpy.int64(1)}
+    assert validator.validator.is_valid(numpy_event)
+    assert validator.is_valid(numpy_event)
+    validator.validate(numpy_event)
+
+
 def test_compose_run():
     # Compose each kind of document type. These calls will trigger
     # jsonschema.validate and ensure that the document-generation code composes
@@ -98,6 +216,38 @@ def test_compose_run():
     assert stop_doc["num_events"]["primary"] == 3
 
 
+def test_compose_event_key_validation():
+    bundle = event_model.compose_run()
+    _, compose_event, compose_event_page = bundle.compose_descriptor(
+        data_keys={
+            "motor": {"shape": [], "dtype": "number", "source": "..."},
+            "det": {
+                "shape": [],
+                "dtype": "number",
+                "source": "...",
+                "external": "STREAM:",
+            },
+        },
+        name="primary",
+    )
+    # "STREAM:" keys may be present or absent.
+    compose_event(data={"motor": 0}, timestamps={"motor": 0})
+    compose_event(data={"motor": 0, "det": 0}, timestamps={"motor": 0})
+    compose_event_page(data={"motor": [0]}, timestamps={"motor": [0]})
+    with pytest.raises(event_model.EventModelValidationError):
+        compose_event(data={}, timestamps={"motor": 0})
+    with pytest.raises(event_model.EventModelValidationError):
+        compose_event_page(data={"motor": [0]}, timestamps={"det": [0]})
+    with pytest.raises(event_model.EventModelValidationError):
+        compose_event(
+            data={"motor": 0}, timestamps={"motor": 0}, filled={"other": False}
+        )
+    with pytest.raises(KeyError):
+        compose_event(data={"motor": 0, "other": 0}, timestamps={"motor": 0})
+    # Nothing is checked without validation.
+    compose_event(data={}, timestamps={}, validate=False)
+
+
 def test_compose_stream_resource(tmp_path):
     """
     Following the example of test_compose_run, focus only on the stream resource and
@@ -310,6 +460,57 @@ def test_sanitize_doc():
     json.dumps(event_model.sanitize_doc(bulk_events))
     json.dumps(event_model.sanitize_doc(event1))
 
+    # The result is that of a round-trip through JSON.
+    doc = {
+        "tuple": (1, 2.5, numpy.float32(1.5), numpy.int64(3), numpy.bool_(True)),
+        1: [numpy.arange(3), numpy.array(["a", "b"]), numpy.str_("c")],
+        2.5: {"nested": numpy.ones((2, 2), dtype="f4")},
+        "object": numpy.array([numpy.int64(1), "x"], dtype=object),
+        "page": event_page,
+    }
+    expected = json.loads(json.dumps(doc, cls=event_model.NumpyEncoder))
+    assert event_model.sanitize_doc(doc) == expected
+    assert repr(event_model.sanitize_doc(doc)) == repr(expected)
+    with pytest.raises(TypeError):
+        event_model.sanitize_doc({"a": object()})
+
+    # Documents without numpy objects are copied, unless copy=False.
+    sanitized = event_model.sanitize_doc(expected)
+    assert sanitized == expected
+    assert sanitized["page"]["data"] is not expected["page"]["data"]
+    assert event_model.sanitize_doc(expected, copy=False) is expected
+    sanitized = event_model.sanitize_doc(dict(expected, extra=numpy.int8(1)), False)
+    assert sanitized["extra"] == 1
+    assert sanitized["page"] is expected["page"]
+
+
+def test_sanitize_doc_numpy_objects(monkeypatch):
+    "numpy objects are converted without trying to import dask each time."
+    doc = {
+        "scalars": {f"{i}": numpy.int64(i) for i in range(2000)},
+        "arrays": [numpy.arange(3, dtype="f4") for _ in range(1000)],
+    }
+    imports = []
+    real_import = builtins.__import__
+
+    def record_import(name, *args, **kwargs):
+        imports.append(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", record_import)
+    sanitized = event_model.sanitize_doc(doc)
+    assert not imports
+    monkeypatch.undo()
+    assert sanitized == json.loads(json.dumps(doc, cls=event_model.NumpyEncoder))
+
+    # Dask arrays, if dask has been imported, are computed.
+    class Array:
+        def __array__(self, dtype=None, copy=None):
+            return numpy.arange(2)
+
+    monkeypatch.setitem(sys.modules, "dask.array", types.SimpleNamespace(Array=Array))
+    assert event_model.sanitize_doc({"a": Array()}) == {"a": [0, 1]}
+
 
 def test_bulk_datum_to_datum_page():
     run_bundle = event_model.compose_run()
@@ -732,6 +933,123 @@ def test_document_router_dispatch_datum():
     datum_page_calls.clear()
 
 
+def test_document_router_dispatch_table(monkeypatch):
+    class EventOnly(event_model.DocumentRouter):
+        def event(self, doc):
+            return doc
+
+    class StartOnly(event_model.DocumentRouter):
+        def start(self, doc):
+            return doc
+
+    class Inherits(EventOnly):
+        def datum_page(self, doc):
+            return doc
+
+    assert "event" not in EventOnly._unimplemented
+    assert "event_page" in EventOnly._unimplemented
+    assert StartOnly._unimplemented == frozenset(event_model.DocumentRouter._STUBS) - {
+        "start"
+    }
+    assert {"event", "datum_page"}.isdisjoint(Inherits._unimplemented)
+
+    page = {
+        "descriptor": "d",
+        "uid": ["a"],
+        "time": [0],
+        "seq_num": [1],
+        "data": {},
+        "timestamps": {},
+        "filled": {},
+    }
+    # A router that implements neither event nor event_page passes documents
+    # through without packing or unpacking them.
+    monkeypatch.setattr(event_model, "pack_event_page", None)
+    monkeypatch.setattr(event_model, "unpack_event_page", None)
+    assert StartOnly()("event_page", page) == ("event_page", page)
+
+
+def test_document_router_instance_methods():
+    "Methods assigned on an instance are dispatched to, as on a subclass."
+    seen = []
+    router = event_model.DocumentRouter()
+    router.start = lambda doc: seen.append(("start", doc))
+    router.event = lambda doc: seen.append(("event", doc["seq_num"]))
+    start_doc = {"uid": "s", "time": 0}
+    assert router("start", start_doc) == ("start", start_doc)
+    page = {
+        "descriptor": "d",
+        "uid": ["a", "b"],
+        "time": [0, 1],
+        "seq_num": [1, 2],
+        "data": {},
+        "timestamps": {},
+        "filled": {},
+    }
+    # The event_page falls back to the event assigned on the instance.
+    router("event_page", page)
+    assert seen == [("start", start_doc), ("event", 1), ("event", 2)]
+    # Other instances of the class are unaffected.
+    seen.clear()
+    event_model.DocumentRouter()("start", start_doc)
+    assert not seen
+
+
+def test_document_router_page_fallback_without_repacking():
+    class Watcher(event_model.DocumentRouter):
+        def event(self, doc):
+            self.seen = doc["seq_num"]
+
+        def datum(self, doc):
+            return doc
+
+    class Scaler(event_model.DocumentRouter):
+        def event(self, doc):
+            doc["data"]["x"] *= 10
+
+    class Copier(event_model.DocumentRouter):
+        def event(self, doc):
+            return {**doc, "data": {**doc["data"], "y": doc["data"]["y"] + 1}}
+
+    class Restructurer(event_model.DocumentRouter):
+        def event(self, doc):
+            return {**doc, "data": {"z": 0}, "timestamps": {"z": 0}}
+
+    page = {
+        "descriptor": "d",
+        "uid": ["a", "b", "c"],
+        "time": [0, 1, 2],
+        "seq_num": [1, 2, 3],
+        "data": {"x": [1, 2, 3], "y": numpy.array([4, 5, 6])},
+        "timestamps": {"x": [0, 1, 2], "y": [0, 1, 2]},
+        "filled": {},
+    }
+    watcher = Watcher()
+    assert watcher("event_page", page)[1] is page
+    assert watcher.seen == 3
+    datum_page = {
+        "resource": "r",
+        "datum_id": ["a", "b"],
+        "datum_kwargs": {"i": [1, 2]},
+    }
+    assert watcher("datum_page", datum_page)[1] is datum_page
+
+    _, scaled = Scaler()("event_page", page)
+    assert scaled["data"]["x"] == [10, 20, 30]
+    assert page["data"]["x"] == [1, 2, 3]
+    # Unchanged columns are not copied.
+    assert scaled["data"]["y"] is page["data"]["y"]
+    assert scaled["uid"] is page["uid"]
+
+    _, copied = Copier()("event_page", page)
+    assert copied["data"]["y"] == [5, 6, 7]
+    assert copied["data"]["x"] is page["data"]["x"]
+
+    _, restructured = Restructurer()("event_page", page)
+    assert restructured["data"] == {"z": [0, 0, 0]}
+    assert restructured["uid"] == page["uid"]
+
+
 def test_single_run_document_router():
     sr = event_model.SingleRunDocumentRouter()
     with pytest.raises(event_model.EventModelError):
@@ -864,6 +1182,175 @@ def test_rechunk_event_pages(filled):
     assert event_pages == list(event_pages_13)
 
 
+def test_array_event_page():
+    bundle = event_model.compose_run()
+    descriptor, _, compose_event_page = bundle.compose_descriptor(
+        data_keys={
+            "motor": {"shape": [], "dtype": "number", "source": "..."},
+            "count": {
+                "shape": [],
+                "dtype": "integer",
+                "dtype_numpy": "<u2",
+                "source": "...",
+            },
+            "label": {"shape": [], "dtype": "string", "source": "..."},
+            "image": {
+                "shape": [2],
+                "dtype": "array",
+                "source": "...",
+                "external": "FILESTORE:",
+            },
+        },
+        name="primary",
+    )
+    pages = [
+        compose_event_page(
+            data={
+                "motor": [0, 1.5, 2],
+                "count": [1, 2, 3],
+                "label": ["a", "b", "c"],
+                "image": ["d1", "d2", "d3"],
+            },
+            timestamps={key: [1, 2, 3] for key in ("motor", "count", "label", "image")},
+            filled={"image": [False] * 3},
+        )
+        for _ in range(3)
+    ]
+    array_pages = [event_model.ArrayEventPage(page, descriptor) for page in pages]
+    page = array_pages[0]
+    assert page["time"].dtype == numpy.float64
+    assert page["seq_num"].dtype == numpy.int64
+    assert page["data"]["motor"].dtype == numpy.float64
+    assert page["data"]["count"].dtype == numpy.uint16
+    assert page["timestamps"]["label"].dtype == numpy.float64
+    assert page["data"]["label"] == ["a", "b", "c"]
+    assert page["data"]["image"] == ["d1", "d2", "d3"]
+    assert page.to_event_page() == pages[0]
+    assert event_model.sanitize_doc(page) == pages[0]
+    assert pickle.loads(pickle.dumps(page)).to_event_page() == pages[0]
+    assert dict(event_model.ArrayEventPage(pages[0]).to_event_page()) == pages[0]
+    event_model.schema_validators[event_model.DocumentNames.event_page].validate(
+        page.to_event_page()
+    )
+
+    # Values that cannot be converted without loss are kept as they are.
+    lossy = event_model.ArrayEventPage(
+        {**pages[0], "data": {**pages[0]["data"], "count": [1.5, None, 3]}},
+        descriptor,
+    )
+    assert lossy["data"]["count"] == [1.5, None, 3]
+
+    view = page.slice(1, 3)
+    assert view["data"]["motor"].base is page["data"]["motor"]
+    assert view["uid"] == pages[0]["uid"][1:3]
+    merged = event_model.merge_event_pages(array_pages)
+    assert isinstance(merged, event_model.ArrayEventPage)
+    assert merged.to_event_page() == event_model.merge_event_pages(pages)
+    rechunked = list(event_model.rechunk_event_pages(array_pages, 4))
+    assert [len(page["uid"]) for page in rechunked] == [4, 4, 1]
+    assert all(isinstance(page, event_model.ArrayEventPage) for page in rechunked)
+    assert [page.to_event_page() for page in rechunked] == list(
+        event_model.rechunk_event_pages(pages, 4)
+    )
+    assert list(event_model.unpack_event_page(page)) == list(
+        event_model.unpack_event_page(pages[0])
+    )
+
+
+def test_compose_event_page_from_arrays():
+    bundle = event_model.compose_run()
+    _, compose_event, compose_event_page = bundle.compose_descriptor(
+        data_keys={
+            "motor": {"shape": [], "dtype": "number", "source": "..."},
+            "image": {"shape": [2, 2], "dtype": "array", "source": "..."},
+        },
+        name="primary",
+    )
+    compose_event(
+        data={"motor": 0, "image": [[0, 0], [0, 0]]},
+        timestamps={"motor": 0, "image": 0},
+    )
+    motor = numpy.linspace(0, 1, 1000)
+    image = numpy.zeros((1000, 2, 2), dtype="<u2")
+    page = compose_event_page.from_arrays(
+        data={"motor": motor, "image": image},
+        timestamps={"motor": numpy.arange(1000.0), "image": 5},
+        time=7,
+    )
+    assert isinstance(page, event_model.ArrayEventPage)
+    assert page["data"]["motor"] is motor
+    assert page["data"]["image"] is image
+    numpy.testing.assert_array_equal(page["seq_num"], numpy.arange(2, 1002))
+    numpy.testing.assert_array_equal(page["timestamps"]["image"], [5.0] * 1000)
+    numpy.testing.assert_array_equal(page["time"], [7.0] * 1000)
+    uids = page["uid"].tolist()
+    assert len(set(uids)) == 1000
+    for uid in uids:
+        assert str(uuid.UUID(uid)) == uid
+        assert uuid.UUID(uid).version == 4
+    event_model.schema_validators[event_model.DocumentNames.event_page].validate(
+        page.to_event_page()
+    )
+    next_page = compose_event_page.from_arrays(
+        data={"motor": motor[:2], "image": image[:2]},
+        timestamps={"motor": 0, "image": 0},
+    )
+    assert next_page["seq_num"].tolist() == [1002, 1003]
+    assert bundle.compose_stop()["num_events"]["primary"] == 1003
+
+    with pytest.raises(event_model.EventModelError):
+        compose_event_page.from_arrays(
+            data={"motor": motor, "image": image[:2]}, timestamps={}
+        )
+    with pytest.raises(event_model.EventModelError):
+        compose_event_page.from_arrays(
+            data={"motor": motor, "image": image},
+            timestamps={"motor": motor[:2], "image": 0},
+        )
+    with pytest.raises(event_model.EventModelValidationError):
+        compose_event_page.from_arrays(data={"motor": motor}, timestamps={"motor": 0})
+
+
+def test_rechunk_event_pages_without_copies():
+    def page(start, stop, column):
+        return {
+            "descriptor": "DESCRIPTOR",
+            "uid": [str(i) for i in range(start, stop)],
+            "time": column(range(start, stop)),
+            "seq_num": list(range(start, stop)),
+            "data": {"x": column(range(start, stop))},
+            "timestamps": {"x": column(range(start, stop))},
+            "filled": {},
+        }
+
+    pages = [page(0, 4, list), page(4, 8, numpy.array), page(8, 10, list)]
+    # A chunk coinciding with an input page is that page.
+    assert next(event_model.rechunk_event_pages(pages, 4)) is pages[0]
+    chunks = list(event_model.rechunk_event_pages(pages, 3))
+    assert [len(chunk["uid"]) for chunk in chunks] == [3, 3, 3, 1]
+    assert [chunk["data"]["x"][0] for chunk in chunks] == [0, 3, 6, 9]
+    # Array columns of chunks within one input page are views.
+    chunk = list(event_model.rechunk_event_pages(pages, 2))[2]
+    assert chunk["data"]["x"].base is pages[1]["data"]["x"]
+    # Chunks straddling pages are copied.
+    assert chunks[1]["data"]["x"] == [3, 4, 5]
+    assert list(event_model.rechunk_event_pages(chunks, 10)) == [
+        event_model.merge_event_pages(pages)
+    ]
+
+    views = list(event_model.rechunk_event_pages(pages, 3, views=True))
+    view = views[0]["data"]["x"]
+    assert not isinstance(view, list)
+    assert view == [0, 1, 2] and [0, 1, 2] == view
+    assert view[1:] == [1, 2] and view[-1] == 2 and len(view) == 3
+    assert pickle.loads(pickle.dumps(view)) == [0, 1, 2]
+    assert event_model.sanitize_doc(views[0]) == chunks[0]
+    assert views == chunks
+    event_model.schema_validators[event_model.DocumentNames.event_page].validate(
+        views[0]
+    )
+
+
 def test_rechunk_datum_pages():
     def datum_page_gen(page_size, num_pages):
         """
@@ -966,6 +1453,49 @@ def test_round_trip_event_page_with_empty_data():
     assert page_again == event_page
 
 
+@pytest.mark.parametrize("views", [False, True])
+def test_unpack_event_page_lazily(views):
+    class Column(list):
+        "A list that records the rows that were read from it."
+
+        def __init__(self, values):
+            super().__init__(values)
+            self.read = set()
+
+        def __iter__(self):
+            for index, value in enumerate(super().__iter__()):
+                self.read.add(index)
+                yield value
+
+        def __getitem__(self, index):
+            self.read.add(index)
+            return super().__getitem__(index)
+
+    n = 1000
+    x = Column(range(n))
+    event_page = {
+        "time": list(range(n)),
+        "seq_num": list(range(n)),
+        "uid": [str(i) for i in range(n)],
+        "descriptor": "d",
+        "data": {"x": x, "y": list(range(n))},
+        "timestamps": {"x": list(range(n)), "y": list(range(n))},
+        "filled": {},
+    }
+    events = event_model.unpack_event_page(event_page, views=views)
+    first = next(events)
+    assert first["data"] == {"x": 0, "y": 0}
+    assert x.read == {0}
+    assert first["filled"] == {}
+    assert isinstance(first["data"], dict) is not views
+    if views:
+        with pytest.raises(TypeError):
+            first["data"]["x"] = 1
+        assert pickle.loads(pickle.dumps(first)) == first
+        assert json.loads(json.dumps(first, cls=event_model.NumpyEncoder)) == first
+    assert event_model.pack_event_page(first, *events) == event_page
+
+
 def test_round_trip_datum_page_with_empty_data():
     datum_page = {"datum_id": ["a", "b", "c"], "resource": "d", "datum_kwargs": {}}
     datums = list(event_model.unpack_datum_page(datum_page))
@@ -1,10 +1,16 @@
+import asyncio
+import concurrent.futures
 import copy
+import itertools
 import pathlib
+import pickle
+import threading
 
 import numpy
 import pytest
 
 import event_model
+from event_model.documents.stream_datum import StreamRange
 
 path_root = pathlib.Path("/placeholder/path")
 run_bundle = event_model.compose_run()
@@ -375,7 +381,7 @@ def test_handler_registry_access():
 def test_mismatched_data_keys():
     "Test that we raise specifically when data keys do not match"
     "between event and descriptor."
-    with pytest.raises(event_model.MismatchedDataKeys):
+    with pytest.raises(event_model.MismatchedDataKeys) as no_filler_error:
         with event_model.NoFiller(reg) as filler:
             filler("start", run_bundle.start_doc)
             filler("descriptor", desc_bundle.descriptor_doc)
@@ -386,7 +392,7 @@ def test_mismatched_data_keys():
             del event["data"]["image"]
             filler("event", event)
 
-    with pytest.raises(event_model.MismatchedDataKeys):
+    with pytest.raises(event_model.MismatchedDataKeys) as filler_error:
         with event_model.Filler(reg, inplace=False) as filler:
             filler("start", run_bundle.start_doc)
             filler("descriptor", desc_bundle.descriptor_doc)
@@ -396,6 +402,7 @@ def test_mismatched_data_keys():
             event = copy.deepcopy(raw_event)
             del event["data"]["image"]
             filler("event", event)
+    assert str(no_filler_error.value) == str(filler_error.value)
 
 
 def test_clear_caches(filler):
@@ -409,3 +416,868 @@ def test_clear_caches(filler):
     assert filler._handler_cache  # implementation detail
     filler.clear_handler_cache()
     assert not filler._handler_cache  # implementation detail
+
+
+def test_fill_event_page_columnar():
+    "Fill a multi-row page without unpacking it into Events."
+    datum_doc2 = res_bundle.compose_datum(datum_kwargs={"c": 3, "d": 4})
+    raw_event2 = desc_bundle.compose_event(
+        data={"motor": 1, "image": datum_doc2["datum_id"]},
+        timestamps={"motor": 0, "image": 0},
+        filled={"image": False},
+        seq_num=2,
+    )
+    with event_model.Filler(reg, inplace=False) as filler:
+        filler("start", run_bundle.start_doc)
+        filler("descriptor", desc_bundle.descriptor_doc)
+        filler("resource", res_bundle.resource_doc)
+        filler("datum", datum_doc)
+        filler("datum", datum_doc2)
+        event_page = event_model.pack_event_page(
+            copy.deepcopy(raw_event), copy.deepcopy(raw_event2)
+        )
+        # Mark the second row as already filled; it must be left alone.
+        event_page["filled"]["image"][1] = datum_doc2["datum_id"]
+        filled_page = filler.fill_event_page(event_page)
+        assert filled_page is not event_page
+        assert filled_page["data"]["image"][0].shape == (5, 5)
+        assert filled_page["data"]["image"][1] == datum_doc2["datum_id"]
+        assert filled_page["filled"]["image"] == [
+            datum_doc["datum_id"],
+            datum_doc2["datum_id"],
+        ]
+        # Columns that need no filling are shared, not copied.
+        assert filled_page["data"]["motor"] is event_page["data"]["motor"]
+        # The original page is untouched.
+        assert event_page["filled"]["image"][0] is False
+        assert isinstance(event_page["data"]["image"][0], str)
+
+        # With no 'filled' field, infer the external keys from the descriptor.
+        event_page = event_model.pack_event_page(
+            copy.deepcopy(raw_event), copy.deepcopy(raw_event2)
+        )
+        del event_page["filled"]
+        filled_page = filler.fill_event_page(event_page)
+        assert all(arr.shape == (5, 5) for arr in filled_page["data"]["image"])
+        assert "filled" not in event_page
+
+
+@pytest.mark.parametrize("coerce", ["as_is", "force_numpy"])
+def test_fill_event_page_get_many(coerce):
+    "Handlers that implement get_many are called once per Resource per page."
+    calls = []
+
+    class BatchHandler(DummyHandler):
+        def __call__(self, c, d):
+            calls.append("__call__")
+            return super().__call__(c, d)
+
+        def get_many(self, datum_kwargs_list):
+            calls.append(("get_many", len(datum_kwargs_list)))
+            return [numpy.full((5, 5), i) for i, _ in enumerate(datum_kwargs_list)]
+
+    datum_docs = [
+        res_bundle.compose_datum(datum_kwargs={"c": 3, "d": 4}) for _ in range(3)
+    ]
+    events = [
+        desc_bundle.compose_event(
+            data={"motor": i, "image": datum_doc["datum_id"]},
+            timestamps={"motor": 0, "image": 0},
+            filled={"image": False},
+            seq_num=i + 1,
+        )
+        for i, datum_doc in enumerate(datum_docs)
+    ]
+    with event_model.Filler(
+        {"DUMMY": BatchHandler}, inplace=True, coerce=coerce
+    ) as filler:
+        filler("start", run_bundle.start_doc)
+        filler("descriptor", desc_bundle.descriptor_doc)
+        filler("resource", res_bundle.resource_doc)
+        filler("datum", datum_doc)
+        for datum_doc_ in datum_docs:
+            filler("datum", datum_doc_)
+        event_page = event_model.pack_event_page(*events)
+        filler("event_page", event_page)
+        assert calls == [("get_many", 3)]
+        for i, image in enumerate(event_page["data"]["image"]):
+            assert isinstance(image, numpy.ndarray)
+            assert image[0, 0] == i
+        # A single Event still goes through __call__.
+        filler("event", copy.deepcopy(raw_event))
+        assert calls == [("get_many", 3), "__call__"]
+
+
+def test_fill_event_page_with_executor():
+    "Resources referenced by one page are loaded concurrently on an executor."
+    # Both handlers must be running at the same time to pass the barrier.
+    barrier = threading.Barrier(2, timeout=10)
+
+    class BarrierHandler:
+        def __init__(self, resource_path, value):
+            self.value = value
+
+        def __call__(self, index):
+            barrier.wait()
+            return numpy.full((5, 5), self.value + index)
+
+    run_bundle = event_model.compose_run()
+    desc_bundle = run_bundle.compose_descriptor(
+        data_keys={
+            key: {
+                "shape": [5, 5],
+                "dtype": "array",
+                "source": "...",
+                "external": "FILESTORE:",
+            }
+            for key in ("det1", "det2")
+        },
+        name="primary",
+    )
+    res_bundles = [
+        run_bundle.compose_resource(
+            spec="BARRIER",
+            root=str(path_root),
+            resource_path=f"det{i}.h5",
+            resource_kwargs={"value": 10 * i},
+        )
+        for i in (1, 2)
+    ]
+    datum_docs = [
+        [res_bundle.compose_datum(datum_kwargs={"index": j}) for j in range(3)]
+        for res_bundle in res_bundles
+    ]
+    event_page = desc_bundle.compose_event_page(
+        data={
+            "det1": [doc["datum_id"] for doc in datum_docs[0]],
+            "det2": [doc["datum_id"] for doc in datum_docs[1]],
+        },
+        timestamps={"det1": [0, 0, 0], "det2": [0, 0, 0]},
+        filled={"det1": [False] * 3, "det2": [False] * 3},
+    )
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        with event_model.Filler(
+            {"BARRIER": BarrierHandler}, inplace=False, executor=executor
+        ) as filler:
+            filler("start", run_bundle.start_doc)
+            filler("descriptor", desc_bundle.descriptor_doc)
+            for res_bundle in res_bundles:
+                filler("resource", res_bundle.resource_doc)
+            for docs in datum_docs:
+                for doc in docs:
+                    filler("datum", doc)
+            _, filled_page = filler("event_page", event_page)
+    assert [arr[0, 0] for arr in filled_page["data"]["det1"]] == [10, 11, 12]
+    assert [arr[0, 0] for arr in filled_page["data"]["det2"]] == [20, 21, 22]
+    assert filled_page["filled"]["det1"] == [doc["datum_id"] for doc in datum_docs[0]]
+
+
+def test_fill_stream_datum():
+    calls = []
+
+    class ArrayStreamHandler:
+        def __init__(self, uri, offset):
+            assert uri == "file://localhost/stream.npy"
+            self.data = numpy.arange(100) + offset
+
+        def __call__(self, indices):
+            calls.append(indices)
+            return self.data[indices]
+
+    bundle = event_model.compose_run()
+    descriptor_bundle = bundle.compose_descriptor(
+        data_keys={
+            "motor": {"shape": [], "dtype": "number", "source": "..."},
+            "det": {
+                "shape": [],
+                "dtype": "number",
+                "source": "...",
+                "external": "STREAM:",
+            },
+        },
+        name="primary",
+    )
+    descriptor = descriptor_bundle.descriptor_doc
+    stream_resource, compose_stream_datum = bundle.compose_stream_resource(
+        mimetype="application/x-test",
+        data_key="det",
+        uri="file://localhost/stream.npy",
+        parameters={"offset": 1000},
+    )
+    stream_datums = [
+        compose_stream_datum(
+            StreamRange(start=0, stop=3), StreamRange(start=1, stop=4), descriptor
+        ),
+        compose_stream_datum(
+            StreamRange(start=3, stop=6), StreamRange(start=4, stop=7), descriptor
+        ),
+    ]
+
+    def event_page(seq_nums):
+        N = len(seq_nums)
+        return descriptor_bundle.compose_event_page(
+            data={"motor": [0] * N},
+            timestamps={"motor": [0] * N},
+            seq_num=seq_nums,
+            validate=False,
+        )
+
+    with event_model.Filler(
+        {},
+        stream_handler_registry={"application/x-test": ArrayStreamHandler},
+        inplace=False,
+    ) as filler:
+        filler("start", bundle.start_doc)
+        filler("descriptor", descriptor)
+        filler("stream_resource", stream_resource)
+        for stream_datum in stream_datums:
+            filler("stream_datum", stream_datum)
+        # Rows within one StreamDatum are read with one call.
+        _, filled = filler("event_page", event_page([1, 2, 3]))
+        assert list(filled["data"]["det"]) == [1000, 1001, 1002]
+        assert filled["filled"]["det"] == [stream_datums[0]["uid"]] * 3
+        assert calls == [slice(0, 3)]
+        # Rows spanning two StreamDatum are read with one call for each.
+        _, filled = filler("event_page", event_page([2, 3, 4, 5]))
+        assert list(filled["data"]["det"]) == [1001, 1002, 1003, 1004]
+        assert calls[1:] == [slice(1, 3), slice(3, 5)]
+        event = descriptor_bundle.compose_event(
+            data={"motor": 0}, timestamps={"motor": 0}, seq_num=6
+        )
+        _, filled = filler("event", event)
+        assert filled["data"]["det"] == 1005
+        assert filled["filled"]["det"] == stream_datums[1]["uid"]
+        # Rows not covered by any StreamDatum are left unfilled.
+        _, filled = filler("event_page", event_page([6, 7]))
+        assert "det" not in filled["data"]
+    assert len(calls) == 4
+
+    # Without a stream handler for the mimetype, nothing is filled.
+    filler = event_model.Filler({}, inplace=False)
+    for name, doc in [
+        ("start", bundle.start_doc),
+        ("descriptor", descriptor),
+        ("stream_resource", stream_resource),
+        ("stream_datum", stream_datums[0]),
+    ]:
+        filler(name, doc)
+    assert "det" not in filler("event_page", event_page([1]))[1]["data"]
+    with pytest.raises(event_model.UndefinedAssetSpecification):
+        filler.get_stream_handler(stream_resource)
+    assert pickle.loads(pickle.dumps(filler))._stream_datum_index
+
+    # A StreamDatum may arrive before its StreamResource. It is resolved when
+    # Events are filled, and is an error only if it is still unknown then.
+    with event_model.Filler(
+        {},
+        stream_handler_registry={"application/x-test": ArrayStreamHandler},
+        inplace=False,
+    ) as filler:
+        filler("start", bundle.start_doc)
+        filler("descriptor", descriptor)
+        assert filler("stream_datum", stream_datums[0]) == (
+            "stream_datum",
+            stream_datums[0],
+        )
+        with pytest.raises(event_model.UnresolvableForeignKeyError):
+            filler("event_page", event_page([1]))
+        filler("stream_resource", stream_resource)
+        _, filled = filler("event_page", event_page([1]))
+        assert list(filled["data"]["det"]) == [1000]
+
+
+def test_lru_cache():
+    cache = event_model.LRUCache(max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # Now "b" is the least recently used.
+    cache["c"] = 3
+    assert "b" not in cache
+    assert list(cache) == ["a", "c"]
+    with pytest.raises(KeyError):
+        cache["b"]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+    cache = event_model.LRUCache(max_bytes=3 * 8000)
+    for i in range(5):
+        cache[i] = numpy.zeros(1000)
+    assert list(cache) == [3, 4]
+    assert cache.nbytes <= 3 * 8000
+    # A single item larger than max_bytes is kept.
+    cache["big"] = numpy.zeros(10000)
+    assert list(cache) == ["big"]
+    cache.clear()
+    assert not cache and cache.nbytes == 0
+
+    with pytest.raises(ValueError):
+        event_model.LRUCache(max_entries=0)
+
+
+def test_datum_page_cache():
+    datum_page = event_model.pack_datum_page(
+        *(res_bundle.compose_datum(datum_kwargs={"c": 3, "d": d}) for d in range(3))
+    )
+    cache = event_model.DatumPageCache()
+    cache.add_page(datum_page)
+    datum_ids = datum_page["datum_id"]
+    assert list(cache) == datum_ids
+    assert cache.locate(datum_ids[1]) == (datum_page, 1)
+    assert cache[datum_ids[1]] == {
+        "datum_id": datum_ids[1],
+        "datum_kwargs": {"c": 3, "d": 1},
+        "resource": res_bundle.resource_doc["uid"],
+    }
+    # Datum may be replaced, individually or by another page, or deleted.
+    cache[datum_ids[0]] = datum_doc
+    assert cache[datum_ids[0]] is datum_doc
+    del cache[datum_ids[1]]
+    assert datum_ids[1] not in cache
+    cache.add_page(dict(datum_page, datum_id=datum_ids[::-1]))
+    assert len(cache) == 3
+    assert cache[datum_ids[0]]["datum_kwargs"] == {"c": 3, "d": 2}
+    # The first page is no longer referenced.
+    assert cache._pages[0] is None
+    cache.clear()
+    assert not cache
+
+    # Filler keeps DatumPages as they are and fills from them.
+    with event_model.Filler(reg, inplace=False) as filler:
+        filler("start", run_bundle.start_doc)
+        filler("descriptor", desc_bundle.descriptor_doc)
+        filler("resource", res_bundle.resource_doc)
+        filler("datum_page", event_model.pack_datum_page(datum_doc))
+        assert isinstance(filler._datum_cache, event_model.DatumPageCache)
+        assert filler._datum_cache._pages
+        filled = filler("event", copy.deepcopy(raw_event))[1]
+        assert filled["data"]["image"].shape == (5, 5)
+
+
+def test_counter_datum_cache():
+    resource_uid = res_bundle.resource_doc["uid"]
+    compose_datum_page = event_model.ComposeDatumPage(
+        res_bundle.resource_doc, itertools.count()
+    )
+    cache = event_model.CounterDatumCache()
+    first = compose_datum_page({"c": [3, 3], "d": [0, 1]})
+    cache.add_page(first)
+    # Out-of-order and non-counter datum_ids are also accepted.
+    cache.add_page(dict(first, datum_id=[f"{resource_uid}/3", f"{resource_uid}/2"]))
+    cache["other"] = datum_doc
+    assert not cache._index  # Nothing is stored by datum_id.
+    assert len(cache) == 5
+    assert set(cache) == {*(f"{resource_uid}/{i}" for i in range(4)), "other"}
+    assert cache[f"{resource_uid}/1"] == {
+        "datum_id": f"{resource_uid}/1",
+        "datum_kwargs": {"c": 3, "d": 1},
+        "resource": resource_uid,
+    }
+    assert cache[f"{resource_uid}/3"]["datum_kwargs"] == {"c": 3, "d": 0}
+    assert cache["other"] is datum_doc
+    with pytest.raises(KeyError):
+        cache[f"{resource_uid}/4"]
+    with pytest.raises(KeyError):
+        cache[f"{resource_uid}/01"]
+    datum_ids = [f"{resource_uid}/{i}" for i in range(4)]
+    assert cache.get_many(datum_ids) == [cache[datum_id] for datum_id in datum_ids]
+    del cache[f"{resource_uid}/1"]
+    assert f"{resource_uid}/1" not in cache
+    with pytest.raises(KeyError):
+        cache.get_many(datum_ids)
+    # Datum missing some datum_kwargs are supported.
+    cache[f"{resource_uid}/1"] = dict(datum_doc, datum_id=f"{resource_uid}/1")
+    cache.add_page(compose_datum_page({"c": [5]}))  # Replaces counter 2.
+    assert cache[f"{resource_uid}/2"]["datum_kwargs"] == {"c": 5}
+    assert cache[f"{resource_uid}/3"]["datum_kwargs"] == {"c": 3, "d": 0}
+    assert pickle.loads(pickle.dumps(cache)).get_many(datum_ids) == cache.get_many(
+        datum_ids
+    )
+
+    # Filler looks up the Datum of an EventPage in bulk.
+    compose_datum_page = event_model.ComposeDatumPage(
+        res_bundle.resource_doc, itertools.count()
+    )
+    with event_model.Filler(
+        reg, datum_cache=event_model.CounterDatumCache(), inplace=False
+    ) as filler:
+        filler("start", run_bundle.start_doc)
+        filler("descriptor", desc_bundle.descriptor_doc)
+        filler("resource", res_bundle.resource_doc)
+        datum_page = compose_datum_page({"c": [3] * 3, "d": [4] * 3})
+        filler("datum_page", datum_page)
+        event_page = desc_bundle.compose_event_page(
+            data={"motor": [0] * 3, "image": datum_page["datum_id"]},
+            timestamps={"motor": [0] * 3, "image": [0] * 3},
+            filled={"image": [False] * 3},
+            seq_num=[1, 2, 3],
+        )
+        filled = filler("event_page", event_page)[1]
+        assert filled["filled"]["image"] == datum_page["datum_id"]
+        assert [image.shape for image in filled["data"]["image"]] == [(5, 5)] * 3
+
+
+def test_prefetch():
+    loaded = []
+
+    class RecordingHandler(DummyHandler):
+        def __call__(self, c, d):
+            loaded.append(threading.current_thread().name)
+            return super().__call__(c, d)
+
+    compose_datum_page = event_model.ComposeDatumPage(
+        res_bundle.resource_doc, itertools.count()
+    )
+    datum_page = compose_datum_page({"c": [3] * 3, "d": [4] * 3})
+    event_page = desc_bundle.compose_event_page(
+        data={"motor": [0] * 3, "image": datum_page["datum_id"]},
+        timestamps={"motor": [0] * 3, "image": [0] * 3},
+        filled={"image": [False] * 3},
+        seq_num=[1, 2, 3],
+    )
+    with event_model.Filler(
+        {"DUMMY": RecordingHandler}, prefetch=True, prefetch_datums=2, inplace=False
+    ) as filler:
+        filler("start", run_bundle.start_doc)
+        filler("descriptor", desc_bundle.descriptor_doc)
+        filler("resource", res_bundle.resource_doc)
+        filler("datum_page", datum_page)
+        # Only the first two Datums fit in the window.
+        assert len(filler._prefetched) == 2
+        filled = filler("event_page", event_page)[1]
+        assert [image.shape for image in filled["data"]["image"]] == [(5, 5)] * 3
+        assert not filler._prefetched
+        assert len(loaded) == 3
+        assert all(name.startswith("event_model_prefetch") for name in loaded[:2])
+        assert loaded[2] == threading.current_thread().name
+        # Payloads that are not used are dropped at the end of the run.
+        filler("datum_page", compose_datum_page({"c": [3], "d": [4]}))
+        assert filler._prefetched
+        filler("stop", stop_doc)
+        assert not filler._prefetched
+        assert filler.clone()._prefetch
+
+    # A bound on the bytes pauses prefetching once it is reached.
+    with event_model.Filler(
+        {"DUMMY": RecordingHandler}, prefetch=True, prefetch_bytes=1, inplace=False
+    ) as filler:
+        filler("start", run_bundle.start_doc)
+        filler("resource", res_bundle.resource_doc)
+        filler("datum_page", compose_datum_page({"c": [3], "d": [4]}))
+        ((page, _),) = filler._prefetched.values()
+        page.future.result()
+        filler("datum_page", compose_datum_page({"c": [3], "d": [4]}))
+        assert len(filler._prefetched) == 1
+
+    with pytest.raises(event_model.EventModelValueError):
+        event_model.AsyncFiller(reg, prefetch=True, inplace=False)
+
+
+def test_lru_handler_cache_closes_evicted():
+    closed = []
+
+    class ClosingHandler(DummyHandler):
+        def close(self):
+            closed.append(self)
+
+    handler_cache = event_model.LRUCache(max_entries=1, close_evicted=True)
+    with event_model.Filler(
+        {"DUMMY": ClosingHandler},
+        handler_cache=handler_cache,
+        datum_cache=event_model.LRUCache(max_entries=10),
+        inplace=False,
+    ) as filler:
+        filler("start", run_bundle.start_doc)
+        filler("descriptor", desc_bundle.descriptor_doc)
+        filler("resource", res_bundle.resource_doc)
+        filler("datum", datum_doc)
+        filler("event", copy.deepcopy(raw_event))
+        filler("event", copy.deepcopy(raw_event))
+        assert (handler_cache.hits, handler_cache.misses) == (1, 1)
+        (handler,) = handler_cache.values()
+        # Caching a handler for a second Resource evicts and closes the first.
+        other_resource = dict(res_bundle.resource_doc, uid="other")
+        filler.resource(other_resource)
+        other_handler = filler._get_handler_maybe_cached(other_resource)
+        assert closed == [handler]
+        # Clearing the cache closes its handlers too, after any deferral.
+        with handler_cache.deferred_close():
+            filler.clear_handler_cache()
+            assert closed == [handler]
+        assert closed == [handler, other_handler]
+        assert not handler_cache
+
+    # A Filler with LRUCache caches can still be pickled.
+    filler = event_model.Filler(
+        {}, handler_cache=event_model.LRUCache(max_entries=1), inplace=False
+    )
+    assert pickle.loads(pickle.dumps(filler)) == filler
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_lru_handler_cache_smaller_than_page(max_workers):
+    "Handlers evicted while filling a document are closed after it is filled."
+    closed = []
+
+    class ClosingHandler:
+        def __init__(self, resource_path, name):
+            self.name = name
+            self.closed = False
+
+        def __call__(self, i):
+            if self.closed:
+                raise OSError(f"{self.name} is closed")
+            return numpy.full(2, i)
+
+        def close(self):
+            self.closed = True
+            closed.append(self.name)
+
+    run_bundle = event_model.compose_run()
+    desc_bundle = run_bundle.compose_descriptor(
+        data_keys={
+            key: {"shape": [2], "dtype": "array", "source": "...", "external": "X:"}
+            for key in "abc"
+        },
+        name="primary",
+    )
+    handler_cache = event_model.LRUCache(max_entries=1, close_evicted=True)
+    executor = (
+        None
+        if max_workers is None
+        else concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    )
+    filler = event_model.Filler(
+        {"CLOSING": ClosingHandler},
+        handler_cache=handler_cache,
+        inplace=False,
+        retry_intervals=[],
+        executor=executor,
+    )
+    filler("start", run_bundle.start_doc)
+    filler("descriptor", desc_bundle.descriptor_doc)
+    data = {}
+    for key in "abc":
+        res_bundle = run_bundle.compose_resource(
+            spec="CLOSING", root="/", resource_path=key, resource_kwargs={"name": key}
+        )
+        filler("resource", res_bundle.resource_doc)
+        datum_page = res_bundle.compose_datum_page(datum_kwargs={"i": [1, 2]})
+        filler("datum_page", datum_page)
+        data[key] = datum_page["datum_id"]
+    event_page = desc_bundle.compose_event_page(
+        data=data,
+        timestamps={key: [0, 0] for key in "abc"},
+        filled={key: [False, False] for key in "abc"},
+        seq_num=[1, 2],
+    )
+    _, filled_page = filler("event_page", event_page)
+    assert [row.tolist() for row in filled_page["data"]["c"]] == [[1, 1], [2, 2]]
+    assert sorted(closed) == ["a", "b"]
+    assert len(handler_cache) == 1
+    filler.close()
+    if executor is not None:
+        executor.shutdown()
+
+
+def test_async_filler():
+    "AsyncFiller awaits handlers and retries without blocking the event loop."
+    attempts = []
+
+    class FlakyAsyncHandler(DummyHandler):
+        async def __call__(self, c, d):
+            attempts.append(object())
+            if len(attempts) < 3:
+                raise OSError("Not written yet")
+            await asyncio.sleep(0)
+            return super().__call__(c, d)
+
+    async def fill():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        async with event_model.AsyncFiller(
+            {"DUMMY": FlakyAsyncHandler}, inplace=False, retry_intervals=[0.01] * 3
+        ) as filler:
+            await filler("start", run_bundle.start_doc)
+            await filler("descriptor", desc_bundle.descriptor_doc)
+            await filler("resource", res_bundle.resource_doc)
+            await filler("datum", datum_doc)
+            name, event = await filler("event", copy.deepcopy(raw_event), True)
+            event_page = event_model.pack_event_page(copy.deepcopy(raw_event))
+            _, filled_page = await filler("event_page", event_page)
+        task.cancel()
+        return event, filled_page, ticks
+
+    event, filled_page, ticks = asyncio.run(fill())
+    assert len(attempts) == 4
+    assert event["data"]["image"].shape == (5, 5)
+    assert filled_page["data"]["image"][0].shape == (5, 5)
+    # The event loop kept running other tasks during the retries.
+    assert ticks > 0
+
+
+def test_async_filler_with_executor():
+    "Blocking handlers are run on the executor, off the event loop's thread."
+    threads = set()
+
+    class RecordingHandler(DummyHandler):
+        def __call__(self, c, d):
+            threads.add(threading.get_ident())
+            return super().__call__(c, d)
+
+    async def fill(executor):
+        filler = event_model.AsyncFiller(
+            {"DUMMY": RecordingHandler}, inplace=True, executor=executor
+        )
+        await filler("start", run_bundle.start_doc)
+        await filler("descriptor", desc_bundle.descriptor_doc)
+        await filler("resource", res_bundle.resource_doc)
+        await filler("datum", datum_doc)
+        return await filler.fill_event(copy.deepcopy(raw_event))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        event = asyncio.run(fill(executor))
+    assert event["data"]["image"].shape == (5, 5)
+    assert threading.get_ident() not in threads
+
+
+@pytest.mark.parametrize("use_executor", [False, True])
+def test_async_filler_coercion_state(use_executor):
+    "Coercion functions see the state of the Datum being loaded."
+    seen = []
+
+    def record_state(handler_class, filler_state):
+        class Subclass(handler_class):
+            def __call__(self, *args, **kwargs):
+                seen.append(
+                    (filler_state.resource["resource_kwargs"]["name"], filler_state.key)
+                )
+                return super().__call__(*args, **kwargs)
+
+        return Subclass
+
+    class NamedHandler:
+        def __init__(self, resource_path, name):
+            self.name = name
+
+        def __call__(self, i):
+            return numpy.full(2, i)
+
+    run_bundle = event_model.compose_run()
+    desc_bundle = run_bundle.compose_descriptor(
+        data_keys={
+            key: {"shape": [2], "dtype": "array", "source": "...", "external": "X:"}
+            for key in "ab"
+        },
+        name="primary",
+    )
+    res_bundles = {
+        key: run_bundle.compose_resource(
+            spec="NAMED", root="/", resource_path=key, resource_kwargs={"name": key}
+        )
+        for key in "ab"
+    }
+    datums = {
+        key: res_bundle.compose_datum(datum_kwargs={"i": 1})
+        for key, res_bundle in res_bundles.items()
+    }
+    event = desc_bundle.compose_event(
+        data={key: datum["datum_id"] for key, datum in datums.items()},
+        timestamps=dict.fromkeys("ab", 0),
+        filled=dict.fromkeys("ab", False),
+    )
+
+    async def fill(executor):
+        filler = event_model.AsyncFiller(
+            {"NAMED": NamedHandler},
+            inplace=False,
+            coerce="record_state",
+            executor=executor,
+        )
+        await filler("start", run_bundle.start_doc)
+        await filler("descriptor", desc_bundle.descriptor_doc)
+        for key in "ab":
+            await filler("resource", res_bundles[key].resource_doc)
+            await filler("datum", datums[key])
+        return await filler("event", event)
+
+    event_model.register_coercion("record_state", record_state)
+    try:
+        if use_executor:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                asyncio.run(fill(executor))
+        else:
+            asyncio.run(fill(None))
+    finally:
+        del event_model._coercion_registry["record_state"]
+    assert sorted(seen) == [("a", "a"), ("b", "b")]
+
+
+def test_async_filler_every_document():
+    "Every document can be passed to an AsyncFiller, and is awaited."
+    stream_resource, compose_stream_datum = run_bundle.compose_stream_resource(
+        mimetype="application/x-hdf5", data_key="det", uri="file:///a.h5", parameters={}
+    )
+    documents = [
+        ("start", run_bundle.start_doc),
+        ("descriptor", desc_bundle.descriptor_doc),
+        ("resource", res_bundle.resource_doc),
+        ("datum", datum_doc),
+        ("datum_page", event_model.pack_datum_page(datum_doc)),
+        ("event", copy.deepcopy(raw_event)),
+        ("event_page", event_model.pack_event_page(copy.deepcopy(raw_event))),
+        ("bulk_events", {"primary": [copy.deepcopy(raw_event)]}),
+        (
+            "bulk_datum",
+            {
+                "resource": datum_doc["resource"],
+                "datum_kwarg_list": [datum_doc["datum_kwargs"]],
+                "datum_ids": [datum_doc["datum_id"]],
+            },
+        ),
+        ("stream_resource", stream_resource),
+        (
+            "stream_datum",
+            compose_stream_datum(
+                StreamRange(start=0, stop=1),
+                StreamRange(start=1, stop=2),
+                desc_bundle.descriptor_doc,
+            ),
+        ),
+        ("stop", stop_doc),
+    ]
+    assert {name for name, _ in documents} == {
+        name.value for name in event_model.SCHEMA_NAMES
+    }
+    loaded = []
+
+    class RecordingHandler(DummyHandler):
+        def __call__(self, c, d):
+            loaded.append(c)
+            return super().__call__(c, d)
+
+    async def fill():
+        outputs = {}
+        async with event_model.AsyncFiller(
+            {"DUMMY": RecordingHandler}, inplace=False
+        ) as filler:
+            for name, doc in documents:
+                outputs[name] = await filler(name, doc)
+            with pytest.raises(event_model.EventModelRuntimeError):
+                filler.event(copy.deepcopy(raw_event))
+            with pytest.raises(event_model.EventModelRuntimeError):
+                filler.event_page(event_model.pack_event_page(raw_event))
+        return outputs
+
+    with pytest.warns(UserWarning, match="deprecated"):
+        outputs = asyncio.run(fill())
+    assert outputs["event"][1]["data"]["image"].shape == (5, 5)
+    assert outputs["event_page"][1]["data"]["image"][0].shape == (5, 5)
+    # The Event in bulk_events was loaded too.
+    assert len(loaded) == 3
+
+
+def test_async_filler_stream_retries(monkeypatch):
+    "AsyncFiller retries stream handlers without blocking the event loop."
+    attempts = {"init": 0, "call": 0}
+
+    class FlakyStreamHandler:
+        def __init__(self, uri):
+            attempts["init"] += 1
+            if attempts["init"] < 2:
+                raise OSError("Not written yet")
+
+        def __call__(self, indices):
+            attempts["call"] += 1
+            if attempts["call"] < 3:
+                raise OSError("Not written yet")
+            return numpy.arange(10)[indices]
+
+    def blocking_sleep(interval):
+        raise AssertionError("time.sleep was called on the event loop")
+
+    monkeypatch.setattr(event_model.ttime, "sleep", blocking_sleep)
+    descriptor_bundle = run_bundle.compose_descriptor(
+        data_keys={
+            "det": {
+                "shape": [],
+                "dtype": "number",
+                "source": "...",
+                "external": "STREAM:",
+            },
+        },
+        name="streams",
+    )
+    stream_resource, compose_stream_datum = run_bundle.compose_stream_resource(
+        mimetype="application/x-test", data_key="det", uri="file:///a.h5", parameters={}
+    )
+    stream_datum = compose_stream_datum(
+        StreamRange(start=0, stop=3),
+        StreamRange(start=1, stop=4),
+        descriptor_bundle.descriptor_doc,
+    )
+    event_page = descriptor_bundle.compose_event_page(
+        data={}, timestamps={}, seq_num=[1, 2, 3], validate=False
+    )
+
+    async def fill():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        async with event_model.AsyncFiller(
+            {},
+            stream_handler_registry={"application/x-test": FlakyStreamHandler},
+            inplace=False,
+            retry_intervals=[0.01] * 3,
+            executor=None,
+        ) as filler:
+            await filler("start", run_bundle.start_doc)
+            await filler("descriptor", descriptor_bundle.descriptor_doc)
+            await filler("stream_resource", stream_resource)
+            await filler("stream_datum", stream_datum)
+            _, filled = await filler("event_page", event_page)
+        task.cancel()
+        return filled, ticks
+
+    filled, ticks = asyncio.run(fill())
+    assert attempts == {"init": 2, "call": 3}
+    assert list(filled["data"]["det"]) == [0, 1, 2]
+    assert filled["filled"]["det"] == [stream_datum["uid"]] * 3
+    # The event loop kept running other tasks during the retries.
+    assert ticks > 0
+
+
+def test_async_filler_clone():
+    "A clone of an AsyncFiller is an AsyncFiller with the same settings."
+
+    class StreamHandler:
+        def __init__(self, uri):
+            pass
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        filler = event_model.AsyncFiller(
+            {"DUMMY": DummyHandler},
+            inplace=False,
+            retry_intervals=[0.01],
+            executor=executor,
+            stream_handler_registry={"application/x-test": StreamHandler},
+        )
+        clone = filler.clone()
+        assert type(clone) is event_model.AsyncFiller
+        assert clone == filler
+        assert clone.retry_intervals == [0.01]
+        assert clone._executor is executor
+        assert clone.stream_handler_registry == {"application/x-test": StreamHandler}
+        filler.close()
+        clone.close()
@@ -1,3 +1,5 @@
+import threading
+import time
 from collections import defaultdict
 
 import numpy
@@ -359,3 +361,315 @@ def test_subfactory_callback_exception():
 
     event_document = {"descriptor": "ghijkl", "uid": "mnopqr"}
     rr.event(event_document)
+
+
+def test_unlabeled_resources_bound_to_run(tmp_path):
+    runs = []
+    for _ in range(2):
+        bundle = event_model.compose_run()
+        descriptor_bundle = bundle.compose_descriptor(
+            data_keys={
+                "image": {
+                    "shape": [],
+                    "dtype": "number",
+                    "source": "...",
+                    "external": "FILESTORE:",
+                }
+            },
+            name="primary",
+        )
+        runs.append((bundle, descriptor_bundle))
+    resource_bundle = runs[0][0].compose_resource(
+        spec="DUMMY", root=str(tmp_path), resource_path="stack", resource_kwargs={}
+    )
+    resource_doc = dict(resource_bundle.resource_doc)
+    del resource_doc["run_start"]
+    first_datum = resource_bundle.compose_datum(datum_kwargs={"slice": 0})
+    second_datum = resource_bundle.compose_datum(datum_kwargs={"slice": 1})
+
+    collected = defaultdict(list)
+
+    def factory(name, start_doc):
+        def callback(name, doc):
+            collected[start_doc["uid"]].append(name)
+
+        return [callback], []
+
+    def handler(*args, **kwargs):
+        return lambda slice: numpy.array(slice)
+
+    rr = event_model.RunRouter([factory], handler_registry={"DUMMY": handler})
+    for bundle, descriptor_bundle in runs:
+        rr("start", bundle.start_doc)
+        rr("descriptor", descriptor_bundle.descriptor_doc)
+    rr("resource", resource_doc)
+    assert resource_doc["uid"] in rr._unlabeled_resources
+    # Until an Event references its Datum, the Resource goes to all runs.
+    rr("datum", first_datum)
+    first_uid, second_uid = (bundle.start_doc["uid"] for bundle, _ in runs)
+    assert collected[first_uid].count("datum_page") == 1
+    assert collected[second_uid].count("datum_page") == 1
+    rr(
+        "event",
+        runs[0][1].compose_event(
+            data={"image": first_datum["datum_id"]},
+            timestamps={"image": 0},
+            filled={"image": False},
+        ),
+    )
+    assert rr._unlabeled_resources.run_of(resource_doc["uid"]) == first_uid
+    # From then on, it goes only to the run that referenced it.
+    rr("datum", second_datum)
+    assert collected[first_uid].count("datum_page") == 2
+    assert collected[second_uid].count("datum_page") == 1
+    # Once that run is over, it goes to all runs again.
+    rr("stop", runs[0][0].compose_stop())
+    rr("datum", second_datum)
+    assert collected[second_uid].count("datum_page") == 2
+
+    # The oldest unlabeled Resources are forgotten first.
+    rr._unlabeled_resources.max_size = 2
+    for uid in ["a", "b", "c"]:
+        rr("resource", {**resource_doc, "uid": uid})
+    assert list(rr._unlabeled_resources._runs) == ["b", "c"]
+    assert resource_doc["uid"] not in rr._unlabeled_resources
+    with pytest.raises(event_model.UnresolvableForeignKeyError):
+        rr("datum", first_datum)
+
+
+def test_unlabeled_datum_ids_are_bounded(tmp_path):
+    bundle = event_model.compose_run()
+    resource_bundle = bundle.compose_resource(
+        spec="DUMMY", root=str(tmp_path), resource_path="stack", resource_kwargs={}
+    )
+    resource_doc = dict(resource_bundle.resource_doc)
+    del resource_doc["run_start"]
+
+    rr = event_model.RunRouter([], handler_registry={})
+    rr._unlabeled_resources.max_datum = 3
+    rr("start", bundle.start_doc)
+    rr("resource", resource_doc)
+    datum_ids = []
+    for i in range(5):
+        datum = resource_bundle.compose_datum(datum_kwargs={"slice": i})
+        datum_ids.append(datum["datum_id"])
+        rr("datum", datum)
+    # Only the most recent Datum IDs of an unbound Resource are kept.
+    assert set(rr._unlabeled_resources._datum) == set(datum_ids[-3:])
+    assert (
+        list(rr._unlabeled_resources._datum_by_resource[resource_doc["uid"]])
+        == (datum_ids[-3:])
+    )
+    # They are forgotten once every run they were fanned out to has ended.
+    rr("stop", bundle.compose_stop())
+    assert not rr._unlabeled_resources.has_unbound_datum
+    assert not rr._unlabeled_resources._datum_by_resource
+    assert resource_doc["uid"] in rr._unlabeled_resources
+
+
+def _run_with_resources(tmp_path):
+    "Compose a run with a Resource and a StreamResource, without its RunStop."
+    bundle = event_model.compose_run()
+    docs = [("start", bundle.start_doc)]
+    docs.append(
+        (
+            "descriptor",
+            bundle.compose_descriptor(
+                data_keys={"motor": {"shape": [], "dtype": "number", "source": "."}},
+                name="primary",
+            ).descriptor_doc,
+        )
+    )
+    docs.append(
+        (
+            "resource",
+            bundle.compose_resource(
+                spec="TIFF", root=str(tmp_path), resource_path="a", resource_kwargs={}
+            ).resource_doc,
+        )
+    )
+    docs.append(
+        (
+            "stream_resource",
+            bundle.compose_stream_resource(
+                mimetype="image/tiff",
+                data_key="det1",
+                uri="file://localhost" + str(tmp_path) + "/b",
+                parameters={},
+            ).stream_resource_doc,
+        )
+    )
+    return bundle, docs
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_run_router_forgets_runs(tmp_path, parallel):
+    def factory(name, start_doc):
+        return [lambda name, doc: None], []
+
+    rr = event_model.RunRouter([factory], parallel=parallel)
+    bundle, docs = _run_with_resources(tmp_path)
+    for name, doc in docs:
+        rr(name, doc)
+    rr.join()
+    stats = rr.stats()
+    assert stats["runs"] == stats["descriptors"] == 1
+    assert stats["resources"] == stats["stream_resources"] == 1
+    empty_bytes = event_model.RunRouter([]).stats()["index_bytes"]
+    assert stats["index_bytes"] > empty_bytes
+    rr("stop", bundle.compose_stop())
+    rr.join()
+    stats = rr.stats()
+    assert not any(value for key, value in stats.items() if key != "index_bytes")
+
+    # Abandoned runs are forgotten by reap().
+    abandoned, docs = _run_with_resources(tmp_path)
+    for name, doc in docs:
+        rr(name, doc)
+    rr.join()
+    assert rr.reap(timeout=3600) == []
+    with pytest.warns(UserWarning, match="forgetting the run"):
+        assert rr.reap(timeout=0) == [abandoned.start_doc["uid"]]
+    rr.close()
+    stats = rr.stats()
+    assert not any(value for key, value in stats.items() if key != "index_bytes")
+    with pytest.raises(ValueError):
+        rr.reap()
+
+    # Or when a new run starts, given a run_timeout.
+    rr = event_model.RunRouter([factory], parallel=parallel, run_timeout=0.01)
+    abandoned, docs = _run_with_resources(tmp_path)
+    for name, doc in docs:
+        rr(name, doc)
+    time.sleep(0.02)
+    with pytest.warns(UserWarning, match="forgetting the run"):
+        rr("start", event_model.compose_run().start_doc)
+    rr.join()
+    assert rr.stats()["runs"] == 1
+    rr.close()
+
+
+def _run_documents(num_events):
+    "Compose the documents of a run with one descriptor and num_events events."
+    bundle = event_model.compose_run()
+    docs = [("start", bundle.start_doc)]
+    descriptor_bundle = bundle.compose_descriptor(
+        data_keys={"motor": {"shape": [], "dtype": "number", "source": "..."}},
+        name="primary",
+    )
+    docs.append(("descriptor", descriptor_bundle.descriptor_doc))
+    for i in range(num_events):
+        docs.append(
+            (
+                "event",
+                descriptor_bundle.compose_event(
+                    data={"motor": i}, timestamps={"motor": i}
+                ),
+            )
+        )
+    docs.append(("stop", bundle.compose_stop()))
+    return docs
+
+
+def test_parallel_run_router():
+    slow = _run_documents(5)
+    fast = _run_documents(5)
+    slow_uid = slow[0][1]["uid"]
+    release = threading.Event()
+    collected = defaultdict(list)
+
+    def factory(name, start_doc):
+        def callback(name, doc):
+            if name == "event_page":
+                name = "event"
+                (doc,) = event_model.unpack_event_page(doc)
+            if start_doc["uid"] == slow_uid and name == "event":
+                assert release.wait(timeout=10)
+            collected[start_doc["uid"]].append((name, doc))
+
+        return [callback], []
+
+    rr = event_model.RunRouter([factory], parallel=True)
+    # Interleave the documents of the two runs.
+    for slow_doc, fast_doc in zip(slow, fast, strict=True):
+        rr(*slow_doc)
+        rr(*fast_doc)
+    # The fast run is not held up by the slow one.
+    for _ in range(100):
+        if len(collected[fast[0][1]["uid"]]) == len(fast):
+            break
+        time.sleep(0.05)
+    assert collected[fast[0][1]["uid"]] == fast
+    assert len(collected[slow_uid]) == 2
+    release.set()
+    rr.join()
+    # Documents are processed in order within each run.
+    assert collected[slow_uid] == slow
+    assert not rr._workers
+    assert not rr._routes
+
+
+def test_parallel_run_router_errors_and_backpressure():
+    class CallbackError(Exception): ...
+
+    docs = _run_documents(10)
+    calls = []
+    release = threading.Event()
+
+    def factory(name, start_doc):
+        def callback(name, doc):
+            assert release.wait(timeout=10)
+            calls.append(name)
+            if name == "event_page" and doc["seq_num"] == [2]:
+                raise CallbackError
+
+        return [callback], []
+
+    rr = event_model.RunRouter([factory], parallel=True, max_queue_size=2)
+    caller = threading.Thread(target=lambda: [rr(*doc) for doc in docs[:6]])
+    caller.start()
+    caller.join(timeout=0.5)
+    # The worker is blocked on the first document, so the caller is blocked by
+    # the full queue.
+    assert caller.is_alive()
+    release.set()
+    caller.join(timeout=10)
+    assert not caller.is_alive()
+    with pytest.raises(CallbackError):
+        rr.join()
+    # The rest of the run is dropped.
+    for doc in docs[6:]:
+        rr(*doc)
+    rr.close()
+    assert calls == ["start", "descriptor", "event_page", "event_page"]
+
+
+def test_parallel_run_router_stats():
+    "stats() can be called while the workers change the indexes."
+    errors = []
+    done = threading.Event()
+
+    def poll():
+        while not done.is_set():
+            try:
+                rr.stats()
+            except Exception as err:
+                errors.append(err)
+
+    def factory(name, start_doc):
+        return [lambda name, doc: None], []
+
+    rr = event_model.RunRouter([factory], parallel=True)
+    poller = threading.Thread(target=poll)
+    poller.start()
+    try:
+        for _ in range(300):
+            for doc in _run_documents(1):
+                rr(*doc)
+        rr.join()
+    finally:
+        done.set()
+        poller.join()
+        rr.close()
+    assert not errors
+    assert rr.stats()["runs"] == 0
@@ -0,0 +1,180 @@
+import numpy
+import pytest
+
+import event_model
+from event_model.documents.stream_datum import StreamRange
+from event_model.serialization import decode, dumps, encode, loads
+
+
+def _documents():
+    "Yield (name, doc) for every type of document."
+    run_bundle = event_model.compose_run(metadata={"scan_id": 1, "tags": ("a",)})
+    yield "start", run_bundle.start_doc
+    desc_bundle = run_bundle.compose_descriptor(
+        data_keys={
+            "motor": {"shape": [], "dtype": "number", "source": "..."},
+            "image": {"shape": [4, 3], "dtype": "array", "source": "..."},
+        },
+        name="primary",
+    )
+    yield "descriptor", desc_bundle.descriptor_doc
+    event = desc_bundle.compose_event(
+        data={"motor": -1.5, "image": numpy.arange(12.0).reshape(4, 3)},
+        timestamps={"motor": 0.0, "image": 0.0},
+        seq_num=1,
+    )
+    yield "event", event
+    yield (
+        "event_page",
+        desc_bundle.compose_event_page(
+            data={
+                "motor": list(numpy.linspace(0, 1, 100)),
+                "image": numpy.ones((100, 4, 3), dtype="<u2"),
+            },
+            timestamps={"motor": [1.0] * 100, "image": list(range(100))},
+            seq_num=list(range(1, 101)),
+            validate=False,
+        ),
+    )
+    yield "bulk_events", {"primary": [event]}
+    res_bundle = run_bundle.compose_resource(
+        spec="DUMMY", root="/", resource_path="a.h5", resource_kwargs={"n": 2**40}
+    )
+    yield "resource", res_bundle.resource_doc
+    datum = res_bundle.compose_datum(datum_kwargs={"index": 0, "flag": True})
+    yield "datum", datum
+    yield (
+        "datum_page",
+        res_bundle.compose_datum_page(
+            datum_kwargs={"index": list(range(20)), "label": ["x"] * 20}
+        ),
+    )
+    yield (
+        "bulk_datum",
+        {
+            "resource": datum["resource"],
+            "datum_kwarg_list": [datum["datum_kwargs"]],
+            "datum_ids": [datum["datum_id"]],
+        },
+    )
+    stream_resource, compose_stream_datum = run_bundle.compose_stream_resource(
+        mimetype="application/x-hdf5",
+        data_key="det",
+        uri="file://localhost/a.h5",
+        parameters={"dataset": "/entry/data", "chunk_shape": [1, 4, 3]},
+    )
+    yield "stream_resource", stream_resource
+    yield (
+        "stream_datum",
+        compose_stream_datum(
+            StreamRange(start=0, stop=5),
+            StreamRange(start=1, stop=6),
+            desc_bundle.descriptor_doc,
+        ),
+    )
+    yield "stop", run_bundle.compose_stop()
+
+
+def _assert_equal(actual, expected):
+    if isinstance(expected, numpy.ndarray):
+        assert isinstance(actual, numpy.ndarray)
+        assert actual.dtype == expected.dtype
+        numpy.testing.assert_array_equal(actual, expected)
+    elif isinstance(expected, dict):
+        assert isinstance(actual, dict)
+        assert list(actual) == list(expected)
+        for key in expected:
+            _assert_equal(actual[key], expected[key])
+    elif isinstance(expected, list | tuple):
+        assert isinstance(actual, list)
+        assert len(actual) == len(expected)
+        for actual_item, expected_item in zip(actual, expected, strict=True):
+            _assert_equal(actual_item, expected_item)
+    else:
+        assert actual == expected
+
+
+def test_round_trip():
+    documents = list(_documents())
+    # Every schema is covered.
+    assert {name for name, _ in documents} == {
+        name.value for name in event_model.SCHEMA_NAMES
+    }
+    for name, doc in documents:
+        for decoded_name, decoded in [
+            loads(dumps(name, doc)),
+            decode(encode(name, doc)),
+        ]:
+            assert decoded_name == name
+            _assert_equal(decoded, doc)
+            validator = event_model.schema_validators[
+                getattr(event_model.DocumentNames, name)
+            ]
+            validator.validate(event_model.sanitize_doc(decoded))
+
+
+def test_arrays_out_of_band():
+    image = numpy.arange(2000 * 2000, dtype="<u2").reshape(2000, 2000)
+    frames = encode("event", {"data": {"image": image, "sliced": image[:, ::2]}})
+    header, image_frame, sliced_frame = frames
+    assert len(header) < 100
+    # Contiguous arrays are not copied when encoding...
+    assert numpy.shares_memory(numpy.asarray(image_frame), image)
+    assert sliced_frame.nbytes == image.nbytes // 2
+    # ...or when decoding.
+    _, doc = decode(frames)
+    assert numpy.shares_memory(doc["data"]["image"], image)
+    numpy.testing.assert_array_equal(doc["data"]["sliced"], image[:, ::2])
+
+    data = dumps("event", {"data": {"image": image}})
+    _, doc = loads(data)
+    decoded = doc["data"]["image"]
+    assert not decoded.flags.writeable
+    numpy.testing.assert_array_equal(decoded, image)
+
+
+def test_conversions_and_errors():
+    _, doc = loads(
+        dumps(
+            "x",
+            {
+                "scalars": [numpy.float32(1.5), numpy.int64(-3), numpy.bool_(False)],
+                "tuple": (1, "b"),
+                "bytes": b"\x00\x01",
+                "big": [2**64 - 1, -(2**63)],
+                "objects": numpy.array([1, "a"], dtype=object),
+                "structured": numpy.zeros(2, dtype=[("x", "<f4"), ("y", "<i2", (2,))]),
+            },
+        )
+    )
+    assert doc["scalars"] == [1.5, -3, False]
+    assert doc["tuple"] == [1, "b"]
+    assert doc["bytes"] == b"\x00\x01"
+    assert doc["big"] == [2**64 - 1, -(2**63)]
+    assert doc["objects"] == [1, "a"]
+    assert doc["structured"].dtype.names == ("x", "y")
+    with pytest.raises(event_model.EventModelTypeError):
+        dumps("x", {"a": object()})
+    with pytest.raises(OverflowError):
+        dumps("x", {"a": 2**64})
+    with pytest.raises(event_model.EventModelValueError):
+        loads(b"not a document")
+    with pytest.raises(event_model.EventModelValueError):
+        loads(dumps("x", {"a": 1})[:-1])
+
+
+def test_truncated():
+    header, buffer = encode(
+        "event_page", {"seq_num": list(range(100)), "data": {"x": numpy.ones(3)}}
+    )
+    for end in range(len(header)):
+        with pytest.raises(event_model.EventModelValueError):
+            decode([header[:end], buffer])
+    with pytest.raises(event_model.EventModelValueError):
+        decode([header])
+    with pytest.raises(event_model.EventModelValueError):
+        decode([])
+    data = dumps("event_page", {"data": {"x": numpy.ones(3)}})
+    for end in range(len(data)):
+        with pytest.raises(event_model.EventModelValueError):
+            loads(data[:end])
@@ -0,0 +1,105 @@
+import numpy
+import pytest
+
+import event_model
+from event_model.documents.stream_datum import StreamRange
+from event_model.stream_handlers import (
+    STREAM_HANDLERS,
+    HDF5StreamHandler,
+    NPYStreamHandler,
+    RawStreamHandler,
+)
+
+
+def test_npy_stream_handler(tmp_path):
+    path = tmp_path / "stream.npy"
+    expected = numpy.arange(60, dtype="<u2").reshape(10, 2, 3)
+    numpy.save(path, expected)
+    handler = NPYStreamHandler(path.as_uri())
+    assert handler.get_file_list() == [str(path)]
+    actual = handler(slice(2, 5))
+    numpy.testing.assert_array_equal(actual, expected[2:5])
+    # The result is a view of the memory-mapped file, not a copy.
+    assert isinstance(actual.base, numpy.memmap) or isinstance(actual, numpy.memmap)
+    with pytest.raises(OSError):
+        handler(slice(8, 12))
+    handler.close()
+
+
+def test_raw_stream_handler(tmp_path):
+    path = tmp_path / "stream.raw"
+    expected = numpy.arange(24, dtype="<f4").reshape(4, 2, 3)
+    with open(path, "wb") as file:
+        file.write(b"header")
+        file.write(expected[:2].tobytes())
+    handler = RawStreamHandler(
+        f"file://localhost{path}", dtype="<f4", shape=[2, 3], offset=6
+    )
+    numpy.testing.assert_array_equal(handler(slice(0, 2)), expected[:2])
+    # Frames that have not been written yet raise IOError, which Filler retries.
+    with pytest.raises(OSError):
+        handler(slice(2, 4))
+    with open(path, "ab") as file:
+        file.write(expected[2:].tobytes())
+    numpy.testing.assert_array_equal(handler(slice(1, 4)), expected[1:])
+
+
+def test_hdf5_stream_handler(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    expected = numpy.arange(60, dtype="<i4").reshape(10, 2, 3)
+    for chunks in [None, (2, 2, 3)]:
+        path = tmp_path / f"stream{chunks is None}.h5"
+        with h5py.File(path, "w") as file:
+            file.create_dataset("/entry/data", data=expected, chunks=chunks)
+        handler = HDF5StreamHandler(
+            path.as_uri(), dataset="/entry/data", chunk_shape=[1, 2, 3]
+        )
+        numpy.testing.assert_array_equal(handler(slice(3, 7)), expected[3:7])
+        with pytest.raises(OSError):
+            handler(slice(9, 11))
+        handler.close()
+
+
+def test_stream_handlers_skip_force_numpy(tmp_path):
+    for handler_class in STREAM_HANDLERS.values():
+        assert event_model.force_numpy(handler_class, None) is handler_class
+
+    path = tmp_path / "stream.npy"
+    numpy.save(path, numpy.arange(10) * 10)
+    bundle = event_model.compose_run()
+    descriptor_bundle = bundle.compose_descriptor(
+        data_keys={
+            "det": {
+                "shape": [],
+                "dtype": "number",
+                "source": "...",
+                "external": "STREAM:",
+            },
+        },
+        name="primary",
+    )
+    descriptor = descriptor_bundle.descriptor_doc
+    stream_resource, compose_stream_datum = bundle.compose_stream_resource(
+        mimetype="application/x-npy",
+        data_key="det",
+        uri=path.as_uri(),
+        parameters={},
+    )
+    stream_datum = compose_stream_datum(
+        StreamRange(start=0, stop=3), StreamRange(start=1, stop=4), descriptor
+    )
+    event_page = descriptor_bundle.compose_event_page(
+        data={}, timestamps={}, seq_num=[1, 2, 3], validate=False
+    )
+    with event_model.Filler(
+        {},
+        stream_handler_registry=STREAM_HANDLERS,
+        coerce="force_numpy",
+        inplace=False,
+    ) as filler:
+        filler("start", bundle.start_doc)
+        filler("descriptor", descriptor)
+        filler("stream_resource", stream_resource)
+        filler("stream_datum", stream_datum)
+        _, filled = filler("event_page", event_page)
+        assert list(filled["data"]["det"]) == [0, 10, 20]